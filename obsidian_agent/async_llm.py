@@ -0,0 +1,252 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+
+from llm_manager import (LLMError, LLMResponseError, LLMSetupError, LLMUnavailableError, OllamaProvider,
+                         _sdk_error)
+
+# Fehler werden wie bei den synchronen Providern als LLMError geworfen;
+# ConcurrentRunner gibt sie pro Prompt zurück, statt den Stapel abzubrechen.
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(f"Rate-Limit erreicht (retry_after={retry_after})")
+        self.retry_after = retry_after
+
+def _retry_after(headers: Any) -> Optional[float]:
+    try:
+        value = headers.get('retry-after') if headers is not None else None
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class AsyncLLMProvider(ABC):
+    name = "LLM"
+
+    @abstractmethod
+    async def generate_response(self, prompt: str) -> str:
+        pass
+
+    async def aclose(self):
+        pass
+
+class AsyncOllamaProvider(AsyncLLMProvider):
+    name = "Ollama"
+
+    def __init__(self, config: Dict[str, Any], max_connections: int = 8):
+        self.base_url = config.get('base_url', 'http://localhost:11434')
+        self.model = config.get('model', 'llama3.1')
+        self.keep_alive = config.get('keep_alive', '30m')
+        self.num_ctx = int(config.get('context_tokens', 2048))
+        self.timeout = float(config.get('timeout', 60))
+        self.connect_timeout = float(config.get('connect_timeout', 5))
+        self.max_connections = max_connections
+        self._client = None
+        self._fallback: Optional[OllamaProvider] = None
+
+        try:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections)
+            )
+        except ImportError:
+            # Ohne httpx laufen die synchronen Aufrufe in Worker-Threads.
+            self._fallback = OllamaProvider(dict(config, pool_size=max_connections))
+
+    @staticmethod
+    def _text(data: Dict[str, Any]) -> str:
+        text = data.get('response')
+        if not text:
+            raise LLMResponseError("Keine Antwort erhalten")
+        return text
+
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        payload = {"model": self.model, "prompt": prompt, "stream": False, "options": {"num_ctx": self.num_ctx}}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _post_blocking(self, prompt: str) -> str:
+        import requests
+        try:
+            response = self._fallback.session.post(
+                f"{self.base_url}/api/generate",
+                json=self._payload(prompt),
+                timeout=self._fallback.timeout
+            )
+            if response.status_code == 429:
+                raise RateLimitExceeded(_retry_after(response.headers))
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise self._fallback._error(e) from e
+        return self._text(data)
+
+    @staticmethod
+    def _error(e: Exception) -> LLMError:
+        import httpx
+        message = f"Fehler bei Ollama-Anfrage: {e}"
+        if isinstance(e, httpx.HTTPStatusError):
+            status = e.response.status_code
+            return LLMUnavailableError(message) if status >= 500 else LLMResponseError(message)
+        if isinstance(e, httpx.TransportError):
+            return LLMUnavailableError(message)
+        return LLMResponseError(message)
+
+    async def generate_response(self, prompt: str) -> str:
+        if self._fallback is not None:
+            return await asyncio.to_thread(self._post_blocking, prompt)
+
+        import httpx
+        try:
+            response = await self._client.post("/api/generate", json=self._payload(prompt))
+            if response.status_code == 429:
+                raise RateLimitExceeded(_retry_after(response.headers))
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise self._error(e) from e
+        return self._text(data)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+        if self._fallback is not None:
+            self._fallback.close()
+
+class AsyncOpenAIProvider(AsyncLLMProvider):
+    name = "OpenAI"
+
+    def __init__(self, config: Dict[str, Any]):
+        self.api_key = config.get('api_key')
+        self.model = config.get('model', 'gpt-3.5-turbo')
+        self.max_tokens = config.get('max_tokens', 2000)
+        self.timeout = float(config.get('timeout', 60))
+        self._client = None
+
+        if not self.api_key:
+            raise LLMSetupError("OpenAI API Key ist erforderlich")
+
+    async def generate_response(self, prompt: str) -> str:
+        try:
+            import openai
+            if self._client is None:
+                # Retries übernimmt generate_many (Rate-Limit-Pause für alle Tasks).
+                self._client = openai.AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+
+            response = await self._client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.max_tokens
+            )
+            text = response.choices[0].message.content
+
+        except ImportError:
+            raise LLMSetupError("OpenAI-Bibliothek nicht installiert. Führe aus: pip install openai")
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 429:
+                raise RateLimitExceeded(_retry_after(getattr(getattr(e, 'response', None), 'headers', None)))
+            raise _sdk_error("OpenAI", e) from e
+        if not text:
+            raise LLMResponseError("Keine Antwort erhalten")
+        return text
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+
+class AsyncClaudeProvider(AsyncLLMProvider):
+    name = "Claude"
+
+    def __init__(self, config: Dict[str, Any]):
+        self.api_key = config.get('api_key')
+        self.model = config.get('model', 'claude-3-sonnet-20240229')
+        self.max_tokens = config.get('max_tokens', 2000)
+        self.timeout = float(config.get('timeout', 60))
+        self._client = None
+
+        if not self.api_key:
+            raise LLMSetupError("Claude API Key ist erforderlich")
+
+    async def generate_response(self, prompt: str) -> str:
+        try:
+            import anthropic
+            if self._client is None:
+                self._client = anthropic.AsyncAnthropic(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+
+            response = await self._client.messages.create(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            text = response.content[0].text if response.content else ""
+
+        except ImportError:
+            raise LLMSetupError("Anthropic-Bibliothek nicht installiert. Führe aus: pip install anthropic")
+        except Exception as e:
+            if getattr(e, 'status_code', None) == 429:
+                raise RateLimitExceeded(_retry_after(getattr(getattr(e, 'response', None), 'headers', None)))
+            raise _sdk_error("Claude", e) from e
+        if not text:
+            raise LLMResponseError("Keine Antwort erhalten")
+        return text
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+
+def create_async_provider(provider_name: str, config: Dict[str, Any], max_concurrency: int = 8) -> AsyncLLMProvider:
+    if provider_name == 'ollama':
+        return AsyncOllamaProvider(config, max_connections=max_concurrency)
+    elif provider_name == 'openai':
+        return AsyncOpenAIProvider(config)
+    elif provider_name == 'claude':
+        return AsyncClaudeProvider(config)
+    else:
+        raise LLMSetupError(f"Unbekannter Provider: {provider_name}")
+
+# Führt viele Prompts mit begrenzter Parallelität aus. Meldet ein Provider ein
+# Rate-Limit, pausieren alle Tasks gemeinsam bis zum Retry-After-Zeitpunkt.
+class ConcurrentRunner:
+    def __init__(self, provider: AsyncLLMProvider, max_concurrency: int = 4,
+                 timeout: Optional[float] = None, max_rate_limit_retries: int = 3,
+                 rate_limit_backoff: float = 2.0):
+        self.provider = provider
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.timeout = timeout
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.rate_limit_backoff = rate_limit_backoff
+        self._paused_until = 0.0
+
+    async def _wait_for_rate_limit(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def run_one(self, prompt: str) -> Union[str, LLMError]:
+        attempt = 0
+        while True:
+            await self._wait_for_rate_limit()
+            async with self.semaphore:
+                await self._wait_for_rate_limit()
+                try:
+                    if self.timeout:
+                        return await asyncio.wait_for(self.provider.generate_response(prompt), self.timeout)
+                    return await self.provider.generate_response(prompt)
+                except LLMError as e:
+                    return e
+                except asyncio.TimeoutError:
+                    return LLMUnavailableError(
+                        f"Fehler bei {self.provider.name}-Anfrage: Zeitüberschreitung nach {self.timeout:g}s")
+                except RateLimitExceeded as e:
+                    attempt += 1
+                    if attempt > self.max_rate_limit_retries:
+                        return LLMUnavailableError(f"Fehler bei {self.provider.name}-Anfrage: {e}")
+                    delay = e.retry_after or self.rate_limit_backoff * (2 ** (attempt - 1))
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    async def run_all(self, prompts: List[str]) -> List[Union[str, LLMError]]:
+        return list(await asyncio.gather(*(self.run_one(prompt) for prompt in prompts)))
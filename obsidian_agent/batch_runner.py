@@ -0,0 +1,151 @@
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, Optional, Tuple
+from llm_manager import is_error_response
+from tracing import tracer
+
+# Stapelverarbeitung: Jede Eingabezeile ist ein JSON-Objekt, z.B.
+#   {"id": "q1", "command": "ask", "question": "Was steht im Projektplan?"}
+#   {"command": "summarize", "search_term": "architektur"}  oder  "tags": ["projekt"]
+#   {"command": "note", "title": "Projektplan"}
+#   {"command": "connections", "topic": "datenbank"}
+#   {"command": "stats"}
+# Alle Aufträge teilen sich einen Agenten (warmer Index, Caches) und laufen
+# mit begrenzter Parallelität. Ergebnisse werden in Eingabereihenfolge als
+# JSON-Zeilen geschrieben, sobald alle vorherigen fertig sind.
+class BatchRunner:
+    def __init__(self, agent, concurrency: int = 4):
+        self.agent = agent
+        self.concurrency = max(1, concurrency)
+        self.commands: Dict[str, Callable[[Dict[str, Any]], str]] = {
+            'ask': lambda item: agent.search_and_answer(self._field(item, 'question', 'query')),
+            'summarize': lambda item: agent.summarize_notes(search_term=item.get('search_term'),
+                                                            tags=item.get('tags')),
+            'note': lambda item: agent.get_note_details(self._field(item, 'title')),
+            'connections': lambda item: agent.find_connections(self._field(item, 'topic')),
+            'stats': lambda item: agent.get_vault_statistics()
+        }
+
+    @staticmethod
+    def _field(item: Dict[str, Any], *names: str) -> str:
+        for name in names:
+            value = item.get(name)
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+        raise ValueError(f"Feld '{names[0]}' fehlt")
+
+    @staticmethod
+    def parse_lines(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                item = ValueError(f"Ungültiges JSON: {e}")
+            yield line_number, item
+
+    def run_item(self, line_number: int, item: Any) -> Dict[str, Any]:
+        record: Dict[str, Any] = {'line': line_number}
+        if isinstance(item, dict):
+            record['id'] = item.get('id', line_number)
+            record['command'] = item.get('command', 'ask')
+        started = time.perf_counter()
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not isinstance(item, dict):
+                raise ValueError("Eintrag muss ein JSON-Objekt sein")
+            handler = self.commands.get(record['command'])
+            if handler is None:
+                raise ValueError(f"Unbekannter Befehl: {record['command']}")
+            with tracer.request(record['command'], id=record['id']) as trace:
+                result = handler(item)
+            record['ok'] = not is_error_response(result)
+            record['result'] = result
+            if trace is not None:
+                record['stages'] = self._stage_totals(trace)
+                record['counters'] = trace.counters
+        except Exception as e:
+            record['ok'] = False
+            record['error'] = str(e)
+        record['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return record
+
+    @staticmethod
+    def _stage_totals(trace) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for span in trace.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return {name: round(ms, 1) for name, ms in totals.items()}
+
+    def run(self, lines: Iterable[str], output: IO[str],
+            progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        summary = {'items': 0, 'ok': 0, 'failed': 0}
+        results: Dict[int, Dict[str, Any]] = {}
+        condition = threading.Condition()
+        started = time.perf_counter()
+
+        def work(position: int, line_number: int, item: Any):
+            record = self.run_item(line_number, item)
+            with condition:
+                results[position] = record
+                condition.notify()
+
+        submitted = 0
+        written = 0
+
+        def flush():
+            nonlocal written
+            while written in results:
+                record = results.pop(written)
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                summary['items'] += 1
+                summary['ok' if record['ok'] else 'failed'] += 1
+                if progress:
+                    progress(record)
+                written += 1
+
+        # Höchstens 2x Parallelität an offenen Aufträgen, damit große Eingaben
+        # (oder stdin) nicht vollständig in den Speicher geladen werden.
+        window = self.concurrency * 2
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as executor:
+            for line_number, item in self.parse_lines(lines):
+                with condition:
+                    flush()
+                    while submitted - written >= window:
+                        condition.wait()
+                        flush()
+                executor.submit(work, submitted, line_number, item)
+                submitted += 1
+            with condition:
+                flush()
+                while written < submitted:
+                    condition.wait()
+                    flush()
+
+        summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return summary
+
+def run_batch(agent, input_path: str, output_path: Optional[str] = None, concurrency: int = 4) -> Dict[str, Any]:
+    source = sys.stdin if input_path == '-' else open(input_path, 'r', encoding='utf-8')
+    target = sys.stdout if not output_path or output_path == '-' else open(output_path, 'w', encoding='utf-8')
+    try:
+        # Index vor dem ersten Auftrag aufbauen, damit er nicht in dessen Zeit einfließt.
+        agent.vault_reader.refresh()
+        
+        def progress(record: Dict[str, Any]):
+            status = "ok" if record['ok'] else "Fehler"
+            print(f"[{record.get('id', record['line'])}] {record.get('command', '?')}: {status} "
+                  f"({record['elapsed_ms']:.0f} ms)", file=sys.stderr)
+        return BatchRunner(agent, concurrency).run(source, target, progress)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Micro-Benchmark: Parse-Durchsatz (MB/s) von scan_markdown gegenüber
+# dem bisherigen Extraktor (Titel-Schleife + zwei re.findall + set).
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from markdown_scanner import scan_markdown
+
+def legacy_extract(content: str, filename: str):
+    title = filename
+    for line in content.split('\n'):
+        line = line.strip()
+        if line.startswith('# '):
+            title = line[2:].strip()
+            break
+    tags = list(set(re.findall(r'#([a-zA-Z0-9_/-]+)', content)))
+    links = list(set(re.findall(r'\[\[([^\]]+)\]\]', content)))
+    return title, tags, links
+
+WORDS = ("notiz projekt idee meeting agent vault python obsidian analyse "
+         "zusammenfassung verbindung wissen lernen system daten").split()
+
+def make_document(rng: random.Random, index: int) -> str:
+    parts = ["---", f"tags: [bench/{index % 17}, thema{index % 5}]", f"aliases: [Doc {index}]", "---",
+             f"# Dokument {index}", ""]
+    for section in range(rng.randint(2, 6)):
+        parts.append(f"## Abschnitt {section}")
+        for _ in range(rng.randint(2, 5)):
+            words = rng.choices(WORDS, k=rng.randint(20, 60))
+            words.append(f"#tag{rng.randint(0, 50)}")
+            words.append(f"[[Dokument {rng.randint(0, 1000)}|Alias]]")
+            words.append(f"https://example.org/page#anchor{section}")
+            rng.shuffle(words)
+            parts.append(" ".join(words))
+        if rng.random() < 0.3:
+            parts.extend(["```python", "# kommentar #kein_tag", "x = [[1]]", "```"])
+        parts.append("")
+    return "\n".join(parts)
+
+def run(label, extract, documents, total_mb, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for index, document in enumerate(documents):
+            extract(document, f"doc{index}")
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<22} {best * 1000:9.1f} ms   {total_mb / best:8.2f} MB/s")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown-Scanner Micro-Benchmark")
+    parser.add_argument("--size-mb", type=float, default=5.0, help="Textmenge in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen (bester Lauf zählt)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = []
+    total_bytes = 0
+    while total_bytes < args.size_mb * 1024 * 1024:
+        document = make_document(rng, len(documents))
+        documents.append(document)
+        total_bytes += len(document.encode('utf-8'))
+    total_mb = total_bytes / (1024 * 1024)
+
+    print(f"{len(documents)} Dokumente, {total_mb:.2f} MB")
+    legacy = run("legacy (3 Durchläufe)", legacy_extract, documents, total_mb, args.repeat)
+    single = run("scan_markdown", scan_markdown, documents, total_mb, args.repeat)
+    print(f"Faktor: {legacy / single:.2f}x")
+
+    legacy_tags = sum(len(legacy_extract(d, "")[1]) for d in documents)
+    scanner_tags = sum(len(scan_markdown(d, "").tags) for d in documents)
+    print(f"Extrahierte Tags: legacy {legacy_tags}, scan_markdown {scanner_tags} "
+          f"(ohne URL-Anker und Code-Blöcke)")
+
+if __name__ == "__main__":
+    main()
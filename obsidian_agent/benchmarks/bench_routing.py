@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# Routing-Benchmark mit mehreren Fake-Ollama-Servern: Haupt-Backend mit
+# Ausreißern, zweites Backend ohne, kleines Modell für kurze Prompts und ein
+# nicht erreichbares Backend. Misst Latenz-Perzentile ohne und mit Hedging,
+# das Ausweichen bei Ausfall und wohin kurze Prompts geroutet werden.
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(AGENT_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_ollama import start_fake_ollama
+from llm_manager import LLMManager
+from tracing import percentile
+
+DEAD_URL = "http://127.0.0.1:9"
+
+def backend(url: str) -> Dict[str, Any]:
+    return {'base_url': url, 'model': 'fake', 'max_retries': 0, 'keep_alive': None}
+
+def create_manager(primary: str, backends: List[Dict[str, Any]], **routing) -> LLMManager:
+    return LLMManager({
+        'provider': 'ollama',
+        'config': backend(primary),
+        'cache': {'enabled': False},
+        'routing': dict(routing, enabled=True, backends=[
+            {'name': entry['name'], 'provider': 'ollama', 'small': entry.get('small', False),
+             'config': backend(entry['url'])} for entry in backends
+        ])
+    })
+
+def measure(manager: LLMManager, requests: int, prompt_chars: int) -> Dict[str, Any]:
+    latencies = []
+    failures = 0
+    for i in range(requests):
+        start = time.perf_counter()
+        response = manager.generate_response(f"{i} " + "x" * prompt_chars, use_cache=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        failures += response.startswith("Fehler")
+    return {
+        'requests': requests,
+        'failures': failures,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(max(latencies), 1),
+        'backends': {name: row['requests'] for name, row in manager.backend_stats().items()}
+    }
+
+def run(args) -> Dict[str, Any]:
+    main_server = start_fake_ollama(latency=args.latency, tail_latency=args.tail_latency,
+                                    tail_fraction=args.tail_fraction, seed=args.seed)
+    second_server = start_fake_ollama(latency=args.latency * 1.5)
+    small_server = start_fake_ollama(latency=args.latency / 5)
+    second = {'name': 'zweit', 'url': second_server.url}
+    small = {'name': 'klein', 'url': small_server.url, 'small': True}
+    long_chars = args.prompt_tokens * 4
+    report: Dict[str, Any] = {'meta': {
+        'requests': args.requests, 'latency_s': args.latency, 'tail_latency_s': args.tail_latency,
+        'tail_fraction': args.tail_fraction, 'hedge_percentile': args.hedge_percentile
+    }}
+
+    for name, hedge in (("ohne_hedging", False), ("mit_hedging", True)):
+        manager = create_manager(main_server.url, [second], hedge=hedge, hedge_percentile=args.hedge_percentile,
+                                 hedge_min_ms=args.latency * 1000, hedge_initial_ms=args.tail_latency * 500)
+        try:
+            report[name] = measure(manager, args.requests, long_chars)
+        finally:
+            manager.close()
+        print(f"{name:<14} p50 {report[name]['p50_ms']:8.1f} ms  p99 {report[name]['p99_ms']:8.1f} ms", file=sys.stderr)
+
+    # Haupt-Backend nicht erreichbar: erste Anfrage weicht aus, danach Pause.
+    manager = create_manager(DEAD_URL, [second], cooldown=60)
+    try:
+        report['ausfall'] = measure(manager, max(10, args.requests // 10), long_chars)
+    finally:
+        manager.close()
+    print(f"{'ausfall':<14} p50 {report['ausfall']['p50_ms']:8.1f} ms  max {report['ausfall']['max_ms']:8.1f} ms",
+          file=sys.stderr)
+
+    manager = create_manager(main_server.url, [second, small])
+    try:
+        report['kurze_prompts'] = measure(manager, max(10, args.requests // 10), 40)
+        report['kurze_prompts']['test_connection'] = manager.test_connection()
+    finally:
+        manager.close()
+    print(f"{'kurze_prompts':<14} p50 {report['kurze_prompts']['p50_ms']:8.1f} ms  "
+          f"{report['kurze_prompts']['backends']}", file=sys.stderr)
+
+    for server in (main_server, second_server, small_server):
+        server.shutdown()
+        server.server_close()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Routing-Benchmark (mehrere Fake-Ollama-Server)")
+    parser.add_argument("--requests", type=int, default=200, help="Anfragen pro Messung")
+    parser.add_argument("--latency", type=float, default=0.05, help="Sekunden pro Antwort (Haupt-Backend)")
+    parser.add_argument("--tail-latency", type=float, default=1.0, help="Sekunden bei Ausreißern")
+    parser.add_argument("--tail-fraction", type=float, default=0.02, help="Anteil der Ausreißer (0-1)")
+    parser.add_argument("--hedge-percentile", type=float, default=90)
+    parser.add_argument("--prompt-tokens", type=int, default=500, help="Länge der langen Prompts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON-Datei (Standard: stdout)")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
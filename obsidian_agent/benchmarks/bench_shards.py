@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Vergleicht einen großen Vault mit derselben Notizmenge, verteilt auf mehrere
+# Vaults (Shards): Start (kalt/warm), Volltextsuche, Tag-Suche und Statistik.
+# Optional bleibt der letzte Shard "lazy" und wird erst bei Bedarf geladen.
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from vault_generator import generate_vault
+
+from sharded_vault import create_vault_reader
+
+QUERIES = ["projekt planung", "architektur datenbank", "notiz"]
+
+def timed(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    runs: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {'first_ms': round(runs[0] * 1000, 3), 'median_ms': round(statistics.median(runs) * 1000, 3)}
+
+def measure_layout(shards: List[Dict[str, Any]], repeat: int, workers: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    readers = []
+
+    def start():
+        reader = create_vault_reader(shards, use_cache=True, scan_workers=workers)
+        reader.note_count()
+        readers.append(reader)
+
+    # Erster Lauf baut die Caches auf (kalt), die weiteren lesen sie (warm).
+    results['start'] = timed(start, repeat)
+    reader = readers.pop()
+    for other in readers:
+        other.close()
+    results['notes_loaded'] = reader.note_count()
+    results['search'] = timed(lambda: [reader.search_notes(query, top_k=20) for query in QUERIES], repeat)
+    results['tags'] = timed(lambda: reader.search_by_tags(["projekt"]), repeat)
+    results['stats'] = timed(lambda: reader.get_statistics(), repeat)
+    results['notes_total'] = reader.note_count()
+    reader.close()
+    return results
+
+def run(args) -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix="bench_shards_"))
+    try:
+        per_shard = args.notes // args.shards
+        single = work / "single"
+        generate_vault(str(single), per_shard * args.shards, seed=args.seed)
+        shards = []
+        for i in range(args.shards):
+            path = work / f"shard{i}"
+            generate_vault(str(path), per_shard, seed=args.seed + i)
+            shards.append({'name': f"shard{i}", 'path': str(path), 'cache_path': None,
+                           'lazy': args.lazy_last and i == args.shards - 1})
+
+        report: Dict[str, Any] = {'meta': {'notes': per_shard * args.shards, 'shards': args.shards,
+                                           'lazy_last': args.lazy_last, 'repeat': args.repeat}}
+        layouts = (("ein_vault", [{'name': "single", 'path': str(single), 'cache_path': None, 'lazy': False}]),
+                   ("shards", shards))
+        for name, layout in layouts:
+            report[name] = measure_layout(layout, args.repeat, args.workers)
+            row = report[name]
+            print(f"{name:<10} start kalt {row['start']['first_ms']:9.1f} ms  warm {row['start']['median_ms']:9.1f} ms  "
+                  f"suche {row['search']['median_ms']:8.1f} ms  stats {row['stats']['median_ms']:8.1f} ms",
+                  file=sys.stderr)
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: ein Vault gegen mehrere Shards")
+    parser.add_argument("--notes", type=int, default=6000, help="Notizen insgesamt")
+    parser.add_argument("--shards", type=int, default=3, help="Anzahl Shards")
+    parser.add_argument("--lazy-last", action="store_true", help="Letzten Shard erst bei Bedarf laden")
+    parser.add_argument("--workers", type=int, default=4, help="Scan-Worker pro Vault")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Messung")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON-Datei (Standard: stdout)")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
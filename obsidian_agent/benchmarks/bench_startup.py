@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Startzeit-Benchmark: misst Importzeiten der Module (python -X importtime),
+# die Zeit bis zum Eingabe-Prompt der CLI und bis zur ersten beantworteten
+# Anfrage ('stats', d.h. Index fertig). Mit --max-prompt-ms schlägt der Lauf
+# fehl, wenn der Prompt zu spät erscheint (z.B. als Regressionstest).
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+CLI = AGENT_DIR / "cli_chatbot.py"
+PROMPT = "Deine Frage:".encode('utf-8')
+MODULES = ("obsidian_agent", "cli_chatbot", "query_client", "llm_manager", "vault_reader", "config_manager")
+
+def import_times(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=AGENT_DIR, capture_output=True, text=True, check=True)
+    entries = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            self_ms, cumulative_ms = int(self_us) / 1000, int(cumulative_us) / 1000
+        except ValueError:
+            continue
+        entries.append((name.strip(), self_ms))
+        if name.strip() == module:
+            total = cumulative_ms
+    heaviest = sorted(entries, key=lambda entry: -entry[1])[:10]
+    return total, [(name, round(ms, 2)) for name, ms in heaviest]
+
+def read_until(process: subprocess.Popen, marker: bytes, timeout: float) -> float:
+    start = time.perf_counter()
+    seen = b""
+    while marker not in seen:
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError(f"{marker!r} nicht innerhalb von {timeout}s erschienen")
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError(f"CLI beendet ohne {marker!r}: {seen.decode('utf-8', 'replace')[-500:]}")
+        seen += chunk
+    return time.perf_counter()
+
+def cli_startup(args: List[str]) -> Dict[str, float]:
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(CLI)] + args, cwd=AGENT_DIR,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    try:
+        prompt = read_until(process, PROMPT, 30)
+        process.stdin.write(b"stats\n")
+        process.stdin.flush()
+        answered = read_until(process, b"Gesamt Notizen", 300)
+        process.stdin.write(b"exit\n")
+        process.stdin.flush()
+        process.wait(timeout=30)
+    finally:
+        if process.poll() is None:
+            process.kill()
+    return {'prompt_ms': (prompt - start) * 1000, 'first_stats_ms': (answered - start) * 1000}
+
+def interpreter_startup() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) * 1000
+
+def summarize(runs: List[float]) -> Dict[str, float]:
+    return {'min_ms': round(min(runs), 1), 'median_ms': round(statistics.median(runs), 1),
+            'max_ms': round(max(runs), 1)}
+
+def run(args) -> Dict[str, Any]:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from bench_suite import write_config
+    from vault_generator import generate_vault
+
+    work = Path(tempfile.mkdtemp(prefix="obsidian_startup_"))
+    try:
+        vault = Path(args.vault) if args.vault else work / "vault"
+        if not vault.exists():
+            generate_vault(str(vault), args.notes, args.seed)
+        config_path = work / "config.yaml"
+        # Kein LLM-Aufruf nötig: 'stats' nutzt nur den Index.
+        write_config(config_path, vault, work, work / "scan_cache.sqlite", "http://127.0.0.1:9", 4)
+
+        report: Dict[str, Any] = {
+            'meta': {'python': sys.version.split()[0], 'notes': args.notes, 'repeat': args.repeat},
+            'interpreter': summarize([interpreter_startup() for _ in range(args.repeat)]),
+            'imports': {}
+        }
+        for module in MODULES:
+            totals = []
+            for _ in range(args.repeat):
+                total, heaviest = import_times(module)
+                totals.append(total)
+            report['imports'][module] = dict(summarize(totals), heaviest=heaviest)
+            print(f"import {module:<20} median {statistics.median(totals):8.1f} ms", file=sys.stderr)
+
+        # Erster Lauf ohne Parse-Cache (kalt), danach warm.
+        runs = [cli_startup(["--config", str(config_path)]) for _ in range(args.repeat + 1)]
+        report['cli_cold'] = {key: round(value, 1) for key, value in runs[0].items()}
+        report['cli_warm'] = {key: summarize([r[key] for r in runs[1:]]) for key in runs[0]}
+        print(f"CLI-Prompt (warm) median {report['cli_warm']['prompt_ms']['median_ms']:8.1f} ms, "
+              f"erste Antwort {report['cli_warm']['first_stats_ms']['median_ms']:8.1f} ms", file=sys.stderr)
+        return report
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Startzeit-Benchmark für den Obsidian Agent")
+    parser.add_argument("--notes", type=int, default=2000, help="Notizen im synthetischen Vault")
+    parser.add_argument("--vault", help="Vorhandenen Vault nutzen (bzw. hier erzeugen)")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen pro Messung")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-prompt-ms", type=float, help="Fehlschlagen, wenn der Prompt (warm, Median) länger braucht")
+    parser.add_argument("--output", help="JSON-Datei (Standard: stdout)")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+    else:
+        print(output)
+    if args.max_prompt_ms is not None and report['cli_warm']['prompt_ms']['median_ms'] > args.max_prompt_ms:
+        print(f"❌ Prompt nach {report['cli_warm']['prompt_ms']['median_ms']} ms "
+              f"(Grenze {args.max_prompt_ms} ms)", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
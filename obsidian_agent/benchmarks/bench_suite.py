@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# Benchmark-Suite: erzeugt (oder nutzt) einen synthetischen Vault, startet einen
+# Fake-Ollama-Server und misst Vault-Scan, Suchen, Statistiken und alle
+# Agent-Operationen Ende-zu-Ende. Ergebnis ist JSON, um Versionen und
+# Hardware vergleichen zu können.
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yaml
+
+from fake_ollama import start_fake_ollama
+from vault_generator import generate_vault, note_title
+
+from obsidian_agent import ObsidianAgent
+from vault_reader import VaultReader
+
+def measure(results: Dict[str, Any], name: str, fn: Callable[[], Any], repeat: int):
+    runs: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    results[name] = {
+        'first_ms': round(runs[0] * 1000, 3),
+        'min_ms': round(min(runs) * 1000, 3),
+        'median_ms': round(statistics.median(runs) * 1000, 3),
+        'max_ms': round(max(runs) * 1000, 3),
+        'runs': repeat
+    }
+    print(f"{name:<32} erster {runs[0] * 1000:10.1f} ms   median {statistics.median(runs) * 1000:10.1f} ms",
+          file=sys.stderr)
+
+def first_chunk(chunks) -> str:
+    try:
+        return next(chunks, "")
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def git_version() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def max_rss_mb() -> float:
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+    except ImportError:
+        return 0.0
+
+def write_config(path: Path, vault: Path, work: Path, cache_path: Path, server_url: str, concurrency: int):
+    config = {
+        'vault': {
+            'path': str(vault),
+            'cache': True,
+            'cache_path': str(cache_path),
+            'watch': False,
+            'scan_workers': os.cpu_count() or 4
+        },
+        'llm': {
+            'provider': 'ollama',
+            # Jede Operation soll den Server erreichen.
+            'cache': {'enabled': False},
+            'concurrency': {'max_concurrency': concurrency},
+            'ollama': {'base_url': server_url, 'model': 'fake', 'context_tokens': 4096}
+        },
+        'agent': {
+            'max_notes_per_query': 10,
+            'summary_cache_path': str(work / "summaries.sqlite")
+        }
+    }
+    path.write_text(yaml.safe_dump(config, allow_unicode=True), encoding='utf-8')
+
+def run_suite(args) -> Dict[str, Any]:
+    work = Path(tempfile.mkdtemp(prefix="obsidian_bench_"))
+    vault = Path(args.vault) if args.vault else work / "vault"
+    results: Dict[str, Any] = {}
+    report: Dict[str, Any] = {
+        'meta': {
+            'version': git_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': args.repeat,
+            'latency_s': args.latency,
+            'token_delay_s': args.token_delay
+        },
+        'results': results
+    }
+
+    try:
+        if not args.vault or not vault.exists():
+            print(f"Erzeuge Vault mit {args.notes} Notizen in {vault} ...", file=sys.stderr)
+            report['vault'] = generate_vault(str(vault), args.notes, args.seed)
+        else:
+            report['vault'] = {'path': str(vault), 'notes': sum(1 for _ in vault.rglob("*.md"))}
+
+        # Vault lesen: kalt (leerer Parse-Cache) und warm (Cache vorhanden).
+        cache_path = work / "scan_cache.sqlite"
+        def cold_scan():
+            if cache_path.exists():
+                cache_path.unlink()
+            reader = VaultReader(str(vault), cache_path=str(cache_path))
+            reader.get_all_notes()
+            reader.close()
+        measure(results, "vault_scan_cold", cold_scan, 1)
+        def warm_scan():
+            reader = VaultReader(str(vault), cache_path=str(cache_path))
+            reader.get_all_notes()
+            reader.close()
+        measure(results, "vault_scan_warm", warm_scan, args.repeat)
+
+        reader = VaultReader(str(vault), cache_path=str(cache_path))
+        reader.get_all_notes()
+        title = note_title(0)
+        measure(results, "refresh_unchanged", reader.refresh, args.repeat)
+        measure(results, "get_all_notes", reader.get_all_notes, args.repeat)
+        measure(results, "search_title", lambda: reader.search_notes("projekt", "title", top_k=10), args.repeat)
+        measure(results, "search_content", lambda: reader.search_notes("projekt analyse", "content", top_k=10), args.repeat)
+        measure(results, "search_both", lambda: reader.search_notes("server datenbank", "both", top_k=10), args.repeat)
+        measure(results, "search_phrase", lambda: reader.search_notes('"kunde angebot"', "content", top_k=10), args.repeat)
+        measure(results, "search_by_tags", lambda: reader.search_by_tags(["projekt"]), args.repeat)
+        measure(results, "get_note_by_title", lambda: reader.get_note_by_title(title), args.repeat)
+        measure(results, "get_linked_notes", lambda: reader.get_linked_notes(title), args.repeat)
+        measure(results, "get_neighborhood_2", lambda: reader.get_neighborhood(title, hops=2), args.repeat)
+        measure(results, "get_central_notes", lambda: reader.get_central_notes(10), args.repeat)
+        reader.close()
+
+        server = start_fake_ollama(latency=args.latency, token_delay=args.token_delay)
+        config_path = work / "config.yaml"
+        write_config(config_path, vault, work, cache_path, server.url, args.concurrency)
+
+        agents = []
+        def init_agent():
+            agents.append(ObsidianAgent(str(config_path)))
+            agents[-1].vault_reader.get_all_notes()
+        measure(results, "agent_init_warm", init_agent, 1)
+        agent = agents[0]
+
+        measure(results, "get_vault_statistics", agent.get_vault_statistics, args.repeat)
+        measure(results, "search_and_answer", lambda: agent.search_and_answer("Wie ist die Planung für das Projekt?"), args.repeat)
+        measure(results, "search_and_answer_first_chunk",
+                lambda: first_chunk(agent.search_and_answer("Welche Risiken gibt es im Budget?", stream=True)),
+                args.repeat)
+        measure(results, "summarize_search_term", lambda: agent.summarize_notes(search_term="architektur"), args.repeat)
+        measure(results, "summarize_tags", lambda: agent.summarize_notes(tags=["projekt"]), args.repeat)
+        measure(results, "get_note_details", lambda: agent.get_note_details(title), args.repeat)
+        measure(results, "find_connections", lambda: agent.find_connections("datenbank"), args.repeat)
+        if report['vault']['notes'] <= args.vault_summary_limit:
+            # Erster Lauf fasst jede Notiz zusammen, weitere nutzen die gespeicherten Zusammenfassungen.
+            measure(results, "summarize_vault", agent.summarize_notes, args.repeat)
+        else:
+            print(f"summarize_vault übersprungen (> {args.vault_summary_limit} Notizen)", file=sys.stderr)
+        agent.close()
+
+        report['server'] = {'requests': server.requests, 'prompt_chars': server.prompt_chars}
+        server.shutdown()
+        report['meta']['max_rss_mb'] = max_rss_mb()
+        return report
+    finally:
+        if not args.keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark-Suite für den Obsidian Agent")
+    parser.add_argument("--notes", type=int, default=1000, help="Notizen im synthetischen Vault")
+    parser.add_argument("--vault", help="Vorhandenen Vault nutzen (bzw. hier erzeugen)")
+    parser.add_argument("--repeat", type=int, default=3, help="Wiederholungen pro Messung")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latenz des Fake-Servers in Sekunden")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Sekunden pro gestreamtem Token")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallele LLM-Anfragen")
+    parser.add_argument("--vault-summary-limit", type=int, default=5000,
+                        help="summarize_vault nur bis zu dieser Notizanzahl messen")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON-Datei (Standard: stdout)")
+    parser.add_argument("--keep", action="store_true", help="Temporäre Dateien behalten")
+    args = parser.parse_args()
+
+    report = run_suite(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding='utf-8')
+        print(f"Ergebnis gespeichert: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
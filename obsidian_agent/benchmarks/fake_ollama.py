@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Lokaler Ersatz für einen Ollama-Server: beantwortet /api/generate und
+# /api/chat (mit und ohne Streaming) nach einer einstellbaren Latenz, ohne ein
+# Modell zu laden. Damit lassen sich Agent-Operationen Ende-zu-Ende messen.
+# Optional mit Ausreißern (tail_fraction der Anfragen dauern tail_latency)
+# und Fehlern (error_rate der Anfragen enden mit 503), z.B. für das Routing.
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: dict):
+        line = (json.dumps(data) + "\n").encode('utf-8')
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {'models': [{'name': 'fake'}]})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {'error': 'invalid json'})
+            return
+        if self.path not in ("/api/generate", "/api/chat"):
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.prompt_chars += len(json.dumps(request.get('prompt') or request.get('messages') or ""))
+            failed = server.random.random() < server.error_rate
+            slow = server.random.random() < server.tail_fraction
+
+        if failed:
+            with server.lock:
+                server.errors += 1
+            self._send_json(503, {'error': 'server overloaded'})
+            return
+
+        words = server.reply.split()
+        chat = self.path == "/api/chat"
+        time.sleep(server.tail_latency if slow else server.latency)
+
+        def message(text: str, done: bool) -> dict:
+            data = {'model': request.get('model', 'fake'), 'done': done}
+            if chat:
+                data['message'] = {'role': 'assistant', 'content': text}
+            else:
+                data['response'] = text
+            if done and not chat:
+                data['context'] = [1, 2, 3]
+            return data
+
+        if not request.get('stream', True):
+            time.sleep(server.token_delay * len(words))
+            self._send_json(200, message(" ".join(words), True))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                time.sleep(server.token_delay)
+                self._send_chunk(message(word if i == 0 else f" {word}", False))
+            self._send_chunk(message("", True))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hat den Stream vorzeitig beendet (z.B. Messung bis zum ersten Token).
+            self.close_connection = True
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: float = 0.05, token_delay: float = 0.0,
+                 reply: str = "Dies ist eine synthetische Antwort des Benchmark-Servers.",
+                 tail_latency: float = 0.0, tail_fraction: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        super().__init__(address, FakeOllamaHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.reply = reply
+        self.tail_latency = tail_latency
+        self.tail_fraction = tail_fraction
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.prompt_chars = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_fake_ollama(port: int = 0, latency: float = 0.05, token_delay: float = 0.0, **options) -> FakeOllamaServer:
+    server = FakeOllamaServer(("127.0.0.1", port), latency, token_delay, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake-Ollama-Server für Benchmarks")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.05, help="Sekunden bis zum ersten Token")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Sekunden pro Token")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="Sekunden bei Ausreißern")
+    parser.add_argument("--tail-fraction", type=float, default=0.0, help="Anteil der Ausreißer (0-1)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil der Anfragen mit 503 (0-1)")
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(("127.0.0.1", args.port), args.latency, args.token_delay,
+                              tail_latency=args.tail_latency, tail_fraction=args.tail_fraction,
+                              error_rate=args.error_rate)
+    print(f"Fake-Ollama läuft auf {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# Erzeugt einen synthetischen Obsidian-Vault für Benchmarks: verschachtelte
+# Ordner, Frontmatter mit Tags/Aliases, Überschriften, Inline-Tags und
+# Wikilinks. Tags und Linkziele sind Zipf-verteilt (wenige sehr häufige,
+# viele seltene), ein Teil der Links zeigt auf nicht existierende Notizen.
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List
+
+WORDS = ("notiz projekt idee meeting agent vault python obsidian analyse zusammenfassung "
+         "verbindung wissen lernen system daten modell kunde angebot rechnung termin "
+         "architektur server datenbank api test release planung ziel risiko budget team "
+         "review feedback prozess dokumentation recherche quelle artikel buch kapitel").split()
+
+TAG_ROOTS = ("projekt", "bereich", "thema", "status", "typ", "person", "ort", "quelle")
+
+def zipf_index(rng: random.Random, size: int, exponent: float = 1.1) -> int:
+    # Inverse Transformation einer stetigen Potenzverteilung, gerundet auf 0..size-1.
+    u = rng.random()
+    if exponent == 1.0:
+        value = size ** u
+    else:
+        value = ((size ** (1 - exponent) - 1) * u + 1) ** (1 / (1 - exponent))
+    return min(size - 1, int(value) - 1)
+
+def note_title(index: int) -> str:
+    return f"Notiz {index:06d}"
+
+def tag_name(index: int) -> str:
+    root = TAG_ROOTS[index % len(TAG_ROOTS)]
+    return f"{root}/{index // len(TAG_ROOTS)}" if index >= len(TAG_ROOTS) else root
+
+def folder_for(rng: random.Random, folders: List[str]) -> str:
+    return folders[zipf_index(rng, len(folders), 0.8)]
+
+def make_folders(rng: random.Random, count: int, max_depth: int) -> List[str]:
+    folders = [""]
+    while len(folders) < count:
+        parent = rng.choice(folders)
+        if parent.count("/") + 1 >= max_depth:
+            continue
+        name = f"{rng.choice(WORDS).capitalize()} {len(folders)}"
+        folders.append(f"{parent}/{name}" if parent else name)
+    return folders
+
+def make_note(rng: random.Random, index: int, notes: int, tags: int, missing_links: float) -> str:
+    parts = []
+    note_tags = {tag_name(zipf_index(rng, tags)) for _ in range(rng.randint(0, 4))}
+    if rng.random() < 0.7:
+        parts.append("---")
+        if note_tags:
+            parts.append(f"tags: [{', '.join(sorted(note_tags))}]")
+        if rng.random() < 0.2:
+            parts.append(f"aliases: [N{index}]")
+        parts.append(f"erstellt: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        parts.append("---")
+        note_tags = set()
+    parts.append(f"# {note_title(index)}")
+    parts.append("")
+
+    for section in range(rng.randint(1, 6)):
+        parts.append(f"{'#' * rng.choice((2, 2, 3))} {rng.choice(WORDS).capitalize()} {section}")
+        for _ in range(rng.randint(1, 4)):
+            words = rng.choices(WORDS, k=rng.randint(15, 70))
+            for _ in range(rng.randint(0, 3)):
+                if rng.random() < missing_links:
+                    target = f"Fehlt {rng.randint(0, notes)}"
+                else:
+                    # Beliebte Notizen werden häufiger verlinkt (Zipf über den Index).
+                    target = note_title(zipf_index(rng, notes))
+                suffix = rng.choice(("", "", "|Alias", "#Abschnitt"))
+                words.insert(rng.randrange(len(words) + 1), f"[[{target}{suffix}]]")
+            if note_tags:
+                words.insert(rng.randrange(len(words) + 1), f"#{note_tags.pop()}")
+            parts.append(" ".join(words))
+        if rng.random() < 0.1:
+            parts.extend(["```python", "# kein_tag [[kein_link]]", "x = 1", "```"])
+        parts.append("")
+    return "\n".join(parts)
+
+def generate_vault(path: str, notes: int = 1000, seed: int = 42, folders: int = 0,
+                   max_depth: int = 4, tags: int = 0, missing_links: float = 0.05) -> Dict[str, float]:
+    rng = random.Random(seed)
+    root = Path(path)
+    root.mkdir(parents=True, exist_ok=True)
+    folders = folders or max(1, notes // 50)
+    tags = tags or max(len(TAG_ROOTS), notes // 20)
+    folder_list = make_folders(rng, folders, max_depth)
+    for folder in folder_list[1:]:
+        (root / folder).mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    total_bytes = 0
+    for index in range(notes):
+        content = make_note(rng, index, notes, tags, missing_links)
+        folder = folder_for(rng, folder_list)
+        file_path = root / folder / f"{note_title(index)}.md"
+        data = content.encode('utf-8')
+        file_path.write_bytes(data)
+        total_bytes += len(data)
+
+    return {
+        'notes': notes,
+        'folders': len(folder_list),
+        'tags': tags,
+        'bytes': total_bytes,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetischen Obsidian-Vault erzeugen")
+    parser.add_argument("path", help="Zielordner")
+    parser.add_argument("--notes", type=int, default=1000, help="Anzahl Notizen")
+    parser.add_argument("--folders", type=int, default=0, help="Anzahl Ordner (0 = Notizen/50)")
+    parser.add_argument("--max-depth", type=int, default=4, help="Maximale Ordnertiefe")
+    parser.add_argument("--tags", type=int, default=0, help="Anzahl verschiedener Tags (0 = Notizen/20)")
+    parser.add_argument("--missing-links", type=float, default=0.05, help="Anteil Links ins Leere")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    info = generate_vault(args.path, args.notes, args.seed, args.folders, args.max_depth,
+                          args.tags, args.missing_links)
+    print(json.dumps(info, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+from markdown_scanner import FRONTMATTER_PATTERN
+from search_index import SearchIndex
+
+if TYPE_CHECKING:
+    from vault_reader import Note
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t#]*$')
+FENCE_PATTERN = re.compile(r'^[ \t]*(```|~~~)')
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+@dataclass(frozen=True)
+class Passage:
+    passage_id: str
+    note_title: str
+    file_path: str
+    heading: str
+    text: str
+    position: int
+
+def _passage_id(file_path: str, heading: str, text: str) -> str:
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"{file_path}\0{heading}\0{text}".encode('utf-8'))
+    return digest.hexdigest()
+
+def _split_long(paragraph: str, max_chars: int) -> List[str]:
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+    pieces = []
+    current = ""
+    for sentence in SENTENCE_PATTERN.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _sections(content: str) -> List[Tuple[str, List[str]]]:
+    match = FRONTMATTER_PATTERN.match(content)
+    if match:
+        content = content[match.end():]
+
+    sections: List[Tuple[str, List[str]]] = []
+    headings: List[Tuple[int, str]] = []
+    paragraphs: List[str] = []
+    lines: List[str] = []
+    in_fence = False
+
+    def close_paragraph():
+        text = "\n".join(lines).strip()
+        if text:
+            paragraphs.append(text)
+        lines.clear()
+
+    def close_section():
+        close_paragraph()
+        if paragraphs:
+            sections.append((" › ".join(title for _, title in headings), list(paragraphs)))
+        paragraphs.clear()
+
+    for line in content.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            lines.append(line)
+            continue
+        if not in_fence:
+            heading = HEADING_PATTERN.match(line)
+            if heading:
+                close_section()
+                level = len(heading.group(1))
+                headings[:] = [h for h in headings if h[0] < level]
+                headings.append((level, heading.group(2)))
+                continue
+            if not line.strip():
+                close_paragraph()
+                continue
+        lines.append(line)
+    close_section()
+    return sections
+
+# Zerlegt eine Notiz entlang von Überschriften und Absätzen in Passagen von
+# höchstens max_chars Zeichen; kurze Absätze eines Abschnitts werden gebündelt.
+def chunk_note(title: str, file_path: str, content: str, max_chars: int = 800) -> List[Passage]:
+    passages: List[Passage] = []
+    seen_ids: Dict[str, int] = {}
+
+    def emit(heading: str, text: str):
+        passage_id = _passage_id(file_path, heading, text)
+        if passage_id in seen_ids:
+            seen_ids[passage_id] += 1
+            passage_id = f"{passage_id}-{seen_ids[passage_id]}"
+        else:
+            seen_ids[passage_id] = 0
+        passages.append(Passage(passage_id, title, file_path, heading, text, len(passages)))
+
+    for heading, paragraphs in _sections(content):
+        if heading == title:
+            heading = ""
+        elif heading.startswith(f"{title} › "):
+            heading = heading[len(title) + 3:]
+        current = ""
+        for paragraph in paragraphs:
+            for piece in _split_long(paragraph, max_chars):
+                if current and len(current) + 2 + len(piece) > max_chars:
+                    emit(heading, current)
+                    current = piece
+                else:
+                    current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            emit(heading, current)
+    return passages
+
+# Passagen-Cache je Notiz, Schlüssel ist der Hash des Inhalts: neu zerlegt wird
+# nur, wenn sich die Notiz geändert hat.
+class ChunkCache:
+    def __init__(self, max_chars: int = 800, max_notes: int = 4096):
+        self.max_chars = max_chars
+        self.max_notes = max_notes
+        self._entries: "OrderedDict[str, Tuple[str, List[Passage]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def passages(self, note: 'Note') -> List[Passage]:
+        content = note.content
+        content_hash = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        with self._lock:
+            entry = self._entries.get(note.file_path)
+            if entry is not None and entry[0] == content_hash:
+                self._entries.move_to_end(note.file_path)
+                return entry[1]
+
+        passages = chunk_note(note.title, note.file_path, content, self.max_chars)
+        with self._lock:
+            self._entries[note.file_path] = (content_hash, passages)
+            self._entries.move_to_end(note.file_path)
+            while len(self._entries) > self.max_notes:
+                self._entries.popitem(last=False)
+        return passages
+
+    def rank(self, query: str, notes: List['Note'], top_k: int) -> List[Tuple[Passage, float]]:
+        candidates: List[Passage] = []
+        for note in notes:
+            candidates.extend(self.passages(note))
+        if not candidates:
+            return []
+
+        titles = [f"{passage.note_title} {passage.heading}" for passage in candidates]
+        index = SearchIndex(lambda i, field: titles[i] if field == "title" else candidates[i].text)
+        for i, passage in enumerate(candidates):
+            index.add(i, titles[i], passage.text)
+        ranked = [(candidates[i], score) for i, score in index.search(query, "both", top_k)]
+
+        if not ranked:
+            # Kein Begriff trifft eine Passage (z.B. nur Titeltreffer): jeweils
+            # die erste Passage der Notizen verwenden.
+            first = {}
+            for passage in candidates:
+                first.setdefault(passage.file_path, passage)
+            ranked = [(passage, 0.0) for passage in list(first.values())[:top_k]]
+        return ranked
+
+    def discard(self, file_paths: List[str]):
+        with self._lock:
+            for file_path in file_paths:
+                self._entries.pop(file_path, None)
@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
+import argparse
 import sys
 import os
+import threading
 from pathlib import Path
-from obsidian_agent import ObsidianAgent
-from config_manager import ConfigManager
+from typing import Iterator
 
 class ObsidianCLI:
-    def __init__(self):
+    def __init__(self, config_path: str = None, server_address: str = None):
+        self.config_path = config_path or str(Path(__file__).parent / "config.yaml")
+        self.server_address = server_address
         self.agent = None
         self.running = True
+        self._init_thread = None
+        self._init_error = None
         self.commands = {
             'help': self.show_help,
             'exit': self.exit_app,
@@ -16,25 +21,56 @@ class ObsidianCLI:
             'stats': self.show_stats,
             'config': self.show_config,
             'test': self.test_connection,
+            'perf': self.show_perf,
             'summarize': self.summarize_command,
             'note': self.note_details_command,
             'connections': self.connections_command,
+            'new': self.new_conversation,
             'clear': self.clear_screen
         }
     
     def initialize_agent(self):
+        if self.server_address:
+            return self.connect_agent()
+        # Agent im Hintergrund laden (Importe, Konfiguration, Index), damit der
+        # Prompt sofort erscheint; die erste Anfrage wartet bei Bedarf darauf.
+        self._init_thread = threading.Thread(target=self._load_agent, name="agent-init", daemon=True)
+        self._init_thread.start()
+        return True
+    
+    def _load_agent(self):
         try:
-            config_path = Path(__file__).parent / "config.yaml"
-            self.agent = ObsidianAgent(str(config_path))
-            print("✅ Obsidian Agent erfolgreich initialisiert!")
-            return True
+            from obsidian_agent import ObsidianAgent
+            self.agent = ObsidianAgent(self.config_path)
+            self.agent.warm_up()
         except Exception as e:
-            print(f"❌ Fehler beim Initialisieren des Agents: {e}")
-            print("\n💡 Tipps:")
-            print("1. Überprüfe deine config.yaml Datei")
-            print("2. Stelle sicher, dass der Vault-Pfad korrekt ist")
-            print("3. Bei Ollama: Stelle sicher, dass Ollama läuft")
+            self._init_error = e
+    
+    def ensure_agent(self) -> bool:
+        if self._init_thread is not None:
+            self._init_thread.join()
+            self._init_thread = None
+            if self._init_error is not None:
+                print(f"\n❌ Fehler beim Initialisieren des Agents: {self._init_error}")
+                print("\n💡 Tipps:")
+                print("1. Überprüfe deine config.yaml Datei")
+                print("2. Stelle sicher, dass der Vault-Pfad korrekt ist")
+                print("3. Bei Ollama: Stelle sicher, dass Ollama läuft")
+                self.running = False
+        return self.agent is not None
+    
+    def connect_agent(self):
+        from query_client import RemoteAgent
+        try:
+            agent = RemoteAgent(self.server_address)
+            health = agent.health()
+        except Exception as e:
+            print(f"❌ Fehler beim Verbinden mit dem Server: {e}")
+            print("\n💡 Tipp: Server mit 'python cli_chatbot.py --serve' starten")
             return False
+        self.agent = agent
+        print(f"✅ Verbunden mit {self.server_address} ({health['notes']} Notizen)")
+        return True
     
     def run(self):
         print("🧠 Obsidian Vault Agent")
@@ -60,8 +96,14 @@ class ObsidianCLI:
                 break
             except EOFError:
                 break
+        
+        if self.ensure_agent():
+            self.agent.close()
     
     def process_input(self, user_input: str):
+        # Hilfe, Beenden und Bildschirm löschen brauchen keinen Agenten.
+        if user_input.lower() not in ('help', 'exit', 'quit', 'clear') and not self.ensure_agent():
+            return
         if user_input.lower() in self.commands:
             self.commands[user_input.lower()]()
         elif user_input.lower().startswith('summarize '):
@@ -73,19 +115,27 @@ class ObsidianCLI:
         else:
             self.ask_question(user_input)
     
+    def print_stream(self, header: str, chunks: Iterator[str]):
+        print(f"\n{header}")
+        for chunk in chunks:
+            print(chunk, end="", flush=True)
+        print("\n")
+    
     def ask_question(self, question: str):
         print("\n🤔 Durchsuche Vault...")
         try:
-            response = self.agent.search_and_answer(question)
-            print(f"\n💬 Antwort:\n{response}\n")
+            self.print_stream("💬 Antwort:", self.agent.chat(question, stream=True))
         except Exception as e:
             print(f"\n❌ Fehler bei der Anfrage: {e}\n")
     
+    def new_conversation(self):
+        self.agent.new_conversation()
+        print("🆕 Neues Gespräch gestartet - Folgefragen beziehen sich nicht mehr auf den bisherigen Verlauf.\n")
+    
     def summarize_command(self):
         print("\n📊 Erstelle Zusammenfassung aller Notizen...")
         try:
-            response = self.agent.summarize_notes()
-            print(f"\n📋 Zusammenfassung:\n{response}\n")
+            self.print_stream("📋 Zusammenfassung:", self.agent.summarize_notes(stream=True))
         except Exception as e:
             print(f"\n❌ Fehler bei der Zusammenfassung: {e}\n")
     
@@ -94,15 +144,13 @@ class ObsidianCLI:
             tags = [args[1:]]
             print(f"\n📊 Erstelle Zusammenfassung für Tag: {args}")
             try:
-                response = self.agent.summarize_notes(tags=tags)
-                print(f"\n📋 Zusammenfassung:\n{response}\n")
+                self.print_stream("📋 Zusammenfassung:", self.agent.summarize_notes(tags=tags, stream=True))
             except Exception as e:
                 print(f"\n❌ Fehler bei der Zusammenfassung: {e}\n")
         else:
             print(f"\n📊 Erstelle Zusammenfassung für: {args}")
             try:
-                response = self.agent.summarize_notes(search_term=args)
-                print(f"\n📋 Zusammenfassung:\n{response}\n")
+                self.print_stream("📋 Zusammenfassung:", self.agent.summarize_notes(search_term=args, stream=True))
             except Exception as e:
                 print(f"\n❌ Fehler bei der Zusammenfassung: {e}\n")
     
@@ -114,8 +162,7 @@ class ObsidianCLI:
     def note_details_with_args(self, note_title: str):
         print(f"\n📄 Analysiere Notiz: {note_title}")
         try:
-            response = self.agent.get_note_details(note_title)
-            print(f"\n📄 Notiz-Details:\n{response}\n")
+            self.print_stream("📄 Notiz-Details:", self.agent.get_note_details(note_title, stream=True))
         except Exception as e:
             print(f"\n❌ Fehler bei der Notiz-Analyse: {e}\n")
     
@@ -127,8 +174,7 @@ class ObsidianCLI:
     def connections_with_args(self, topic: str):
         print(f"\n🔗 Analysiere Verbindungen für: {topic}")
         try:
-            response = self.agent.find_connections(topic)
-            print(f"\n🔗 Verbindungen:\n{response}\n")
+            self.print_stream("🔗 Verbindungen:", self.agent.find_connections(topic, stream=True))
         except Exception as e:
             print(f"\n❌ Fehler bei der Verbindungsanalyse: {e}\n")
     
@@ -142,19 +188,65 @@ class ObsidianCLI:
     
     def show_config(self):
         try:
-            config = self.agent.config_manager
+            config = self.agent.get_config_summary()
             print("\n⚙️  Aktuelle Konfiguration:")
-            print(f"   Vault-Pfad: {config.get_vault_path()}")
-            print(f"   LLM-Provider: {config.get_llm_config()['provider']}")
-            print(f"   Max. Notizen pro Query: {config.get_agent_config().get('max_notes_per_query', 10)}")
+            if config.get('server'):
+                print(f"   Server: {config['server']}")
+            print(f"   Vault-Pfad: {config['vault_path']}")
+            print(f"   LLM-Provider: {config['provider']}")
+            if len(config.get('backends') or []) > 1:
+                print(f"   LLM-Backends: {', '.join(config['backends'])}")
+            print(f"   Max. Notizen pro Query: {config['max_notes_per_query']}")
+            cache_stats = config['llm_cache']
+            if cache_stats:
+                print(f"   LLM-Cache: {cache_stats['hits']} Treffer, {cache_stats['misses']} Fehlschläge "
+                      f"({cache_stats['hit_rate']}% Trefferquote)")
             print()
         except Exception as e:
             print(f"\n❌ Fehler beim Laden der Konfiguration: {e}\n")
     
+    def show_perf(self):
+        try:
+            performance = self.agent.get_performance()
+        except Exception as e:
+            print(f"\n❌ Fehler beim Laden der Messwerte: {e}\n")
+            return
+        trace = performance['last']
+        if trace is None:
+            print("\n⏱️  Noch keine Messungen - stelle zuerst eine Frage.\n")
+            return
+        total_ms = trace['total_ms']
+        print(f"\n⏱️  Letzte Anfrage: {trace['operation']} ({total_ms:.1f} ms)")
+        # Spans werden beim Beenden angehängt, nach Startzeit sortiert ergibt sich der Ablauf.
+        for span in sorted(trace['spans'], key=lambda s: s['start_ms']):
+            share = span['duration_ms'] / total_ms * 100 if total_ms else 0.0
+            counters = ", ".join(f"{key}={value:g}" for key, value in span['counters'].items())
+            indent = 2 * span['depth']
+            line = f"   {' ' * indent}{span['name']:<{28 - indent}} {span['duration_ms']:9.1f} ms {share:5.1f}%"
+            print(f"{line}   {counters}" if counters else line)
+        
+        stats = performance['percentiles']
+        print(f"\n📈 Sitzung ({sum(s['count'] for s in stats['operations'].values())} Anfragen):")
+        for title, rows in (("Operation", stats['operations']), ("Phase", stats['stages'])):
+            print(f"   {title:<28} {'n':>5} {'p50':>9} {'p90':>9} {'p99':>9}")
+            for name, row in sorted(rows.items()):
+                print(f"   {name:<28} {row['count']:>5} {row['p50']:>9.1f} {row['p90']:>9.1f} {row['p99']:>9.1f}")
+        
+        backends = performance.get('backends') or {}
+        if len(backends) > 1:
+            print("\n🔀 LLM-Backends:")
+            print(f"   {'Backend':<20} {'n':>5} {'Fehler':>7} {'p50':>9} {'p95':>9}")
+            for name, row in backends.items():
+                p50 = f"{row['p50_ms']:9.1f}" if row['p50_ms'] is not None else f"{'-':>9}"
+                p95 = f"{row['p95_ms']:9.1f}" if row['p95_ms'] is not None else f"{'-':>9}"
+                status = "  (pausiert)" if row['cooling_down'] else ""
+                print(f"   {name:<20} {row['requests']:>5} {row['errors']:>7} {p50} {p95}{status}")
+        print()
+    
     def test_connection(self):
         print("\n🔍 Teste LLM-Verbindung...")
         try:
-            if self.agent.llm_manager.test_connection():
+            if self.agent.test_connection():
                 print("✅ LLM-Verbindung erfolgreich!\n")
             else:
                 print("❌ LLM-Verbindung fehlgeschlagen!\n")
@@ -169,11 +261,14 @@ class ObsidianCLI:
         print("=" * 30)
         print("🔍 Direkte Frage stellen:")
         print("   Einfach deine Frage eintippen")
+        print("   Folgefragen beziehen sich auf das bisherige Gespräch")
         print("\n📋 Spezielle Befehle:")
         print("   help              - Diese Hilfe anzeigen")
+        print("   new               - Neues Gespräch beginnen (Verlauf verwerfen)")
         print("   stats             - Vault-Statistiken anzeigen")
         print("   config            - Aktuelle Konfiguration anzeigen")
         print("   test              - LLM-Verbindung testen")
+        print("   perf              - Laufzeiten der letzten Anfrage und Perzentile")
         print("   clear             - Bildschirm löschen")
         print("\n📊 Zusammenfassungen:")
         print("   summarize         - Alle Notizen zusammenfassen")
@@ -193,8 +288,72 @@ class ObsidianCLI:
         print("\n👋 Auf Wiedersehen!")
         self.running = False
 
+def create_agent(args):
+    from obsidian_agent import ObsidianAgent
+    
+    config_path = args.config or str(Path(__file__).parent / "config.yaml")
+    try:
+        return ObsidianAgent(config_path)
+    except Exception as e:
+        print(f"❌ Fehler beim Initialisieren des Agents: {e}", file=sys.stderr)
+        return None
+
+def run_batch_mode(args) -> int:
+    from batch_runner import run_batch
+    
+    agent = create_agent(args)
+    if agent is None:
+        return 1
+    try:
+        concurrency = args.concurrency or agent.llm_manager.concurrency.get('max_concurrency', 4)
+        summary = run_batch(agent, args.batch, args.output, concurrency)
+    finally:
+        agent.close()
+    print(f"✅ {summary['items']} Aufträge ({summary['ok']} ok, {summary['failed']} Fehler) "
+          f"in {summary['elapsed_ms'] / 1000:.1f} s", file=sys.stderr)
+    return 0 if not summary['failed'] else 2
+
+def run_server_mode(args) -> int:
+    from query_server import serve
+    
+    agent = create_agent(args)
+    if agent is None:
+        return 1
+    try:
+        server_config = agent.config_manager.get_server_config()
+        if args.port:
+            server_config['port'] = args.port
+        if args.socket:
+            server_config['socket'] = args.socket
+        serve(agent, server_config, agent.config_manager.get_vault_config()['watch_interval'])
+    except (OSError, ValueError) as e:
+        print(f"❌ Fehler beim Starten des Servers: {e}", file=sys.stderr)
+        return 1
+    finally:
+        agent.close()
+    return 0
+
 def main():
-    cli = ObsidianCLI()
+    parser = argparse.ArgumentParser(description="Obsidian Vault Agent")
+    parser.add_argument("--config", help="Pfad zur config.yaml (Standard: neben diesem Skript)")
+    parser.add_argument("--batch", metavar="DATEI",
+                        help="JSON-Lines-Datei mit Aufträgen abarbeiten ('-' = stdin)")
+    parser.add_argument("--output", metavar="DATEI", help="Ergebnisse als JSON Lines (Standard: stdout)")
+    parser.add_argument("--concurrency", type=int, help="Parallele Aufträge im Batch-Modus")
+    parser.add_argument("--serve", action="store_true", help="Abfrage-Server mit warmem Index starten")
+    parser.add_argument("--port", type=int, help="Port des Servers (überschreibt server.port)")
+    parser.add_argument("--socket", metavar="PFAD", help="Unix-Socket statt TCP (überschreibt server.socket)")
+    parser.add_argument("--connect", nargs="?", const="http://127.0.0.1:8765", metavar="ADRESSE",
+                        help="Als Client mit einem laufenden Server verbinden "
+                             "(http://host:port oder unix:/pfad, Standard: http://127.0.0.1:8765)")
+    args = parser.parse_args()
+    
+    if args.batch:
+        sys.exit(run_batch_mode(args))
+    if args.serve:
+        sys.exit(run_server_mode(args))
+    
+    cli = ObsidianCLI(args.config, args.connect)
     cli.run()
 
 if __name__ == "__main__":
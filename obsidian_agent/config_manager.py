@@ -1,14 +1,18 @@
 import yaml
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class ConfigManager:
+    DEFAULT_CONTEXT_TOKENS = {'ollama': 2048, 'openai': 8000, 'claude': 16000}
+    DEFAULT_RESPONSE_TOKENS = 512
+    
     def __init__(self, config_path: str = None):
         if config_path is None:
             config_path = Path(__file__).parent / "config.yaml"
         self.config_path = Path(config_path)
         self.config = self._load_config()
+        self._vault_shards: Optional[List[Dict[str, Any]]] = None
     
     def _load_config(self) -> Dict[str, Any]:
         try:
@@ -20,21 +24,124 @@ class ConfigManager:
             raise ValueError(f"Error parsing config file: {e}")
     
     def get_vault_path(self) -> str:
-        vault_path = self.config.get('vault', {}).get('path', '')
-        if not vault_path or not os.path.exists(vault_path):
-            raise ValueError(f"Invalid vault path: {vault_path}")
-        return vault_path
+        # Bei mehreren Vaults der erste Eintrag.
+        return self.get_vault_shards()[0]['path']
+    
+    def get_vault_shards(self) -> List[Dict[str, Any]]:
+        # Nur einmal auf dem Dateisystem prüfen, danach die geprüften Pfade liefern.
+        if self._vault_shards is None:
+            vault_config = self.config.get('vault', {}) or {}
+            entries = vault_config.get('path', '')
+            if not isinstance(entries, list):
+                entries = [entries]
+            shards = []
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    entry = {'path': entry}
+                vault_path = entry.get('path') or ''
+                if not vault_path or not os.path.exists(vault_path):
+                    raise ValueError(f"Invalid vault path: {vault_path}")
+                name = str(entry.get('name') or Path(vault_path).name)
+                if '/' in name or any(shard['name'] == name for shard in shards):
+                    raise ValueError(f"Vault name must be unique and must not contain '/': {name}")
+                # Ein gemeinsamer cache_path gilt nur für einen einzelnen Vault.
+                cache_path = entry.get('cache_path') or (vault_config.get('cache_path') if len(entries) == 1 else None)
+                shards.append({
+                    'name': name,
+                    'path': vault_path,
+                    'cache_path': cache_path or None,
+                    'lazy': bool(entry.get('lazy', False))
+                })
+            if not shards:
+                raise ValueError("Invalid vault path: ")
+            self._vault_shards = shards
+        return self._vault_shards
+    
+    def get_vault_config(self) -> Dict[str, Any]:
+        vault_config = self.config.get('vault', {}) or {}
+        return {
+            'cache': vault_config.get('cache', True),
+            'cache_path': vault_config.get('cache_path') or None,
+            'watch': vault_config.get('watch', True),
+            'watch_interval': float(vault_config.get('watch_interval', 2.0)),
+            'ignore': vault_config.get('ignore'),
+            'scan_workers': int(vault_config.get('scan_workers', 4)),
+            'scan_executor': vault_config.get('scan_executor', 'thread')
+        }
+    
+    SUPPORTED_PROVIDERS = ('ollama', 'openai', 'claude')
     
     def get_llm_config(self) -> Dict[str, Any]:
         llm_config = self.config.get('llm', {})
         provider = llm_config.get('provider', 'ollama')
         
-        if provider not in ['ollama', 'openai', 'claude']:
+        if provider not in self.SUPPORTED_PROVIDERS:
             raise ValueError(f"Unsupported LLM provider: {provider}")
         
         return {
             'provider': provider,
-            'config': llm_config.get(provider, {})
+            'config': llm_config.get(provider, {}),
+            'cache': llm_config.get('cache', {}),
+            'concurrency': llm_config.get('concurrency', {}),
+            'routing': self._get_routing_config(llm_config, provider)
+        }
+    
+    def _get_routing_config(self, llm_config: Dict[str, Any], provider: str) -> Dict[str, Any]:
+        routing = dict(llm_config.get('routing') or {})
+        # Zusätzliche Backends erben die Einstellungen ihres Providers und
+        # überschreiben einzelne Werte (z.B. model, base_url).
+        backends = []
+        names = {provider}
+        for entry in routing.get('backends') or []:
+            overrides = dict(entry)
+            name = overrides.pop('name', None)
+            backend_provider = overrides.pop('provider', provider)
+            small = bool(overrides.pop('small', False))
+            if not name or name in names:
+                raise ValueError(f"Routing backend needs a unique name: {name}")
+            if backend_provider not in self.SUPPORTED_PROVIDERS:
+                raise ValueError(f"Unsupported LLM provider for backend {name}: {backend_provider}")
+            names.add(name)
+            backends.append({
+                'name': name,
+                'provider': backend_provider,
+                'small': small,
+                'config': dict(llm_config.get(backend_provider) or {}, **overrides)
+            })
+        routing['backends'] = backends
+        return routing
+    
+    def get_context_budget(self) -> int:
+        # context_tokens ist das ganze Kontextfenster; für den Prompt bleibt,
+        # was die Antwort nicht braucht (max_tokens bzw. response_tokens bei Ollama).
+        llm_config = self.get_llm_config()
+        provider, config = llm_config['provider'], llm_config['config']
+        context_tokens = int(config.get('context_tokens', self.DEFAULT_CONTEXT_TOKENS.get(provider, 2048)))
+        if provider == 'ollama':
+            reserve = int(config.get('response_tokens', self.DEFAULT_RESPONSE_TOKENS))
+        else:
+            reserve = int(config.get('max_tokens', 2000))
+        budget = context_tokens - reserve
+        if budget <= 0:
+            raise ValueError(f"context_tokens ({context_tokens}) must exceed the response reserve ({reserve})")
+        return budget
+    
+    def get_tracing_config(self) -> Dict[str, Any]:
+        tracing_config = self.config.get('tracing', {}) or {}
+        return {
+            'enabled': tracing_config.get('enabled', True),
+            'trace_file': tracing_config.get('trace_file') or None,
+            'history': int(tracing_config.get('history', 200))
+        }
+    
+    def get_server_config(self) -> Dict[str, Any]:
+        server_config = self.config.get('server', {}) or {}
+        return {
+            'host': server_config.get('host', '127.0.0.1'),
+            'port': int(server_config.get('port', 8765)),
+            'socket': server_config.get('socket') or None,
+            'max_active': int(server_config.get('max_active', 4)),
+            'max_queue': int(server_config.get('max_queue', 32))
         }
     
     def get_agent_config(self) -> Dict[str, Any]:
@@ -0,0 +1,97 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Set
+
+from markdown_scanner import FRONTMATTER_PATTERN
+
+OBSIDIAN_COMMENT_PATTERN = re.compile(r'%%.*?%%', re.S)
+HTML_COMMENT_PATTERN = re.compile(r'<!--.*?-->', re.S)
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+WORD_PATTERN = re.compile(r'\w+')
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    return int(len(text) / chars_per_token) + 1 if text else 0
+
+def strip_boilerplate(text: str) -> str:
+    match = FRONTMATTER_PATTERN.match(text)
+    if match:
+        text = text[match.end():]
+    text = OBSIDIAN_COMMENT_PATTERN.sub('', text)
+    text = HTML_COMMENT_PATTERN.sub('', text)
+    return BLANK_LINES_PATTERN.sub('\n\n', text).strip()
+
+@dataclass
+class ContextItem:
+    label: str
+    text: str
+    score: float = 0.0
+    source: str = ""
+    key: str = ""
+
+# Füllt ein Token-Budget gierig nach Relevanz: Boilerplate wird entfernt,
+# fast identische Texte werden übersprungen, das letzte Element wird bei
+# Bedarf gekürzt.
+class ContextPacker:
+    def __init__(self, budget_tokens: int, chars_per_token: float = 4.0,
+                 duplicate_threshold: float = 0.8, min_item_tokens: int = 32):
+        self.budget_tokens = budget_tokens
+        self.chars_per_token = chars_per_token
+        self.duplicate_threshold = duplicate_threshold
+        self.min_item_tokens = min_item_tokens
+
+    def estimate(self, text: str) -> int:
+        return estimate_tokens(text, self.chars_per_token)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        max_chars = int(max_tokens * self.chars_per_token)
+        if len(text) <= max_chars:
+            return text
+        cut = text.rfind('\n', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = text.rfind(' ', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = max_chars
+        return text[:cut].rstrip() + " ..."
+
+    @staticmethod
+    def _shingles(text: str) -> Set[tuple]:
+        words = WORD_PATTERN.findall(text.casefold())
+        if len(words) < 3:
+            return {tuple(words)}
+        return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    def _is_duplicate(self, shingles: Set[tuple], accepted: List[Set[tuple]]) -> bool:
+        for other in accepted:
+            union = len(shingles | other)
+            if union and len(shingles & other) / union >= self.duplicate_threshold:
+                return True
+        return False
+
+    def pack(self, items: List[ContextItem], budget_tokens: Optional[int] = None,
+             max_item_tokens: Optional[int] = None) -> List[ContextItem]:
+        remaining = self.budget_tokens if budget_tokens is None else budget_tokens
+        packed: List[ContextItem] = []
+        accepted: List[Set[tuple]] = []
+
+        for item in sorted(items, key=lambda item: item.score, reverse=True):
+            text = strip_boilerplate(item.text)
+            if not text:
+                continue
+            shingles = self._shingles(text)
+            if self._is_duplicate(shingles, accepted):
+                continue
+
+            overhead = self.estimate(item.label) + self.estimate(item.source) + 4
+            available = remaining - overhead
+            if max_item_tokens is not None:
+                available = min(available, max_item_tokens)
+            if available < self.min_item_tokens:
+                if remaining - overhead < self.min_item_tokens:
+                    break
+                continue
+
+            text = self.truncate(text, available)
+            packed.append(ContextItem(item.label, text, item.score, item.source, item.key))
+            accepted.append(shingles)
+            remaining -= overhead + self.estimate(text)
+        return packed
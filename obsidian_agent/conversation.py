@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, List, Set, TYPE_CHECKING
+from context_packer import estimate_tokens
+
+if TYPE_CHECKING:
+    from vault_reader import Note
+
+# Gleichbleibender Anfang jedes Gesprächs: Der Server kann den Prompt-Cache
+# (KV-Cache) für diesen Präfix und alle bisherigen Nachrichten wiederverwenden.
+SYSTEM_PROMPT = """Du bist ein hilfreicher Assistent, der Fragen zu einem Obsidian Vault beantwortet.
+Zu jeder Frage bekommst du neue Passagen aus den Notizen; Passagen aus früheren Nachrichten gelten weiter.
+Beantworte die Fragen basierend auf den bereitgestellten Notizen. Wenn die Antwort nicht vollständig in den Notizen steht, gib das an. Verweise auf spezifische Notizen wenn möglich."""
+
+# Gesprächsverlauf für Folgefragen. Nachrichten werden nur angehängt, nie
+# umgeschrieben, damit der Präfix stabil bleibt. Bereits gesendete Passagen
+# sind "angeheftet": Folgefragen schicken nur neue Passagen mit, und die
+# Notizen der bisherigen Treffer bleiben Kandidaten für weitere Passagen.
+class Conversation:
+    def __init__(self, system_prompt: str = SYSTEM_PROMPT):
+        self.messages: List[Dict[str, str]] = [{'role': 'system', 'content': system_prompt}]
+        self.pinned_notes: Dict[str, 'Note'] = {}
+        self.pinned_passages: Set[str] = set()
+        self.passage_count = 0
+        self._turn_passages: List[List[str]] = []
+
+    @property
+    def turns(self) -> int:
+        return len(self._turn_passages)
+
+    def tokens(self) -> int:
+        return sum(estimate_tokens(message['content']) for message in self.messages)
+
+    def add_turn(self, question: str, answer: str, notes: Iterable['Note'], passage_ids: List[str]):
+        self.messages.append({'role': 'user', 'content': question})
+        self.messages.append({'role': 'assistant', 'content': answer})
+        for note in notes:
+            self.pinned_notes.setdefault(note.file_path, note)
+        self.pinned_passages.update(passage_ids)
+        self.passage_count += len(passage_ids)
+        self._turn_passages.append(passage_ids)
+
+    def trim(self, max_tokens: int) -> int:
+        # Älteste Frage/Antwort-Paare verwerfen; kostet einmalig den Prompt-Cache.
+        dropped = 0
+        while self.tokens() > max_tokens and self._turn_passages:
+            del self.messages[1:3]
+            # Verworfene Passagen dürfen wieder gesendet werden.
+            self.pinned_passages.difference_update(self._turn_passages.pop(0))
+            dropped += 1
+        return dropped
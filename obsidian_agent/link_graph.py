@@ -0,0 +1,293 @@
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+def normalize_target(target: str) -> str:
+    target = target.strip().replace('\\', '/')
+    if target.casefold().endswith('.md'):
+        target = target[:-3]
+    return target.strip('/').casefold()
+
+# Gerichteter Link-Graph über Notiz-IDs. Wikilink-Ziele werden wie in Obsidian
+# aufgelöst: Pfad (ordner/notiz), Dateiname, Titel, Alias. Kanten liegen als
+# kompakte Integer-Arrays je Knoten vor; Ziele, die (noch) keine Notiz haben,
+# werden beim Hinzufügen passender Notizen nachträglich verbunden. Pfadziele
+# gelten relativ zum Vault-Wurzelverzeichnis (root), damit [[ordner/notiz]]
+# nicht auf Verzeichnisse oberhalb des Vaults passt.
+class LinkGraph:
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root) if root else None
+        self._paths: Dict[int, str] = {}
+        self._names: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {}
+        self._targets: Dict[int, Tuple[str, ...]] = {}
+        self._stems: Dict[str, Set[int]] = {}
+        self._titles: Dict[str, Set[int]] = {}
+        self._aliases: Dict[str, Set[int]] = {}
+        # Letzte Pfadkomponente eines Linkziels -> Notizen mit solchen Links
+        self._linkers: Dict[str, Set[int]] = {}
+        self._out: Dict[int, array] = {}
+        self._in: Dict[int, array] = {}
+        # Laufende Kennzahlen für die Vault-Statistik
+        self._target_counts: Dict[str, int] = {}
+        self._broken: Dict[int, int] = {}
+        self._orphans: Set[int] = set()
+        self._edges = 0
+        self.broken_count = 0
+        self.version = 0
+        self._pagerank: Optional[Tuple[int, Dict[int, float]]] = None
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, node_id: int) -> bool:
+        return node_id in self._paths
+
+    @property
+    def edge_count(self) -> int:
+        return self._edges
+
+    @property
+    def target_count(self) -> int:
+        return len(self._target_counts)
+
+    @property
+    def orphan_count(self) -> int:
+        return len(self._orphans)
+
+    def add(self, node_id: int, file_path: str, title: str, aliases: Iterable[str], links: Iterable[str]):
+        self.add_many([(node_id, file_path, title, aliases, links)])
+
+    # Erst alle Namen eintragen, dann jede betroffene Notiz einmal verknüpfen,
+    # statt bei jedem neuen Namen alle Notizen mit passenden Links erneut.
+    def add_many(self, entries: Iterable[Tuple[int, str, str, Iterable[str], Iterable[str]]]):
+        added = [self._register(*entry) for entry in entries]
+        pending = set(added)
+        for node_id in added:
+            pending.update(self._sources_for(node_id))
+        for source in sorted(pending):
+            if source in self._paths:
+                self._link(source)
+        self.version += 1
+
+    def _register(self, node_id: int, file_path: str, title: str, aliases: Iterable[str],
+                  links: Iterable[str]) -> int:
+        if node_id in self._paths:
+            self.remove(node_id)
+
+        path_key = self._path_key(file_path)
+        stem = Path(file_path).stem.casefold()
+        alias_keys = tuple(dict.fromkeys(alias.casefold() for alias in aliases))
+        self._paths[node_id] = path_key
+        self._names[node_id] = (stem, title.casefold(), alias_keys)
+        self._stems.setdefault(stem, set()).add(node_id)
+        self._titles.setdefault(title.casefold(), set()).add(node_id)
+        for alias in alias_keys:
+            self._aliases.setdefault(alias, set()).add(node_id)
+
+        targets = tuple(dict.fromkeys(filter(None, (normalize_target(link) for link in links))))
+        self._targets[node_id] = targets
+        for target in targets:
+            self._linkers.setdefault(target.rsplit('/', 1)[-1], set()).add(node_id)
+            self._target_counts[target] = self._target_counts.get(target, 0) + 1
+        return node_id
+
+    def _path_key(self, file_path: str) -> str:
+        path = Path(file_path)
+        if self.root is not None:
+            try:
+                path = path.relative_to(self.root)
+            except ValueError:
+                pass
+        return path.with_suffix('').as_posix().casefold()
+
+    def remove(self, node_id: int):
+        if node_id not in self._paths:
+            return
+        stem, title, alias_keys = self._names.pop(node_id)
+        self._discard(self._stems, stem, node_id)
+        self._discard(self._titles, title, node_id)
+        for alias in alias_keys:
+            self._discard(self._aliases, alias, node_id)
+        for target in self._targets.pop(node_id):
+            self._discard(self._linkers, target.rsplit('/', 1)[-1], node_id)
+            self._target_counts[target] -= 1
+            if not self._target_counts[target]:
+                del self._target_counts[target]
+        del self._paths[node_id]
+        self.broken_count -= self._broken.pop(node_id, 0)
+        self._orphans.discard(node_id)
+
+        for target in self._out.pop(node_id, ()):
+            self._edges -= 1
+            self._in[target].remove(node_id)
+            if not self._in[target]:
+                del self._in[target]
+            self._touch(target)
+        # Eingehende Links zeigen ggf. auf eine andere Notiz gleichen Namens.
+        for source in self._in.pop(node_id, ()):
+            self._edges -= 1
+            targets = self._out[source]
+            targets.remove(node_id)
+            if not targets:
+                del self._out[source]
+            self._link(source)
+        self.version += 1
+
+    @staticmethod
+    def _discard(table: Dict[str, Set[int]], key: str, node_id: int):
+        ids = table.get(key)
+        if ids is not None:
+            ids.discard(node_id)
+            if not ids:
+                del table[key]
+
+    def _sources_for(self, node_id: int) -> Set[int]:
+        stem, title, alias_keys = self._names[node_id]
+        sources: Set[int] = set()
+        for name in (stem, title) + alias_keys:
+            sources.update(self._linkers.get(name, ()))
+        return sources
+
+    def resolve(self, target: str) -> Optional[int]:
+        target = normalize_target(target)
+        if '/' in target:
+            suffix = '/' + target
+            matches = [node_id for node_id in self._stems.get(target.rsplit('/', 1)[1], ())
+                       if self._paths[node_id] == target or self._paths[node_id].endswith(suffix)]
+            return min(matches) if matches else None
+        for table in (self._stems, self._titles, self._aliases):
+            ids = table.get(target)
+            if ids:
+                return min(ids)
+        return None
+
+    def _touch(self, node_id: int):
+        if node_id in self._paths and node_id not in self._out and node_id not in self._in:
+            self._orphans.add(node_id)
+        else:
+            self._orphans.discard(node_id)
+
+    def _link(self, source: int):
+        resolved = [self.resolve(target) for target in self._targets[source]]
+        broken = resolved.count(None)
+        self.broken_count += broken - self._broken.get(source, 0)
+        if broken:
+            self._broken[source] = broken
+        else:
+            self._broken.pop(source, None)
+
+        resolved = set(resolved)
+        resolved.discard(None)
+        resolved.discard(source)
+        old = set(self._out.get(source, ()))
+        if resolved != old:
+            for target in old - resolved:
+                self._in[target].remove(source)
+                if not self._in[target]:
+                    del self._in[target]
+                self._touch(target)
+            for target in resolved - old:
+                self._in.setdefault(target, array('q')).append(source)
+                self._touch(target)
+            self._edges += len(resolved) - len(old)
+            if resolved:
+                self._out[source] = array('q', sorted(resolved))
+            else:
+                self._out.pop(source, None)
+        self._touch(source)
+
+    def outgoing(self, node_id: int) -> List[int]:
+        return list(self._out.get(node_id, ()))
+
+    def incoming(self, node_id: int) -> List[int]:
+        return sorted(self._in.get(node_id, ()))
+
+    def neighbors(self, node_id: int, direction: str = "both") -> Set[int]:
+        result: Set[int] = set()
+        if direction in ("out", "both"):
+            result.update(self._out.get(node_id, ()))
+        if direction in ("in", "both"):
+            result.update(self._in.get(node_id, ()))
+        return result
+
+    def neighborhood(self, node_id: int, hops: int = 2, direction: str = "both") -> Dict[int, int]:
+        distances = {node_id: 0}
+        frontier = [node_id]
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self.neighbors(current, direction):
+                    if neighbor not in distances:
+                        distances[neighbor] = hop
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        del distances[node_id]
+        return distances
+
+    def shortest_path(self, start: int, goal: int, directed: bool = False,
+                      max_hops: Optional[int] = None) -> Optional[List[int]]:
+        if start not in self._paths or goal not in self._paths:
+            return None
+        if start == goal:
+            return [start]
+        direction = "out" if directed else "both"
+        parents: Dict[int, int] = {start: start}
+        queue = deque([(start, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_hops is not None and depth >= max_hops:
+                continue
+            for neighbor in sorted(self.neighbors(current, direction)):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = current
+                if neighbor == goal:
+                    path = [goal]
+                    while path[-1] != start:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                queue.append((neighbor, depth + 1))
+        return None
+
+    def pagerank(self, damping: float = 0.85, iterations: int = 50, tolerance: float = 1e-6) -> Dict[int, float]:
+        if self._pagerank is not None and self._pagerank[0] == self.version:
+            return self._pagerank[1]
+
+        ids = sorted(self._paths)
+        count = len(ids)
+        if not count:
+            return {}
+        position = {node_id: i for i, node_id in enumerate(ids)}
+
+        # Eingehende Kanten als CSR (indptr/indices), damit eine Iteration
+        # nur über flache Arrays läuft.
+        indptr = array('q', [0])
+        indices = array('q')
+        for node_id in ids:
+            indices.extend(position[source] for source in self._in.get(node_id, ()))
+            indptr.append(len(indices))
+        out_degree = [len(self._out.get(node_id, ())) for node_id in ids]
+        dangling = [i for i, degree in enumerate(out_degree) if not degree]
+
+        rank = [1.0 / count] * count
+        for _ in range(iterations):
+            share = [r / degree if degree else 0.0 for r, degree in zip(rank, out_degree)]
+            base = (1.0 - damping) / count + damping * sum(rank[i] for i in dangling) / count
+            new_rank = [
+                base + damping * sum(share[j] for j in indices[indptr[i]:indptr[i + 1]])
+                for i in range(count)
+            ]
+            change = sum(abs(a - b) for a, b in zip(new_rank, rank))
+            rank = new_rank
+            if change < tolerance:
+                break
+
+        result = {node_id: rank[i] for i, node_id in enumerate(ids)}
+        self._pagerank = (self.version, result)
+        return result
+
+    def unresolved(self, node_id: int) -> List[str]:
+        return [target for target in self._targets.get(node_id, ()) if self.resolve(target) is None]
@@ -1,116 +1,623 @@
-import requests
 import json
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, Iterator, List, Union, TYPE_CHECKING
 from abc import ABC, abstractmethod
+from llm_cache import LLMCache
+from context_packer import estimate_tokens
+from tracing import tracer
+
+if TYPE_CHECKING:
+    from llm_router import Backend, LLMRouter
+
+# Provider melden Fehler als LLMError; LLMManager gibt sie nach außen als Text
+# zurück (generate_many als LLMError-Objekte). Solche Antworten dürfen nicht
+# gecacht werden.
+ERROR_RESPONSE_PREFIXES = (
+    "Fehler bei ",
+    "Unerwarteter Fehler",
+    "OpenAI-Bibliothek nicht installiert",
+    "Anthropic-Bibliothek nicht installiert",
+    "Keine Antwort erhalten",
+)
+
+def is_error_response(response: str) -> bool:
+    return not response or response.startswith(ERROR_RESPONSE_PREFIXES)
+
+# Die Meldung (str(e)) ist der deutsche Fehlertext für den Nutzer.
+class LLMError(Exception):
+    pass
+
+# Backend nicht erreichbar, Zeitüberschreitung, überlastet (5xx/429): ein
+# anderes Backend kann die Anfrage übernehmen.
+class LLMUnavailableError(LLMError):
+    pass
+
+# Backend hat geantwortet, aber mit Fehler oder ohne Inhalt.
+class LLMResponseError(LLMError):
+    pass
+
+# Bibliothek fehlt oder Zugangsdaten ungültig.
+class LLMSetupError(LLMError):
+    pass
+
+def _sdk_error(provider: str, e: Exception) -> LLMError:
+    # OpenAI- und Anthropic-SDK: APIConnectionError/APITimeoutError ohne Status, sonst status_code.
+    status = getattr(e, 'status_code', None)
+    message = f"Fehler bei {provider}-Anfrage: {e}"
+    if status is None and type(e).__name__ in ('APIConnectionError', 'APITimeoutError'):
+        return LLMUnavailableError(message)
+    if status in (401, 403):
+        return LLMSetupError(message)
+    if status is not None and (status >= 500 or status == 429):
+        return LLMUnavailableError(message)
+    return LLMResponseError(message)
+
+ROLE_LABELS = {'system': "", 'user': "Nutzer: ", 'assistant': "Assistent: "}
+
+def render_messages(messages: List[Dict[str, str]]) -> str:
+    # Chat-Verlauf als einzelner Prompt für Provider ohne Chat-Schnittstelle.
+    parts = [f"{ROLE_LABELS.get(message['role'], '')}{message['content']}" for message in messages]
+    return "\n\n".join(parts + ["Assistent:"])
 
 class LLMProvider(ABC):
     @abstractmethod
     def generate_response(self, prompt: str) -> str:
         pass
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        yield self.generate_response(prompt)
+    
+    def chat(self, messages: List[Dict[str, str]]) -> str:
+        return self.generate_response(render_messages(messages))
+    
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        yield from self.stream_response(render_messages(messages))
+    
+    def warm_up(self):
+        pass
+    
+    def close(self):
+        pass
 
 class OllamaProvider(LLMProvider):
     def __init__(self, config: Dict[str, Any]):
         self.base_url = config.get('base_url', 'http://localhost:11434')
         self.model = config.get('model', 'llama3.1')
+        self.keep_alive = config.get('keep_alive', '30m')
+        # Kontextfenster passend zum Prompt-Budget (context_tokens), sonst kürzt
+        # Ollama mit seinem eigenen Standardwert.
+        self.num_ctx = int(config.get('context_tokens', 2048))
+        self.timeout = (float(config.get('connect_timeout', 5)), float(config.get('timeout', 60)))
+        # requests erst hier laden (einmalig beim Anlegen des Providers), nicht beim Modulimport.
+        import requests
+        self._requests = requests
+        self.session = self._create_session(
+            pool_size=int(config.get('pool_size', 4)),
+            max_retries=int(config.get('max_retries', 2)),
+            backoff=float(config.get('retry_backoff', 0.5))
+        )
     
-    def generate_response(self, prompt: str) -> str:
+    @staticmethod
+    def _create_session(pool_size: int, max_retries: int, backoff: float) -> 'requests.Session':
+        # Langlebige Session: Keep-Alive-Verbindungen aus einem Pool statt
+        # neuem TCP-Handshake pro Anfrage; Retries nur bei Verbindungsfehlern
+        # und 502/503/504.
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def close(self):
+        self.session.close()
+    
+    def _payload(self, stream: bool, **fields) -> Dict[str, Any]:
+        payload = {"model": self.model, "stream": stream, "options": {"num_ctx": self.num_ctx}, **fields}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def _error(self, e: Exception) -> LLMError:
+        message = f"Fehler bei Ollama-Anfrage: {e}"
+        exceptions = self._requests.exceptions
+        if isinstance(e, exceptions.HTTPError):
+            status = e.response.status_code if e.response is not None else 0
+            return LLMUnavailableError(message) if status >= 500 or status == 429 else LLMResponseError(message)
+        if isinstance(e, (exceptions.ConnectionError, exceptions.Timeout)):
+            return LLMUnavailableError(message)
+        if isinstance(e, exceptions.RequestException):
+            return LLMResponseError(message)
+        return LLMError(f"Unerwarteter Fehler: {e}")
+    
+    def _complete(self, path: str, payload: Dict[str, Any], extract: Callable[[Dict[str, Any]], str]) -> str:
         try:
-            url = f"{self.base_url}/api/generate"
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            response = requests.post(url, json=payload, timeout=60)
+            response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
             response.raise_for_status()
-            
-            result = response.json()
-            return result.get('response', 'Keine Antwort erhalten')
+            text = extract(response.json())
+        except Exception as e:
+            raise self._error(e) from e
+        if not text:
+            raise LLMResponseError("Keine Antwort erhalten")
+        return text
+    
+    def _stream(self, path: str, payload: Dict[str, Any], extract: Callable[[Dict[str, Any]], str]) -> Iterator[str]:
+        try:
+            with self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout,
+                                   stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        raise LLMResponseError(f"Fehler bei Ollama-Anfrage: {chunk['error']}")
+                    text = extract(chunk)
+                    if text:
+                        yield text
+                    if chunk.get('done'):
+                        return
         
-        except requests.exceptions.RequestException as e:
-            return f"Fehler bei Ollama-Anfrage: {e}"
+        except LLMError:
+            raise
         except Exception as e:
-            return f"Unerwarteter Fehler: {e}"
+            raise self._error(e) from e
+    
+    @staticmethod
+    def _generated(data: Dict[str, Any]) -> str:
+        return data.get('response', '')
+    
+    @staticmethod
+    def _chat_message(data: Dict[str, Any]) -> str:
+        return (data.get('message') or {}).get('content', '')
+    
+    def generate_response(self, prompt: str) -> str:
+        return self._complete("/api/generate", self._payload(False, prompt=prompt), self._generated)
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        return self._stream("/api/generate", self._payload(True, prompt=prompt), self._generated)
+    
+    # /api/chat statt 'context' aus /api/generate: Bei gleichem Nachrichten-Präfix
+    # verwendet Ollama den KV-Cache des geladenen Modells weiter (keep_alive).
+    def chat(self, messages: List[Dict[str, str]]) -> str:
+        return self._complete("/api/chat", self._payload(False, messages=messages), self._chat_message)
+    
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        return self._stream("/api/chat", self._payload(True, messages=messages), self._chat_message)
 
 class OpenAIProvider(LLMProvider):
     def __init__(self, config: Dict[str, Any]):
         self.api_key = config.get('api_key')
         self.model = config.get('model', 'gpt-3.5-turbo')
         self.max_tokens = config.get('max_tokens', 2000)
+        self.timeout = float(config.get('timeout', 60))
+        self.max_retries = int(config.get('max_retries', 2))
+        self._client = None
+        self._client_lock = threading.Lock()
         
         if not self.api_key:
-            raise ValueError("OpenAI API Key ist erforderlich")
+            raise LLMSetupError("OpenAI API Key ist erforderlich")
+    
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                import openai
+                self._client = openai.OpenAI(
+                    api_key=self.api_key, timeout=self.timeout, max_retries=self.max_retries
+                )
+            return self._client
+    
+    def warm_up(self):
+        # SDK-Import und Client-Aufbau vorziehen (z.B. im Hintergrund beim Start).
+        try:
+            self._get_client()
+        except ImportError:
+            pass
     
     def generate_response(self, prompt: str) -> str:
+        return self.chat([{"role": "user", "content": prompt}])
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        return self.stream_chat([{"role": "user", "content": prompt}])
+    
+    def chat(self, messages: List[Dict[str, str]]) -> str:
         try:
-            import openai
-            
-            client = openai.OpenAI(api_key=self.api_key)
+            client = self._get_client()
             
             response = client.chat.completions.create(
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 max_tokens=self.max_tokens
             )
             
-            return response.choices[0].message.content
+            text = response.choices[0].message.content
+        
+        except ImportError:
+            raise LLMSetupError("OpenAI-Bibliothek nicht installiert. Führe aus: pip install openai")
+        except Exception as e:
+            raise _sdk_error("OpenAI", e) from e
+        if not text:
+            raise LLMResponseError("Keine Antwort erhalten")
+        return text
+    
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        try:
+            client = self._get_client()
+            
+            stream = client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         
         except ImportError:
-            return "OpenAI-Bibliothek nicht installiert. Führe aus: pip install openai"
+            raise LLMSetupError("OpenAI-Bibliothek nicht installiert. Führe aus: pip install openai")
         except Exception as e:
-            return f"Fehler bei OpenAI-Anfrage: {e}"
+            raise _sdk_error("OpenAI", e) from e
 
 class ClaudeProvider(LLMProvider):
     def __init__(self, config: Dict[str, Any]):
         self.api_key = config.get('api_key')
         self.model = config.get('model', 'claude-3-sonnet-20240229')
         self.max_tokens = config.get('max_tokens', 2000)
+        self.timeout = float(config.get('timeout', 60))
+        self.max_retries = int(config.get('max_retries', 2))
+        self._client = None
+        self._client_lock = threading.Lock()
         
         if not self.api_key:
-            raise ValueError("Claude API Key ist erforderlich")
+            raise LLMSetupError("Claude API Key ist erforderlich")
+    
+    def _get_client(self):
+        with self._client_lock:
+            if self._client is None:
+                import anthropic
+                self._client = anthropic.Anthropic(
+                    api_key=self.api_key, timeout=self.timeout, max_retries=self.max_retries
+                )
+            return self._client
+    
+    def warm_up(self):
+        # SDK-Import und Client-Aufbau vorziehen (z.B. im Hintergrund beim Start).
+        try:
+            self._get_client()
+        except ImportError:
+            pass
     
     def generate_response(self, prompt: str) -> str:
+        return self.chat([{"role": "user", "content": prompt}])
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        return self.stream_chat([{"role": "user", "content": prompt}])
+    
+    @staticmethod
+    def _split_system(messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        # Claude erwartet den System-Prompt als eigenen Parameter.
+        system = "\n\n".join(m['content'] for m in messages if m['role'] == 'system')
+        request: Dict[str, Any] = {'messages': [m for m in messages if m['role'] != 'system']}
+        if system:
+            request['system'] = system
+        return request
+    
+    def chat(self, messages: List[Dict[str, str]]) -> str:
         try:
-            import anthropic
-            
-            client = anthropic.Anthropic(api_key=self.api_key)
+            client = self._get_client()
             
             response = client.messages.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
-                messages=[{"role": "user", "content": prompt}]
+                **self._split_system(messages)
             )
             
-            return response.content[0].text
+            text = response.content[0].text if response.content else ""
+        
+        except ImportError:
+            raise LLMSetupError("Anthropic-Bibliothek nicht installiert. Führe aus: pip install anthropic")
+        except Exception as e:
+            raise _sdk_error("Claude", e) from e
+        if not text:
+            raise LLMResponseError("Keine Antwort erhalten")
+        return text
+    
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        try:
+            client = self._get_client()
+            
+            with client.messages.stream(
+                model=self.model,
+                max_tokens=self.max_tokens,
+                **self._split_system(messages)
+            ) as stream:
+                for text in stream.text_stream:
+                    yield text
         
         except ImportError:
-            return "Anthropic-Bibliothek nicht installiert. Führe aus: pip install anthropic"
+            raise LLMSetupError("Anthropic-Bibliothek nicht installiert. Führe aus: pip install anthropic")
         except Exception as e:
-            return f"Fehler bei Claude-Anfrage: {e}"
+            raise _sdk_error("Claude", e) from e
+
+def create_provider(provider_name: str, config: Dict[str, Any]) -> LLMProvider:
+    if provider_name == 'ollama':
+        return OllamaProvider(config)
+    elif provider_name == 'openai':
+        return OpenAIProvider(config)
+    elif provider_name == 'claude':
+        return ClaudeProvider(config)
+    else:
+        raise LLMSetupError(f"Unbekannter Provider: {provider_name}")
 
 class LLMManager:
+    # Einstellungen ohne Einfluss auf die Antwort gehören nicht in den Cache-Schlüssel.
+    CACHE_KEY_EXCLUDE = {
+        'api_key', 'timeout', 'connect_timeout', 'max_retries', 'retry_backoff',
+        'pool_size', 'keep_alive', 'context_tokens', 'response_tokens'
+    }
+    
     def __init__(self, llm_config: Dict[str, Any]):
         self.provider_name = llm_config['provider']
         self.config = llm_config['config']
-        self.provider = self._initialize_provider()
-    
-    def _initialize_provider(self) -> LLMProvider:
-        if self.provider_name == 'ollama':
-            return OllamaProvider(self.config)
-        elif self.provider_name == 'openai':
-            return OpenAIProvider(self.config)
-        elif self.provider_name == 'claude':
-            return ClaudeProvider(self.config)
-        else:
-            raise ValueError(f"Unbekannter Provider: {self.provider_name}")
+        # Provider (und damit requests bzw. SDKs) legen die Backends erst bei Bedarf an.
+        self.router = self._initialize_router(llm_config.get('routing') or {})
+        self.cache = self._initialize_cache(llm_config.get('cache') or {})
+        self.concurrency = llm_config.get('concurrency') or {}
     
-    def generate_response(self, prompt: str) -> str:
-        return self.provider.generate_response(prompt)
+    def _initialize_router(self, routing: Dict[str, Any]) -> 'LLMRouter':
+        from llm_router import Backend, LLMRouter
+        
+        window = int(routing.get('window', 50))
+        backends = [Backend(self.provider_name, self.provider_name, self.config, window=window)]
+        if routing.get('enabled'):
+            for backend in routing.get('backends', []):
+                backends.append(Backend(backend['name'], backend['provider'], backend['config'],
+                                        backend['small'], window))
+        return LLMRouter(
+            backends,
+            short_prompt_tokens=int(routing.get('short_prompt_tokens', 200)),
+            cooldown=float(routing.get('cooldown', 30)),
+            hedge=bool(routing.get('hedge', False)),
+            hedge_percentile=float(routing.get('hedge_percentile', 95)),
+            hedge_min_ms=float(routing.get('hedge_min_ms', 500)),
+            hedge_initial_ms=float(routing.get('hedge_initial_ms', 5000))
+        )
+    
+    def _initialize_cache(self, cache_config: Dict[str, Any]) -> Optional[LLMCache]:
+        if not cache_config.get('enabled', True):
+            return None
+        return LLMCache(
+            path=cache_config.get('path') or None,
+            max_entries=int(cache_config.get('max_entries', 256)),
+            max_disk_mb=float(cache_config.get('max_disk_mb', 50)),
+            ttl_hours=float(cache_config.get('ttl_hours', 168))
+        )
+    
+    def _signature_backend(self, short: bool) -> 'Backend':
+        # Feste Zuordnung statt Latenz-Rangfolge, damit Cache-Schlüssel stabil bleiben.
+        if short:
+            small = [backend for backend in self.router.backends if backend.small]
+            if small:
+                return small[0]
+        return self.router.primary
+    
+    def _backend_key(self, backend: 'Backend', prompt: str) -> str:
+        params = {key: value for key, value in backend.config.items() if key not in self.CACHE_KEY_EXCLUDE}
+        return LLMCache.make_key(backend.provider_name, params, prompt)
+    
+    # Nachgeschlagen wird beim festen Backend; gespeichert wird unter dem
+    # Backend, das tatsächlich geantwortet hat (Ausweichen, Hedging).
+    def _cache_key(self, prompt: str, short: bool = False) -> str:
+        return self._backend_key(self._signature_backend(short), prompt)
+    
+    def model_signature(self, short: bool = False) -> str:
+        # Kennung für Provider, Modell und antwortrelevante Parameter.
+        return self._cache_key("", short)
+    
+    @property
+    def provider(self) -> LLMProvider:
+        return self.router.primary.provider
+    
+    def warm_up(self):
+        self.router.warm_up()
+    
+    def _is_short(self, prompt_tokens: int, short: Optional[bool]) -> bool:
+        return self.router.is_short(prompt_tokens) if short is None else short
+    
+    def _call_provider(self, call: Callable[[LLMProvider], str], short: bool,
+                       on_backend: Optional[Callable[['Backend'], None]] = None) -> str:
+        start = time.perf_counter()
+        try:
+            response = self.router.call(call, short, on_backend)
+        finally:
+            tracer.record(provider_ms=round((time.perf_counter() - start) * 1000, 3))
+        tracer.record(response_chars=len(response))
+        return response
+    
+    def generate_response(self, prompt: str, use_cache: bool = True, short: Optional[bool] = None) -> str:
+        with tracer.span("llm.generate"):
+            tokens = estimate_tokens(prompt)
+            tracer.record(prompt_chars=len(prompt), prompt_tokens=tokens)
+            short = self._is_short(tokens, short)
+            key = self._cache_key(prompt, short) if self.cache is not None and use_cache else None
+            if key is not None:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    tracer.record(cache_hits=1)
+                    return cached
+            
+            answered: List['Backend'] = []
+            try:
+                response = self._call_provider(lambda provider: provider.generate_response(prompt), short,
+                                               answered.append)
+            except LLMError as e:
+                return str(e)
+            if key is not None:
+                self.cache.put(self._backend_key(answered[0], prompt), response)
+            return response
+    
+    def stream_response(self, prompt: str, use_cache: bool = True, short: Optional[bool] = None) -> Iterator[str]:
+        tokens = estimate_tokens(prompt)
+        tracer.record(prompt_chars=len(prompt), prompt_tokens=tokens)
+        short = self._is_short(tokens, short)
+        key = self._cache_key(prompt, short) if self.cache is not None and use_cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                tracer.record(cache_hits=1)
+                yield cached
+                return
+        
+        parts = []
+        answered: List['Backend'] = []
+        try:
+            for chunk in self.router.stream(lambda provider: provider.stream_response(prompt), short,
+                                            answered.append):
+                parts.append(chunk)
+                yield chunk
+        except LLMError as e:
+            # Fehlertext als eigenes Stück, ggf. nach Teilantworten.
+            yield str(e)
+            return
+        
+        if key is not None and parts:
+            self.cache.put(self._backend_key(answered[0], prompt), "".join(parts))
+    
+    # Chat-Verläufe werden nicht gecacht: Sie wiederholen sich praktisch nie.
+    def chat_response(self, messages: List[Dict[str, str]]) -> str:
+        with tracer.span("llm.chat"):
+            self._record_messages(messages)
+            try:
+                return self._call_provider(lambda provider: provider.chat(messages), short=False)
+            except LLMError as e:
+                return str(e)
+    
+    def stream_chat(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        self._record_messages(messages)
+        try:
+            yield from self.router.stream(lambda provider: provider.stream_chat(messages))
+        except LLMError as e:
+            yield str(e)
+    
+    @staticmethod
+    def _record_messages(messages: List[Dict[str, str]]):
+        chars = sum(len(message['content']) for message in messages)
+        tracer.record(prompt_chars=chars, prompt_tokens=sum(estimate_tokens(m['content']) for m in messages),
+                      messages=len(messages))
+    
+    def generate_many(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                      timeout: Optional[float] = None, use_cache: bool = True, short: bool = False,
+                      on_signature: Optional[Callable[[str], None]] = None) -> List[Union[str, LLMError]]:
+        # Fehlgeschlagene Prompts liefern ihren LLMError statt eines Textes;
+        # on_signature erhält die model_signature des Backends, das geantwortet hat.
+        import asyncio
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            with tracer.span("llm.generate_many"):
+                return asyncio.run(self.agenerate_many(prompts, max_concurrency, timeout, use_cache, short,
+                                                       on_signature))
+        raise RuntimeError("generate_many kann nicht in einer laufenden Event-Loop genutzt werden, "
+                           "stattdessen agenerate_many verwenden")
+    
+    async def agenerate_many(self, prompts: List[str], max_concurrency: Optional[int] = None,
+                             timeout: Optional[float] = None, use_cache: bool = True, short: bool = False,
+                             on_signature: Optional[Callable[[str], None]] = None) -> List[Union[str, LLMError]]:
+        from async_llm import ConcurrentRunner, create_async_provider
+        
+        results: List[Union[str, LLMError, None]] = [None] * len(prompts)
+        keys: List[Optional[str]] = [None] * len(prompts)
+        pending: Dict[str, List[int]] = {}
+        for i, prompt in enumerate(prompts):
+            if self.cache is not None and use_cache:
+                keys[i] = self._cache_key(prompt, short)
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            # Gleiche Prompts nur einmal anfragen.
+            pending.setdefault(prompt, []).append(i)
+        
+        tracer.record(prompts=len(prompts), cache_hits=len(prompts) - sum(map(len, pending.values())),
+                      prompt_chars=sum(map(len, pending)),
+                      prompt_tokens=sum(estimate_tokens(prompt) for prompt in pending))
+        if pending:
+            if max_concurrency is None:
+                max_concurrency = int(self.concurrency.get('max_concurrency', 4))
+            if timeout is None:
+                timeout = float(self.concurrency.get('request_timeout', 120)) or None
+            # Ein Backend pro Stapel: das zurzeit schnellste verfügbare, das sich einrichten lässt.
+            provider, backend, error = None, None, None
+            for backend in self.router.rank(short):
+                config = dict(backend.config)
+                if timeout:
+                    # Abgebrochene Anfragen sollen auch auf HTTP-Ebene enden.
+                    config['timeout'] = min(float(config.get('timeout', timeout)), timeout)
+                try:
+                    provider = create_async_provider(backend.provider_name, config, max_concurrency)
+                    break
+                except LLMSetupError as e:
+                    error = e
+            if provider is None:
+                for indices in pending.values():
+                    for i in indices:
+                        results[i] = error
+                return results
+            runner = ConcurrentRunner(
+                provider,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                max_rate_limit_retries=int(self.concurrency.get('rate_limit_retries', 3)),
+                rate_limit_backoff=float(self.concurrency.get('rate_limit_backoff', 2))
+            )
+            start = time.perf_counter()
+            try:
+                responses = await runner.run_all(list(pending))
+            finally:
+                await provider.aclose()
+            tracer.record(provider_ms=round((time.perf_counter() - start) * 1000, 3))
+            if on_signature is not None:
+                on_signature(self._backend_key(backend, ""))
+            
+            for (prompt, indices), response in zip(pending.items(), responses):
+                for i in indices:
+                    results[i] = response
+                if keys[indices[0]] is not None and not isinstance(response, LLMError):
+                    self.cache.put(self._backend_key(backend, prompt), response)
+        return results
+    
+    def cache_stats(self) -> Dict[str, int]:
+        return self.cache.stats() if self.cache else {}
+    
+    def backend_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.router.summary()
+    
+    def close(self):
+        self.router.close()
+        if self.cache:
+            self.cache.close()
     
     def test_connection(self) -> bool:
+        # Jede Antwort ohne LLMError zeigt, dass ein Backend erreichbar ist.
         try:
-            test_response = self.generate_response("Antworte nur mit 'OK'")
-            return "OK" in test_response or len(test_response) < 50
-        except Exception:
+            self._call_provider(lambda provider: provider.generate_response("Antworte nur mit 'OK'"), short=True)
+            return True
+        except LLMError:
             return False
\ No newline at end of file
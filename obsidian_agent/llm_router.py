@@ -0,0 +1,326 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from llm_manager import LLMError, LLMProvider, create_provider
+from tracing import percentile, tracer
+
+T = TypeVar('T')
+
+# Gleitende Statistik der letzten Anfragen eines Backends.
+class BackendStats:
+    def __init__(self, window: int = 50):
+        self.latencies: "deque[float]" = deque(maxlen=window)
+        self.outcomes: "deque[bool]" = deque(maxlen=window)
+        # Zeit bis zum ersten Stück bei Streams (Maßstab für Hedging beim Streamen)
+        self.first_chunks: "deque[float]" = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool):
+        with self._lock:
+            self.requests += 1
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency_ms)
+            else:
+                self.errors += 1
+
+    def record_first_chunk(self, latency_ms: float):
+        with self._lock:
+            self.first_chunks.append(latency_ms)
+
+    def percentile(self, q: float, first_chunk: bool = False) -> Optional[float]:
+        with self._lock:
+            values = list(self.first_chunks if first_chunk else self.latencies)
+        return percentile(values, q) if values else None
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def expected_ms(self, min_samples: int = 1, failure_ms: float = 5000) -> float:
+        # Median, aufgeschlagen nach Fehlerquote; kaum gemessene Backends zuerst
+        # ausprobieren, damit ein einzelner Ausreißer sie nicht dauerhaft verdrängt.
+        # Fehlschläge zählen auch ohne Messwerte: Ein Backend, das nur scheitert
+        # (z.B. Modell nicht gefunden), rückt nach hinten.
+        error_rate = self.error_rate
+        if len(self.latencies) >= min_samples:
+            expected = self.percentile(50)
+        else:
+            expected = failure_ms if error_rate else 0.0
+        return expected / max(0.05, 1.0 - error_rate)
+
+class Backend:
+    def __init__(self, name: str, provider_name: str, config: Dict[str, Any], small: bool = False,
+                 window: int = 50):
+        self.name = name
+        self.provider_name = provider_name
+        self.config = config
+        self.small = small
+        self.stats = BackendStats(window)
+        self.cooldown_until = 0.0
+        self._provider: Optional[LLMProvider] = None
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self) -> LLMProvider:
+        if self._provider is None:
+            with self._lock:
+                if self._provider is None:
+                    self._provider = create_provider(self.provider_name, self.config)
+        return self._provider
+
+    def available(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def summary(self) -> Dict[str, Any]:
+        p50, p95 = self.stats.percentile(50), self.stats.percentile(95)
+        first_chunk = self.stats.percentile(50, first_chunk=True)
+        return {
+            'provider': self.provider_name,
+            'model': self.config.get('model'),
+            'small': self.small,
+            'requests': self.stats.requests,
+            'errors': self.stats.errors,
+            'error_rate': round(self.stats.error_rate, 3),
+            'p50_ms': round(p50, 1) if p50 is not None else None,
+            'p95_ms': round(p95, 1) if p95 is not None else None,
+            'p50_first_chunk_ms': round(first_chunk, 1) if first_chunk is not None else None,
+            'cooling_down': not self.available(time.monotonic())
+        }
+
+    def close(self):
+        if self._provider is not None:
+            self._provider.close()
+
+# Verteilt Anfragen auf mehrere Backends (Provider + Modell). Kurze Prompts
+# gehen bevorzugt an kleine Modelle, sonst an das schnellste große Backend.
+# Schlägt ein Backend fehl, übernimmt das nächste, und es pausiert für
+# 'cooldown' Sekunden. Mit 'hedge' geht eine Anfrage, die
+# länger als das hedge_percentile-Perzentil des Backends dauert, zusätzlich an
+# das nächste Backend; die erste erfolgreiche Antwort gewinnt. Streams werden
+# nach der Zeit bis zum ersten Stück abgesichert. Wer geantwortet hat, erfahren
+# Aufrufer über on_backend (z.B. für den Cache-Schlüssel).
+class LLMRouter:
+    def __init__(self, backends: List[Backend], short_prompt_tokens: int = 200, cooldown: float = 30.0,
+                 hedge: bool = False, hedge_percentile: float = 95, hedge_min_ms: float = 500,
+                 hedge_initial_ms: float = 5000, min_samples: int = 5, failure_ms: float = 5000,
+                 max_hedges: int = 8):
+        if not backends:
+            raise ValueError("Mindestens ein LLM-Backend ist erforderlich")
+        self.backends = backends
+        self.short_prompt_tokens = short_prompt_tokens
+        self.cooldown = cooldown
+        self.hedge = hedge and len(backends) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_initial_ms = hedge_initial_ms
+        self.min_samples = min_samples
+        # Angenommene Dauer für Backends, die bisher nur Fehler geliefert haben
+        self.failure_ms = failure_ms
+        self.max_hedges = max_hedges
+        # Freie Plätze im Hedge-Pool; sind alle belegt, wird nicht abgesichert.
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    def is_short(self, prompt_tokens: int) -> bool:
+        return prompt_tokens <= self.short_prompt_tokens
+
+    def rank(self, short: bool = False) -> List[Backend]:
+        now = time.monotonic()
+        available = [backend for backend in self.backends if backend.available(now)]
+        # Alle pausiert: trotzdem versuchen, statt sofort aufzugeben.
+        candidates = available or list(self.backends)
+        small = [backend for backend in candidates if backend.small]
+        large = [backend for backend in candidates if not backend.small]
+        by_speed = lambda backends: sorted(backends,
+                                           key=lambda backend: backend.stats.expected_ms(self.min_samples,
+                                                                                         self.failure_ms))
+        if short:
+            return by_speed(small) + by_speed(large)
+        # Kleine Modelle nur als letzte Ausweichmöglichkeit für lange Prompts.
+        return by_speed(large) + by_speed(small)
+
+    def _timed(self, backend: Backend, call: Callable[[LLMProvider], T]) -> T:
+        start = time.perf_counter()
+        try:
+            result = call(backend.provider)
+        except LLMError as e:
+            self._failed(backend, start, e)
+            raise
+        backend.stats.record((time.perf_counter() - start) * 1000, True)
+        return result
+
+    def _failed(self, backend: Backend, start: float, error: LLMError):
+        # Auch Antwort- und Einrichtungsfehler (404 Modell fehlt, ungültiger
+        # Schlüssel) wiederholen sich meist; das Backend pausiert in jedem Fall.
+        backend.stats.record((time.perf_counter() - start) * 1000, False)
+        backend.cooldown_until = time.monotonic() + self.cooldown
+
+    def hedge_delay(self, backend: Backend, first_chunk: bool = False) -> float:
+        samples = backend.stats.first_chunks if first_chunk else backend.stats.latencies
+        if len(samples) < self.min_samples:
+            return self.hedge_initial_ms / 1000
+        return max(self.hedge_min_ms, backend.stats.percentile(self.hedge_percentile, first_chunk)) / 1000
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_hedges, thread_name_prefix="llm-hedge")
+            return self._executor
+
+    @staticmethod
+    def _spawn(run: Callable[[Backend], T], backend: Backend) -> 'Future[T]':
+        # Der erste Versuch läuft in einem eigenen Thread statt im Hedge-Pool:
+        # Verlorene, noch laufende Anfragen können ihn so nicht aufhalten.
+        future: 'Future[T]' = Future()
+
+        def target():
+            try:
+                future.set_result(run(backend))
+            except BaseException as e:
+                future.set_exception(e)
+        threading.Thread(target=target, name=f"llm-{backend.name}", daemon=True).start()
+        return future
+
+    def call(self, call: Callable[[LLMProvider], T], short: bool = False,
+             on_backend: Optional[Callable[[Backend], None]] = None) -> T:
+        order = self.rank(short)
+        error: Optional[LLMError] = None
+        while order:
+            backend = order.pop(0)
+            try:
+                if self.hedge and order:
+                    backend, result = self._race(backend, order, lambda b: self._timed(b, call),
+                                                 self.hedge_delay(backend))
+                else:
+                    result = self._timed(backend, call)
+            except LLMError as e:
+                error = e
+                tracer.record(fallbacks=1)
+                continue
+            if on_backend is not None:
+                on_backend(backend)
+            return result
+        raise error
+
+    def _race(self, backend: Backend, order: List[Backend], run: Callable[[Backend], T],
+              delay: float, discard: Optional[Callable[[T], None]] = None) -> Tuple[Backend, T]:
+        first = self._spawn(run, backend)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return backend, first.result()
+        if not self._hedge_slots.acquire(blocking=False):
+            tracer.record(hedge_skipped=1)
+            return backend, first.result()
+        # Das zweite Backend wird verbraucht; die langsamere Anfrage läuft im
+        # Hintergrund zu Ende und fließt noch in die Statistik ein. Einen
+        # verlorenen Stream schließt discard nach seinem ersten Stück.
+        second_backend = order.pop(0)
+        tracer.record(hedged=1)
+        second = self._pool().submit(run, second_backend)
+        second.add_done_callback(lambda _: self._hedge_slots.release())
+        futures = {first: backend, second: second_backend}
+        pending = set(futures)
+        error: Optional[LLMError] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except LLMError as e:
+                    error = e
+                    continue
+                if discard is not None:
+                    for other in futures:
+                        if other is not future:
+                            other.add_done_callback(lambda f: self._dispose(f, discard))
+                return futures[future], result
+        raise error
+
+    def _open(self, backend: Backend, call: Callable[[LLMProvider], Iterator[str]]
+              ) -> Tuple[float, Optional[str], Iterator[str]]:
+        # Stream starten und auf das erste Stück warten (None: leerer Stream).
+        start = time.perf_counter()
+        try:
+            chunks = iter(call(backend.provider))
+            first = next(chunks, None)
+        except LLMError as e:
+            self._failed(backend, start, e)
+            raise
+        if first is not None:
+            backend.stats.record_first_chunk((time.perf_counter() - start) * 1000)
+        return start, first, chunks
+
+    @staticmethod
+    def _dispose(future: Future, discard: Callable[[T], None]):
+        if future.exception() is None:
+            discard(future.result())
+
+    @staticmethod
+    def _close(chunks: Iterator[str]):
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+    def stream(self, call: Callable[[LLMProvider], Iterator[str]], short: bool = False,
+               on_backend: Optional[Callable[[Backend], None]] = None) -> Iterator[str]:
+        # Ausweichen nur, solange noch nichts ausgegeben wurde. Beim Hedging
+        # gewinnt der Stream mit dem ersten Stück, der andere wird geschlossen.
+        order = self.rank(short)
+        error: Optional[LLMError] = None
+        while order:
+            backend = order.pop(0)
+            try:
+                if self.hedge and order:
+                    backend, (start, first, chunks) = self._race(
+                        backend, order, lambda b: self._open(b, call), self.hedge_delay(backend, first_chunk=True),
+                        discard=lambda opened: self._close(opened[2]))
+                else:
+                    start, first, chunks = self._open(backend, call)
+            except LLMError as e:
+                error = e
+                tracer.record(fallbacks=1)
+                continue
+            if on_backend is not None:
+                on_backend(backend)
+            try:
+                if first is not None:
+                    yield first
+                    yield from chunks
+            except LLMError as e:
+                self._failed(backend, start, e)
+                raise
+            finally:
+                self._close(chunks)
+            backend.stats.record((time.perf_counter() - start) * 1000, True)
+            return
+        raise error
+
+    def warm_up(self):
+        # Ein falsch eingerichtetes Backend hält die übrigen nicht auf.
+        for backend in self.backends:
+            try:
+                backend.provider.warm_up()
+            except LLMError:
+                backend.cooldown_until = time.monotonic() + self.cooldown
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {backend.name: backend.summary() for backend in self.backends}
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        for backend in self.backends:
+            backend.close()
@@ -0,0 +1,157 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import yaml
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    _YamlLoader = yaml.SafeLoader
+
+# Zeilenweise statt zeichenweise bis zur schließenden ---/...-Zeile.
+FRONTMATTER_PATTERN = re.compile(r'---[ \t]*\r?\n((?:[^\n]*\n)+?)(?:---|\.\.\.)[ \t]*(?:\r?\n|\Z)')
+
+# Code wird nicht herausgeschnitten (das kopiert das ganze Dokument), sondern
+# übersprungen: Die übrigen Muster laufen per pos/endpos nur über den Text
+# zwischen Code-Blöcken und Inline-Code, je einen Durchlauf in C:
+# erste H1 als Titel, Tags nur am Wortanfang (keine URL-Anker, keine reinen
+# Zahlen), Wikilinks und Embeds, normalisiert ([[ziel#abschnitt|alias]] -> ziel).
+# Jedes Muster beginnt mit genau einem festen Zeichen, damit die Engine direkt zu
+# Kandidaten springt (ein längeres Präfix sucht sie deutlich langsamer);
+# Zeilenanfänge prüft ein Lookbehind danach (statt ^ mit re.M).
+CODE_PATTERN = re.compile(
+    r'`(?:(?<![^\n]`)``[^\n]*(?:\n(?!```)[^\n]*)*(?:\n```[^\n]*|\Z)|[^`\n]+`)'
+)
+# Mit ~~~-Blöcken ohne festes erstes Zeichen und damit langsamer; nur wenn das
+# Dokument überhaupt ~ enthält (Prüfungen auf ein Zeichen laufen per memchr).
+CODE_PATTERN_WITH_TILDE = re.compile(
+    r'([`~])(?<![^\n][`~])\1\1[^\n]*(?:\n(?!\1\1\1)[^\n]*)*(?:\n\1\1\1[^\n]*|\Z)|`[^`\n]+`'
+)
+H1_PATTERN = re.compile(r'#(?<![^\n]#)[ \t]+([^\n]*)')
+# Erst Ziffern/_/-//, dann mindestens ein Buchstabe: kein Backtracking.
+INLINE_TAG_PATTERN = re.compile(r'#(?<![^\s(\[,]#)([\d_/-]*[^\W\d_][\w/-]*)')
+LINK_TARGET = r'\[\[([^\]|#\n]*)[^\]\n]*\]\]'
+LINK_PATTERN = re.compile(LINK_TARGET)
+EMBED_PATTERN = re.compile('!' + LINK_TARGET)
+
+@dataclass
+class MarkdownInfo:
+    title: str
+    tags: List[str] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    embeds: List[str] = field(default_factory=list)
+    aliases: List[str] = field(default_factory=list)
+
+LIST_SPLIT_PATTERN = re.compile(r'[,\s]+')
+
+def _as_list(value: Any, split: bool = True) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        if not split:
+            return [value]
+        return [part for part in LIST_SPLIT_PATTERN.split(value) if part]
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value if item is not None]
+    return [str(value)]
+
+FRONTMATTER_KEYS = ('tags', 'tag', 'aliases', 'alias')
+
+# Schneller Weg für die üblichen Formen (key: wert, key: [a, b], Blocklisten);
+# alles andere geht an PyYAML.
+def _parse_frontmatter_simple(block: str) -> Optional[dict]:
+    data = {}
+    current = None
+    for line in block.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if current is not None and stripped.startswith('- ') and line[:1] in (' ', '-'):
+            data[current].append(stripped[2:].strip().strip('"\''))
+            continue
+        key, sep, value = line.partition(':')
+        if not sep or key != key.strip() or key.startswith(('-', ' ')):
+            return None
+        current = None
+        if key not in FRONTMATTER_KEYS:
+            continue
+        value = value.strip()
+        if not value:
+            data[key] = []
+            current = key
+        elif value.startswith('[') and value.endswith(']'):
+            data[key] = [item.strip().strip('"\'') for item in value[1:-1].split(',') if item.strip()]
+        elif value[0] in '{|>&*!':
+            return None
+        else:
+            data[key] = value.strip('"\'')
+    return data
+
+def _parse_frontmatter(block: str) -> dict:
+    data = _parse_frontmatter_simple(block)
+    if data is not None:
+        return data
+    try:
+        data = yaml.load(block, Loader=_YamlLoader)
+    except yaml.YAMLError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def scan_markdown(content: str, filename: str) -> MarkdownInfo:
+    title = filename
+    tags = {}
+    aliases = []
+    start = 0
+
+    match = FRONTMATTER_PATTERN.match(content) if content.startswith('---') else None
+    if match:
+        start = match.end()
+        frontmatter = _parse_frontmatter(match.group(1))
+        for tag in _as_list(frontmatter.get('tags', frontmatter.get('tag'))):
+            tags.setdefault(tag.lstrip('#'), None)
+        aliases = _as_list(frontmatter.get('aliases', frontmatter.get('alias')), split=False)
+        aliases = [alias.strip() for alias in aliases if alias.strip()]
+
+    # Code-Blöcke und Inline-Code als (start, end), in Dokumentreihenfolge.
+    if '~' in content:
+        code = [block.span() for block in CODE_PATTERN_WITH_TILDE.finditer(content, start)]
+    elif '`' in content:
+        code = [block.span() for block in CODE_PATTERN.finditer(content, start)]
+    else:
+        code = []
+    code.append((len(content), len(content)))
+
+    # Eine Überschrift kann nur in einem Code-Block beginnen (Inline-Code endet
+    # vor dem Zeilenende), ihr Text behält Inline-Code wie geschrieben.
+    heading = H1_PATTERN.search(content, start)
+    index = 0
+    while heading is not None:
+        position = heading.start()
+        while code[index][1] <= position:
+            index += 1
+        if code[index][0] <= position:
+            heading = H1_PATTERN.search(content, code[index][1])
+        elif heading[1].strip():
+            title = heading[1].strip()
+            break
+        else:
+            heading = H1_PATTERN.search(content, heading.end())
+
+    found_tags = []
+    found_links = []
+    found_embeds = []
+    has_embeds = '!' in content
+    for begin, end in code:
+        found_tags += INLINE_TAG_PATTERN.findall(content, start, begin)
+        found_links += LINK_PATTERN.findall(content, start, begin)
+        if has_embeds:
+            found_embeds += EMBED_PATTERN.findall(content, start, begin)
+        start = end
+    # dict.fromkeys entfernt Duplikate in C und behält die Reihenfolge bei.
+    tags.update(dict.fromkeys(found_tags))
+    links = dict.fromkeys(map(str.strip, found_links))
+    links.pop('', None)
+    embeds = dict.fromkeys(map(str.strip, found_embeds))
+    embeds.pop('', None)
+    return MarkdownInfo(title, list(tags), list(links), list(embeds), aliases)
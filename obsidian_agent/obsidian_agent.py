@@ -1,42 +1,205 @@
-from typing import List, Dict, Any
-from vault_reader import VaultReader, Note
-from llm_manager import LLMManager
+import os
+import threading
+from typing import List, Dict, Any, Iterator, Optional, Union
+from vault_reader import VaultDelta, Note
+from sharded_vault import create_vault_reader
+from chunker import ChunkCache
+from context_packer import ContextPacker, ContextItem, strip_boilerplate
+from summarizer import VaultSummarizer
+from summary_store import SummaryStore
+from conversation import Conversation
+from llm_manager import LLMManager, is_error_response
 from config_manager import ConfigManager
+from tracing import tracer, traced
 
 class ObsidianAgent:
     def __init__(self, config_path: str = None):
         self.config_manager = ConfigManager(config_path)
-        self.vault_reader = VaultReader(self.config_manager.get_vault_path())
+        tracer.configure(**self.config_manager.get_tracing_config())
+        vault_config = self.config_manager.get_vault_config()
+        self.vault_reader = create_vault_reader(
+            self.config_manager.get_vault_shards(),
+            use_cache=vault_config['cache'],
+            ignore=vault_config['ignore'],
+            scan_workers=vault_config['scan_workers'],
+            scan_executor=vault_config['scan_executor']
+        )
+        if vault_config['watch']:
+            self.vault_reader.start_watching(vault_config['watch_interval'])
         self.llm_manager = LLMManager(self.config_manager.get_llm_config())
         self.agent_config = self.config_manager.get_agent_config()
+        self.chunk_cache = ChunkCache(self.agent_config.get('passage_max_chars', 800))
+        self.packer = ContextPacker(self.config_manager.get_context_budget())
+        self.summarizer = VaultSummarizer(
+            self.llm_manager,
+            self.packer,
+            self.chunk_cache,
+            store=SummaryStore(self.agent_config.get('summary_cache_path') or None, vault=self._vault_key())
+                  if self.agent_config.get('summary_cache', True) else None,
+            map_words=self.agent_config.get('summary_map_words', 80)
+        )
+        self.vault_reader.add_listener(self._on_vault_change)
+        self.conversation = Conversation()
     
-    def search_and_answer(self, query: str) -> str:
+    def _vault_key(self) -> str:
+        # Eine Zusammenfassungs-Datei kann mehreren Vaults dienen; jeder räumt nur seine Zeilen auf.
+        return os.pathsep.join(sorted(os.path.realpath(shard['path'])
+                                      for shard in self.config_manager.get_vault_shards()))
+    
+    def warm_up(self) -> threading.Thread:
+        # Index aufbauen und LLM-Provider anlegen, während der Nutzer noch tippt.
+        # Fehler tauchen bei der ersten echten Anfrage erneut auf.
+        def run():
+            try:
+                if not self.vault_reader.is_watching():
+                    self.vault_reader.refresh()
+                self.llm_manager.warm_up()
+            except Exception:
+                pass
+        thread = threading.Thread(target=run, name="agent-warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def close(self):
+        self.vault_reader.close()
+        self.llm_manager.close()
+        if self.summarizer.store:
+            self.summarizer.store.close()
+    
+    def get_config_summary(self) -> Dict[str, Any]:
+        return {
+            'vault_path': ', '.join(shard['path'] for shard in self.config_manager.get_vault_shards()),
+            'provider': self.llm_manager.provider_name,
+            'backends': [backend.name for backend in self.llm_manager.router.backends],
+            'max_notes_per_query': self.agent_config.get('max_notes_per_query', 10),
+            'llm_cache': self.llm_manager.cache_stats()
+        }
+    
+    def test_connection(self) -> bool:
+        return self.llm_manager.test_connection()
+    
+    def get_performance(self) -> Dict[str, Any]:
+        last = tracer.last()
+        return {'last': last.to_dict() if last else None, 'percentiles': tracer.percentiles(),
+                'backends': self.llm_manager.backend_stats()}
+    
+    def _on_vault_change(self, delta: VaultDelta):
+        stale = list(delta.removed) + [old_path for old_path, _ in delta.renamed]
+        self.chunk_cache.discard([self.vault_reader.note_path(rel_path) for rel_path in stale])
+    
+    @traced("ask")
+    def search_and_answer(self, query: str, stream: bool = False) -> Union[str, Iterator[str]]:
         relevant_notes = self._find_relevant_notes(query)
         
         if not relevant_notes:
-            return "Keine relevanten Notizen für deine Frage gefunden."
+            return self._message("Keine relevanten Notizen für deine Frage gefunden.", stream)
         
-        context = self._prepare_context(relevant_notes, query)
-        prompt = self._create_prompt(query, context)
+        with tracer.span("prompt.build"):
+            budget = self._context_budget(self._create_prompt(query, ""))
+            context = self._prepare_context(relevant_notes, query, budget)
+            prompt = self._create_prompt(query, context)
         
-        return self.llm_manager.generate_response(prompt)
+        return self._respond(prompt, stream)
+    
+    def new_conversation(self) -> Conversation:
+        self.conversation = Conversation()
+        return self.conversation
     
-    def summarize_notes(self, search_term: str = None, tags: List[str] = None) -> str:
-        if search_term:
-            notes = self.vault_reader.search_notes(search_term, "both")
-        elif tags:
-            notes = self.vault_reader.search_by_tags(tags)
-        else:
-            notes = self.vault_reader.get_all_notes()
+    @traced("chat")
+    def chat(self, question: str, stream: bool = False,
+             conversation: Optional[Conversation] = None) -> Union[str, Iterator[str]]:
+        conversation = conversation or self.conversation
+        found = self._find_relevant_notes(question)
         
-        if not notes:
-            return "Keine Notizen gefunden."
+        if not found and not conversation.turns:
+            return self._message("Keine relevanten Notizen für deine Frage gefunden.", stream)
+        
+        with tracer.span("prompt.build"):
+            # Bisherige Treffer bleiben Kandidaten, bereits gesendete Passagen werden ausgelassen.
+            max_notes = self.agent_config.get('max_notes_per_query', 10)
+            found_paths = {note.file_path for note in found}
+            pinned = [note for path, note in conversation.pinned_notes.items() if path not in found_paths]
+            candidates = found + pinned[-max_notes:]
+            
+            # Höchstens das halbe Budget pro Runde; ältere Runden weichen erst, wenn
+            # für neue Passagen weniger als ein Viertel übrig bliebe.
+            skeleton = self.packer.estimate(self._create_chat_message(question, ""))
+            turn_budget = self.packer.budget_tokens // 2
+            dropped = conversation.trim(self.packer.budget_tokens - skeleton - self.packer.budget_tokens // 4)
+            budget = min(turn_budget, self.packer.budget_tokens - skeleton - conversation.tokens())
+            
+            packed = []
+            if candidates and budget >= self.packer.min_item_tokens:
+                packed = self._pack_passages(candidates, question, budget, conversation.pinned_passages)
+            context = self._format_passages(packed, start=conversation.passage_count + 1)
+            message = self._create_chat_message(question, context)
+            messages = conversation.messages + [{'role': 'user', 'content': message}]
+            tracer.record(history_turns=conversation.turns, new_passages=len(packed), dropped_turns=dropped)
         
+        passage_ids = [item.key for item in packed]
+        if stream:
+            return tracer.stream(self._stream_turn(conversation, message, messages, found, passage_ids))
+        answer = self.llm_manager.chat_response(messages)
+        if not is_error_response(answer):
+            conversation.add_turn(message, answer, found, passage_ids)
+        return answer
+    
+    def _stream_turn(self, conversation: Conversation, message: str, messages: List[Dict[str, str]],
+                     notes: List[Note], passage_ids: List[str]) -> Iterator[str]:
+        parts = []
+        for chunk in self.llm_manager.stream_chat(messages):
+            parts.append(chunk)
+            yield chunk
+        # Nur vollständige Antworten ohne Fehler in den Verlauf übernehmen.
+        if parts and not any(is_error_response(part) for part in parts):
+            conversation.add_turn(message, "".join(parts), notes, passage_ids)
+    
+    def _create_chat_message(self, question: str, context: str) -> str:
+        if not context:
+            return f"Frage: {question}"
+        return f"""Neue Passagen aus den Notizen:
+{context}
+Frage: {question}"""
+    
+    @traced("summarize")
+    def summarize_notes(self, search_term: str = None, tags: List[str] = None,
+                        stream: bool = False) -> Union[str, Iterator[str]]:
         max_notes = self.agent_config.get('max_notes_per_query', 10)
-        notes = notes[:max_notes]
+        if not search_term and not tags:
+            return self._summarize_vault(stream)
+        with tracer.span("search"):
+            if search_term:
+                notes = list(self.vault_reader.iter_search_notes(search_term, "both", limit=max_notes))
+            else:
+                notes = list(self.vault_reader.iter_search_by_tags(tags, limit=max_notes))
+        
+        if not notes:
+            return self._message("Keine Notizen gefunden.", stream)
+        
+        with tracer.span("prompt.build"):
+            budget = self._context_budget(self._create_summary_prompt(""))
+            context = self._prepare_notes_for_summary(notes, budget)
+            prompt = self._create_summary_prompt(context)
         
-        context = self._prepare_notes_for_summary(notes)
-        prompt = f"""Erstelle eine strukturierte Zusammenfassung der folgenden Notizen:
+        return self._respond(prompt, stream)
+    
+    def _summarize_vault(self, stream: bool) -> Union[str, Iterator[str]]:
+        # Ganzer Vault: Map-Reduce über alle Notizen statt der ersten max_notes.
+        notes = self.vault_reader.get_all_notes()
+        if not notes:
+            return self._message("Keine Notizen gefunden.", stream)
+        
+        budget = self._context_budget(self._create_summary_prompt(""))
+        with tracer.span("summarize.map_reduce"):
+            context, failures = self.summarizer.summarize(notes, budget, prune=True)
+        if not context:
+            return self._message(f"Zusammenfassung fehlgeschlagen: {failures} Anfragen ohne Antwort.", stream)
+        prompt = self._create_summary_prompt(context)
+        
+        return self._respond(prompt, stream)
+    
+    def _create_summary_prompt(self, context: str) -> str:
+        return f"""Erstelle eine strukturierte Zusammenfassung der folgenden Notizen:
 
 {context}
 
@@ -47,28 +210,50 @@ Erstelle eine Zusammenfassung mit:
 4. Actionable Items (falls vorhanden)
 
 Halte die Zusammenfassung auf maximal {self.agent_config.get('summary_max_length', 500)} Wörter."""
-        
-        return self.llm_manager.generate_response(prompt)
     
-    def get_note_details(self, note_title: str) -> str:
+    @traced("note")
+    def get_note_details(self, note_title: str, stream: bool = False) -> Union[str, Iterator[str]]:
         note = self.vault_reader.get_note_by_title(note_title)
         
         if not note:
-            return f"Notiz '{note_title}' nicht gefunden."
+            return self._message(f"Notiz '{note_title}' nicht gefunden.", stream)
         
-        linked_notes = self.vault_reader.get_linked_notes(note_title)
+        with tracer.span("graph"):
+            links = self._describe_note_links(note)
+        with tracer.span("prompt.build"):
+            budget = self._context_budget(self._create_note_details_prompt(note, links, ""))
+            content = self.packer.truncate(strip_boilerplate(note.content), budget)
+            prompt = self._create_note_details_prompt(note, links, content)
         
-        prompt = f"""Analysiere die folgende Notiz und erstelle eine strukturierte Übersicht:
+        return self._respond(prompt, stream)
+    
+    def _describe_note_links(self, note: Note) -> str:
+        backlinks = self.vault_reader.get_linked_notes(note.title)
+        outgoing = self.vault_reader.get_outgoing_notes(note.title)
+        second_hop = [n for n, distance in self.vault_reader.get_neighborhood(note.title, hops=2) if distance == 2]
+        return f"""**Verlinkte Notizen:** {len(backlinks)} Notizen
+**Verlinkt von:** {self._titles(backlinks)}
+**Verlinkt auf:** {self._titles(outgoing)}
+**Weiteres Umfeld (2 Schritte):** {self._titles(second_hop)}"""
+    
+    def _titles(self, notes: List[Note]) -> str:
+        max_titles = self.agent_config.get('max_notes_per_query', 10)
+        if not notes:
+            return 'Keine'
+        return ', '.join(note.title for note in notes[:max_titles]) + (' ...' if len(notes) > max_titles else '')
+    
+    def _create_note_details_prompt(self, note: Note, links: str, content: str) -> str:
+        return f"""Analysiere die folgende Notiz und erstelle eine strukturierte Übersicht:
 
 **Titel:** {note.title}
 **Pfad:** {note.file_path}
 **Erstellt:** {note.created_time.strftime('%d.%m.%Y %H:%M')}
 **Geändert:** {note.modified_time.strftime('%d.%m.%Y %H:%M')}
 **Tags:** {', '.join(note.tags) if note.tags else 'Keine Tags'}
-**Verlinkte Notizen:** {len(linked_notes)} Notizen
+{links}
 
 **Inhalt:**
-{note.content}
+{content}
 
 Erstelle eine Analyse mit:
 1. Kurzer Zusammenfassung des Inhalts
@@ -76,21 +261,42 @@ Erstelle eine Analyse mit:
 3. Verbindungen zu anderen Notizen
 4. Wichtige Erkenntnisse oder Actionable Items
 """
-        
-        return self.llm_manager.generate_response(prompt)
     
-    def find_connections(self, topic: str) -> str:
-        relevant_notes = self.vault_reader.search_notes(topic, "both")
+    @traced("connections")
+    def find_connections(self, topic: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        max_notes = self.agent_config.get('max_notes_per_query', 10)
+        with tracer.span("search"):
+            seeds = list(self.vault_reader.iter_search_notes(topic, "both", limit=max_notes))
+        with tracer.span("graph"):
+            # Treffer um strukturell verbundene Notizen aus dem Link-Graph ergänzen.
+            related = self.vault_reader.get_related_notes(seeds, limit=max(1, max_notes // 2))
+            relevant_notes = seeds + related
         
         if len(relevant_notes) < 2:
-            return f"Nicht genügend Notizen zum Thema '{topic}' für Verbindungsanalyse gefunden."
-        
-        max_notes = self.agent_config.get('max_notes_per_query', 10)
-        relevant_notes = relevant_notes[:max_notes]
+            return self._message(f"Nicht genügend Notizen zum Thema '{topic}' für Verbindungsanalyse gefunden.", stream)
         
-        context = self._prepare_context(relevant_notes, topic)
+        with tracer.span("graph"):
+            structure = self._describe_link_structure(relevant_notes, related)
+        with tracer.span("prompt.build"):
+            budget = self._context_budget(self._create_connections_prompt(topic, structure, ""))
+            context = self._prepare_context(relevant_notes, topic, budget)
+            prompt = self._create_connections_prompt(topic, structure, context)
         
-        prompt = f"""Analysiere die Verbindungen zwischen diesen Notizen zum Thema '{topic}':
+        return self._respond(prompt, stream)
+    
+    def _describe_link_structure(self, notes: List[Note], related: List[Note]) -> str:
+        edges, paths = self.vault_reader.get_link_structure(notes)
+        lines = [f"- {source.title} → {target.title}" for source, target in edges]
+        lines.extend(f"- Pfad: {' → '.join(note.title for note in path)}" for path in paths)
+        if related:
+            lines.append(f"- Über Links verbunden (ohne Treffer im Text): {', '.join(note.title for note in related)}")
+        return "\n".join(lines) if lines else "Keine Links zwischen diesen Notizen."
+    
+    def _create_connections_prompt(self, topic: str, structure: str, context: str) -> str:
+        return f"""Analysiere die Verbindungen zwischen diesen Notizen zum Thema '{topic}':
+
+Link-Struktur:
+{structure}
 
 {context}
 
@@ -101,39 +307,65 @@ Identifiziere und erkläre:
 4. Mögliche Zusammenhänge die nicht offensichtlich sind
 5. Empfehlungen für weitere Verbindungen
 """
-        
-        return self.llm_manager.generate_response(prompt)
     
     def _find_relevant_notes(self, query: str) -> List[Note]:
         search_depth = self.agent_config.get('search_depth', 'content')
         max_notes = self.agent_config.get('max_notes_per_query', 10)
         
-        notes = self.vault_reader.search_notes(query, search_depth)
+        return self.vault_reader.search_notes(query, search_depth, top_k=max_notes)
+    
+    def _respond(self, prompt: str, stream: bool) -> Union[str, Iterator[str]]:
+        if stream:
+            return tracer.stream(self.llm_manager.stream_response(prompt))
+        return self.llm_manager.generate_response(prompt)
+    
+    def _message(self, text: str, stream: bool) -> Union[str, Iterator[str]]:
+        return iter([text]) if stream else text
+    
+    def _context_budget(self, prompt_skeleton: str) -> int:
+        return max(self.packer.min_item_tokens,
+                   self.packer.budget_tokens - self.packer.estimate(prompt_skeleton))
+    
+    def _prepare_context(self, notes: List[Note], query: str, budget: int) -> str:
+        return self._format_passages(self._pack_passages(notes, query, budget))
+    
+    def _pack_passages(self, notes: List[Note], query: str, budget: int,
+                       exclude: Optional[set] = None) -> List[ContextItem]:
+        max_passages = self.agent_config.get('max_passages_per_query', 8)
+        exclude = exclude or set()
+        ranked = self.chunk_cache.rank(query, notes, max_passages * 2 + len(exclude))
         
-        return sorted(notes, key=lambda x: x.modified_time, reverse=True)[:max_notes]
+        items = []
+        for passage, score in ranked:
+            if passage.passage_id in exclude:
+                continue
+            location = f"{passage.note_title} › {passage.heading}" if passage.heading else passage.note_title
+            items.append(ContextItem(location, passage.text, score, passage.file_path, passage.passage_id))
+        return self.packer.pack(items, budget)[:max_passages]
     
-    def _prepare_context(self, notes: List[Note], query: str) -> str:
+    def _format_passages(self, packed: List[ContextItem], start: int = 1) -> str:
         context_parts = []
-        
-        for i, note in enumerate(notes, 1):
-            context_parts.append(f"""--- Notiz {i}: {note.title} ---
-Pfad: {note.file_path}
-Tags: {', '.join(note.tags) if note.tags else 'Keine'}
-Inhalt: {note.content[:1000]}{"..." if len(note.content) > 1000 else ""}
+        for i, item in enumerate(packed, start):
+            context_parts.append(f"""--- Passage {i}: {item.label} ---
+Pfad: {item.source}
+{item.text}
 """)
         
         return "\n".join(context_parts)
     
-    def _prepare_notes_for_summary(self, notes: List[Note]) -> str:
-        context_parts = []
+    def _prepare_notes_for_summary(self, notes: List[Note], budget: int) -> str:
+        # Gleicher Anteil am Budget pro Notiz, Reihenfolge nach Relevanz.
+        items = [
+            ContextItem(
+                f"**{note.title}**\nTags: {', '.join(note.tags) if note.tags else 'Keine'}",
+                note.content,
+                score=len(notes) - i
+            )
+            for i, note in enumerate(notes)
+        ]
+        packed = self.packer.pack(items, budget, max_item_tokens=budget // len(notes))
         
-        for note in notes:
-            context_parts.append(f"""**{note.title}**
-Tags: {', '.join(note.tags) if note.tags else 'Keine'}
-{note.content[:800]}{"..." if len(note.content) > 800 else ""}
-""")
-        
-        return "\n\n".join(context_parts)
+        return "\n\n".join(f"{item.label}\n{item.text}\n" for item in packed)
     
     def _create_prompt(self, query: str, context: str) -> str:
         return f"""Du bist ein hilfreicher Assistent, der Fragen zu einem Obsidian Vault beantwortet.
@@ -146,27 +378,26 @@ Kontext aus den Notizen:
 Beantworte die Frage basierend auf den bereitgestellten Notizen. Wenn die Antwort nicht vollständig in den Notizen steht, gib das an. Verweise auf spezifische Notizen wenn möglich.
 """
     
+    @traced("stats")
     def get_vault_statistics(self) -> str:
-        notes = self.vault_reader.get_all_notes()
+        stats = self.vault_reader.get_statistics(top_k=10)
+        top_tags = ', '.join(f"{tag} ({count})" for tag, count in stats['top_tags'])
         
-        total_notes = len(notes)
-        all_tags = set()
-        all_links = set()
-        total_content_length = 0
-        
-        for note in notes:
-            all_tags.update(note.tags)
-            all_links.update(note.links)
-            total_content_length += len(note.content)
-        
-        stats = f"""**Vault Statistiken:**
-- Gesamt Notizen: {total_notes}
-- Eindeutige Tags: {len(all_tags)}
-- Eindeutige Links: {len(all_links)}
-- Durchschnittliche Notizlänge: {total_content_length // total_notes if total_notes > 0 else 0} Zeichen
+        return f"""**Vault Statistiken:**
+- Gesamt Notizen: {stats['notes']}
+- Eindeutige Tags: {stats['unique_tags']}
+- Eindeutige Links: {stats['unique_links']}
+- Verbindungen zwischen Notizen: {stats['edges']}
+- Verwaiste Notizen: {stats['orphans']}
+- Defekte Links: {stats['broken_links']}
+- Gesamtgröße: {stats['total_bytes']} Bytes
+- Durchschnittliche Notizlänge: {stats['average_bytes']} Bytes
 
 **Häufigste Tags:**
-{', '.join(list(all_tags)[:10]) if all_tags else 'Keine Tags gefunden'}
-"""
-        
-        return stats
\ No newline at end of file
+{top_tags or 'Keine Tags gefunden'}
+{self._describe_shards(stats.get('shards'))}"""
+    
+    def _describe_shards(self, shards: Optional[Dict[str, int]]) -> str:
+        if not shards:
+            return ""
+        return "\n**Vaults:**\n" + "\n".join(f"- {name}: {count} Notizen" for name, count in shards.items()) + "\n"
\ No newline at end of file
@@ -0,0 +1,126 @@
+import http.client
+import json
+import socket
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Union
+from urllib.parse import urlsplit
+
+DEFAULT_ADDRESS = "http://127.0.0.1:8765"
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+# Schlanker Client für den Abfrage-Server mit derselben Schnittstelle wie
+# ObsidianAgent (soweit die CLI sie nutzt). Kommt ohne yaml, requests und
+# Provider-SDKs aus, damit 'cli_chatbot.py --connect' sofort startet.
+# Adressen: "http://host:port" oder "unix:/pfad/zum/socket".
+class RemoteAgent:
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 300.0):
+        self.address = address
+        self.timeout = timeout
+        if address.startswith("unix:"):
+            self._socket_path: Optional[str] = address[len("unix:"):]
+        else:
+            self._socket_path = None
+            parts = urlsplit(address if "://" in address else f"http://{address}")
+            self._host = parts.hostname or "127.0.0.1"
+            self._port = parts.port or 8765
+        self.session = uuid.uuid4().hex
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._socket_path:
+            return UnixHTTPConnection(self._socket_path, timeout=self.timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _open(self, method: str, path: str, body: Optional[Dict[str, Any]] = None):
+        connection = self._connection()
+        try:
+            payload = json.dumps(body).encode('utf-8') if body is not None else None
+            headers = {'Content-Type': 'application/json'} if payload is not None else {}
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+        except OSError as e:
+            connection.close()
+            raise ConnectionError(f"Server unter {self.address} nicht erreichbar: {e}")
+        if response.status != 200:
+            try:
+                message = json.loads(response.read() or b"{}").get('error', response.reason)
+            except ValueError:
+                message = response.reason
+            connection.close()
+            raise RuntimeError(f"Server-Fehler {response.status}: {message}")
+        return connection, response
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        connection, response = self._open(method, path, body)
+        try:
+            return json.loads(response.read())
+        finally:
+            connection.close()
+
+    def _stream(self, path: str, body: Dict[str, Any]) -> Iterator[str]:
+        connection, response = self._open("POST", path, dict(body, stream=True))
+        try:
+            for line in response:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if 'chunk' in data:
+                    yield data['chunk']
+                if data.get('error'):
+                    raise RuntimeError(data['error'])
+                if data.get('done'):
+                    break
+        finally:
+            connection.close()
+
+    def _call(self, path: str, body: Dict[str, Any], stream: bool) -> Union[str, Iterator[str]]:
+        if stream:
+            return self._stream(path, body)
+        return self._request("POST", path, body)['result']
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/health")
+
+    def search_and_answer(self, query: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        return self._call("/ask", {'question': query}, stream)
+
+    def chat(self, question: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        return self._call("/chat", {'question': question, 'session': self.session}, stream)
+
+    def new_conversation(self):
+        self._request("POST", "/chat/reset", {'session': self.session})
+        self.session = uuid.uuid4().hex
+
+    def summarize_notes(self, search_term: str = None, tags: List[str] = None,
+                        stream: bool = False) -> Union[str, Iterator[str]]:
+        return self._call("/summarize", {'search_term': search_term, 'tags': tags}, stream)
+
+    def get_note_details(self, note_title: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        return self._call("/note", {'title': note_title}, stream)
+
+    def find_connections(self, topic: str, stream: bool = False) -> Union[str, Iterator[str]]:
+        return self._call("/connections", {'topic': topic}, stream)
+
+    def get_vault_statistics(self) -> str:
+        return self._request("GET", "/stats")['result']
+
+    def get_config_summary(self) -> Dict[str, Any]:
+        return dict(self._request("GET", "/config"), server=self.address)
+
+    def get_performance(self) -> Dict[str, Any]:
+        return self._request("GET", "/perf")
+
+    def test_connection(self) -> bool:
+        return self._request("POST", "/test", {})['ok']
+
+    def close(self):
+        pass
@@ -0,0 +1,276 @@
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, Iterator, Optional
+from conversation import Conversation
+from llm_manager import is_error_response
+
+class QueueFull(Exception):
+    pass
+
+# Lokaler Abfrage-Server: hält einen Agenten mit warmem Index im Speicher und
+# bedient viele Clients (Skripte, Editor-Plugins, 'cli_chatbot.py --connect').
+# Jede Verbindung läuft in einem eigenen Thread; höchstens max_active Anfragen
+# arbeiten gleichzeitig, bis zu max_queue weitere warten, darüber gibt es 503.
+#
+#   GET  /health, /stats, /config, /perf
+#   POST /ask {"question"}, /summarize {"search_term", "tags"}, /note {"title"},
+#        /connections {"topic"}, /test, /chat {"question", "session"},
+#        /chat/reset {"session"}
+#
+# Gespräche (/chat) werden pro Session-ID im Server gehalten; die ältesten
+# werden verworfen, wenn mehr als max_sessions offen sind.
+# Mit "stream": true antworten die POST-Endpunkte als NDJSON ({"chunk": ...}
+# pro Teilstück, zum Schluss {"done": true, "elapsed_ms": ...}).
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, data: Dict[str, Any]):
+        line = (json.dumps(data, ensure_ascii=False) + "\n").encode('utf-8')
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(data, dict):
+            raise ValueError("Anfrage muss ein JSON-Objekt sein")
+        return data
+
+    def do_GET(self):
+        server = self.server
+        agent = server.agent
+        routes: Dict[str, Callable[[], Any]] = {
+            '/health': lambda: server.status(),
+            '/stats': lambda: {'result': agent.get_vault_statistics()},
+            '/config': agent.get_config_summary,
+            '/perf': agent.get_performance
+        }
+        route = routes.get(self.path)
+        if route is None:
+            self._send_json(404, {'error': f"Unbekannter Pfad: {self.path}"})
+            return
+        try:
+            self._send_json(200, route())
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+
+    def do_POST(self):
+        agent = self.server.agent
+        try:
+            request = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {'error': f"Ungültiges JSON: {e}"})
+            return
+
+        handlers: Dict[str, Callable[[bool], Any]] = {
+            '/ask': lambda stream: agent.search_and_answer(self._field(request, 'question'), stream=stream),
+            '/summarize': lambda stream: agent.summarize_notes(search_term=request.get('search_term'),
+                                                               tags=request.get('tags'), stream=stream),
+            '/note': lambda stream: agent.get_note_details(self._field(request, 'title'), stream=stream),
+            '/connections': lambda stream: agent.find_connections(self._field(request, 'topic'), stream=stream),
+            '/test': lambda stream: agent.test_connection(),
+            '/chat': lambda stream: agent.chat(self._field(request, 'question'), stream=stream,
+                                               conversation=self.server.conversation(self._field(request, 'session'))),
+            '/chat/reset': lambda stream: self.server.reset_conversation(self._field(request, 'session'))
+        }
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send_json(404, {'error': f"Unbekannter Pfad: {self.path}"})
+            return
+
+        stream = bool(request.get('stream')) and self.path not in ('/test', '/chat/reset')
+        started = time.perf_counter()
+        try:
+            with self.server.slot():
+                if stream:
+                    self._stream(handler(True), started)
+                    return
+                result = handler(False)
+        except QueueFull:
+            self._send_json(503, {'error': "Server ausgelastet, bitte später erneut versuchen"},
+                            {'Retry-After': '1'})
+            return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        if isinstance(result, bool):
+            self._send_json(200, {'ok': result, 'elapsed_ms': elapsed_ms})
+        else:
+            self._send_json(200, {'ok': not is_error_response(result), 'result': result, 'elapsed_ms': elapsed_ms})
+
+    @staticmethod
+    def _field(request: Dict[str, Any], name: str) -> str:
+        value = request.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Feld '{name}' fehlt")
+        return value.strip()
+
+    def _stream(self, chunks: Iterator[str], started: float):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        final: Dict[str, Any] = {'done': True}
+        try:
+            try:
+                for chunk in chunks:
+                    self._send_chunk({'chunk': chunk})
+            except (BrokenPipeError, ConnectionResetError):
+                raise
+            except Exception as e:
+                final['error'] = str(e)
+            final['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            self._send_chunk(final)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hat abgebrochen: LLM-Stream schließen, damit die Verbindung zum Provider frei wird.
+            self.close_connection = True
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+class QueryServerMixin:
+    def setup_agent(self, agent, max_active: int = 4, max_queue: int = 32, max_sessions: int = 64):
+        self.agent = agent
+        self.max_sessions = max(1, max_sessions)
+        self._conversations: 'OrderedDict[str, Conversation]' = OrderedDict()
+        self.max_active = max(1, max_active)
+        self.max_queue = max(0, max_queue)
+        self.active = 0
+        self.waiting = 0
+        self.served = 0
+        self.started = time.time()
+        self._slots = threading.Semaphore(self.max_active)
+        self._state_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        if not self._slots.acquire(blocking=False):
+            with self._state_lock:
+                if self.waiting >= self.max_queue:
+                    raise QueueFull()
+                self.waiting += 1
+            try:
+                self._slots.acquire()
+            finally:
+                with self._state_lock:
+                    self.waiting -= 1
+        with self._state_lock:
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._state_lock:
+                self.active -= 1
+                self.served += 1
+            self._slots.release()
+
+    def conversation(self, session: str) -> Conversation:
+        with self._state_lock:
+            conversation = self._conversations.get(session)
+            if conversation is None:
+                conversation = self._conversations[session] = Conversation()
+                while len(self._conversations) > self.max_sessions:
+                    self._conversations.popitem(last=False)
+            else:
+                self._conversations.move_to_end(session)
+            return conversation
+
+    def reset_conversation(self, session: str) -> bool:
+        with self._state_lock:
+            return self._conversations.pop(session, None) is not None
+
+    def status(self) -> Dict[str, Any]:
+        notes = self.agent.vault_reader.note_count()
+        with self._state_lock:
+            return {
+                'status': 'ok',
+                'notes': notes,
+                'active': self.active,
+                'waiting': self.waiting,
+                'served': self.served,
+                'sessions': len(self._conversations),
+                'uptime_s': round(time.time() - self.started, 1)
+            }
+
+    @property
+    def address(self) -> str:
+        if isinstance(self.server_address, str):
+            return f"unix:{self.server_address}"
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+class QueryServer(QueryServerMixin, ThreadingHTTPServer):
+    daemon_threads = True
+
+if hasattr(socket, 'AF_UNIX'):
+    from socketserver import UnixStreamServer
+
+    class UnixQueryServer(QueryServerMixin, ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+        def server_bind(self):
+            # Verwaisten Socket eines früheren Laufs entfernen.
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+            super().server_bind()
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+
+def create_server(agent, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+                  max_active: int = 4, max_queue: int = 32):
+    if socket_path:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("Unix-Sockets werden auf diesem System nicht unterstützt")
+        server = UnixQueryServer(socket_path, QueryHandler)
+    else:
+        server = QueryServer((host, port), QueryHandler)
+    server.setup_agent(agent, max_active, max_queue)
+    return server
+
+def serve(agent, server_config: Dict[str, Any], watch_interval: float = 2.0):
+    # Index einmal aufbauen und per Watcher aktuell halten, damit Anfragen kein I/O kosten.
+    agent.vault_reader.refresh()
+    agent.vault_reader.start_watching(watch_interval)
+    server = create_server(agent, server_config['host'], server_config['port'], server_config['socket'],
+                           server_config['max_active'], server_config['max_queue'])
+    print(f"🧠 Obsidian Agent Server läuft auf {server.address} "
+          f"({agent.vault_reader.note_count()} Notizen, max. {server.max_active} parallel)")
+    if threading.current_thread() is threading.main_thread():
+        # SIGTERM (z.B. systemd, kill) wie Strg+C behandeln, damit der Unix-Socket aufgeräumt wird.
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server beendet")
+    finally:
+        server.server_close()
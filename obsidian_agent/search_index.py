@@ -0,0 +1,228 @@
+import heapq
+import math
+import re
+import sys
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+def tokenize(text: str) -> List[str]:
+    return [token.casefold() for token in TOKEN_PATTERN.findall(text)]
+
+# Begriffshäufigkeiten je Feld (Titel, Inhalt): alles, was der Index von einer
+# Notiz braucht. Der Parse-Cache speichert sie, damit ein Warmstart weder
+# Inhalte lädt noch neu tokenisiert.
+TermCounts = Tuple[Dict[str, int], Dict[str, int]]
+
+def count_terms(title: str, content: str) -> TermCounts:
+    return dict(Counter(tokenize(title))), dict(Counter(tokenize(content)))
+
+def contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    first, size = phrase[0], len(phrase)
+    return any(tokens[i:i + size] == phrase for i, token in enumerate(tokens) if token == first)
+
+# Korpus-Kennzahlen für BM25. Über mehrere Indizes (Shards) summiert und an
+# search() übergeben, ergeben die Scores aller Shards eine gemeinsame
+# Rangfolge, als stünden alle Notizen in einem Index.
+@dataclass
+class CorpusStats:
+    doc_count: int = 0
+    total_length: Dict[str, int] = field(default_factory=dict)
+    doc_freq: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def merged(cls, parts: Iterable['CorpusStats']) -> 'CorpusStats':
+        result = cls()
+        for part in parts:
+            result.doc_count += part.doc_count
+            for name, length in part.total_length.items():
+                result.total_length[name] = result.total_length.get(name, 0) + length
+            for term, count in part.doc_freq.items():
+                result.doc_freq[term] = result.doc_freq.get(term, 0) + count
+        return result
+
+# Invertierter Volltext-Index mit BM25F-Ranking (Titel gewichtet über Inhalt).
+# Unterstützt mehrere Begriffe, "Phrasen in Anführungszeichen" und präfix*.
+# Gespeichert wird nur die Häufigkeit je Begriff und Dokument; Positionen
+# kosteten ein Vielfaches des Vault-Umfangs. Phrasen werden bei der Suche am
+# Text der Kandidaten geprüft, den text_for(doc_id, feld) liefert.
+class SearchIndex:
+    FIELDS = ("title", "content")
+
+    def __init__(self, text_for: Callable[[int, str], str], k1: float = 1.2, b: float = 0.75,
+                 title_weight: float = 3.0):
+        self.text_for = text_for
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        # term -> doc_id -> Häufigkeit, getrennt je Feld
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = {field: {} for field in self.FIELDS}
+        self._lengths: Dict[str, Dict[int, int]] = {field: {} for field in self.FIELDS}
+        self._total_length: Dict[str, int] = {field: 0 for field in self.FIELDS}
+        # Begriffe je Dokument (interniert, geteilt mit den Postings) zum Entfernen
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._vocabulary: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, doc_id: int, title: str, content: str):
+        self.add_counts(doc_id, count_terms(title, content))
+
+    def add_counts(self, doc_id: int, counts: TermCounts):
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+
+        terms: Dict[str, None] = {}
+        for field, field_counts in zip(self.FIELDS, counts):
+            postings = self._postings[field]
+            for token, count in field_counts.items():
+                token = sys.intern(token)
+                postings.setdefault(token, {})[doc_id] = count
+                terms[token] = None
+            length = sum(field_counts.values())
+            self._lengths[field][doc_id] = length
+            self._total_length[field] += length
+
+        self._doc_terms[doc_id] = tuple(terms)
+        self._vocabulary = None
+
+    def remove(self, doc_id: int):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for field in self.FIELDS:
+            postings = self._postings[field]
+            for term in terms:
+                docs = postings.get(term)
+                if docs is not None and docs.pop(doc_id, None) is not None and not docs:
+                    del postings[term]
+            self._total_length[field] -= self._lengths[field].pop(doc_id, 0)
+        self._vocabulary = None
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            vocabulary = set()
+            for field in self.FIELDS:
+                vocabulary.update(self._postings[field])
+            self._vocabulary = sorted(vocabulary)
+        terms = []
+        for term in self._vocabulary[bisect_left(self._vocabulary, prefix):]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    @staticmethod
+    def _split_query(query: str) -> Tuple[List[str], List[str], List[List[str]]]:
+        words: List[str] = []
+        prefixes: List[str] = []
+        phrases: List[List[str]] = []
+        for phrase, word in QUERY_PATTERN.findall(query):
+            if phrase:
+                tokens = tokenize(phrase)
+                if len(tokens) > 1:
+                    phrases.append(tokens)
+                words.extend(tokens)
+            elif word.endswith('*') and len(word) > 1:
+                prefixes.extend(tokenize(word[:-1])[-1:])
+            else:
+                words.extend(tokenize(word))
+        return words, prefixes, phrases
+
+    def _parse_query(self, query: str) -> Tuple[List[str], List[List[str]]]:
+        words, prefixes, phrases = self._split_query(query)
+        terms = list(words)
+        for prefix in prefixes:
+            terms.extend(self._expand_prefix(prefix))
+        return list(dict.fromkeys(terms)), phrases
+
+    def matches(self, doc_id: int, query: str, search_in: str = "both") -> bool:
+        # Dieselbe Trefferdefinition wie search() für ein einzelnes Dokument,
+        # ohne das Vokabular für präfix* neu zu sortieren.
+        terms = self._doc_terms.get(doc_id)
+        if not terms:
+            return False
+        fields = self._fields(search_in)
+        words, prefixes, phrases = self._split_query(query)
+        candidates = list(words)
+        if prefixes:
+            candidates.extend(term for term in terms if term.startswith(tuple(prefixes)))
+        if not any(doc_id in self._postings[field].get(term, ()) for term in candidates for field in fields):
+            return False
+        return all(self._matches_phrase(doc_id, phrase, fields) for phrase in phrases)
+
+    def _matches_phrase(self, doc_id: int, phrase: List[str], fields: Tuple[str, ...]) -> bool:
+        # Text nur lesen, wenn alle Begriffe der Phrase im Feld vorkommen.
+        for field in fields:
+            postings = self._postings[field]
+            if not all(doc_id in postings.get(term, ()) for term in phrase):
+                continue
+            if contains_phrase(tokenize(self.text_for(doc_id, field)), phrase):
+                return True
+        return False
+
+    def _fields(self, search_in: str) -> Tuple[str, ...]:
+        if search_in == "title":
+            return ("title",)
+        elif search_in == "content":
+            return ("content",)
+        return self.FIELDS
+
+    def _matching(self, term: str, fields: Tuple[str, ...]) -> Set[int]:
+        matching = set()
+        for field in fields:
+            matching.update(self._postings[field].get(term, ()))
+        return matching
+
+    def corpus_stats(self, query: str, search_in: str = "both") -> CorpusStats:
+        fields = self._fields(search_in)
+        terms, _ = self._parse_query(query)
+        return CorpusStats(
+            doc_count=len(self._doc_terms),
+            total_length={field: self._total_length[field] for field in fields},
+            doc_freq={term: len(self._matching(term, fields)) for term in terms}
+        )
+
+    def search(self, query: str, search_in: str = "both", top_k: Optional[int] = None,
+               corpus: Optional[CorpusStats] = None) -> List[Tuple[int, float]]:
+        fields = self._fields(search_in)
+        terms, phrases = self._parse_query(query)
+        if not terms or not self._doc_terms:
+            return []
+
+        doc_count = corpus.doc_count if corpus else len(self._doc_terms)
+        total_length = corpus.total_length if corpus else self._total_length
+        weights = {"title": self.title_weight, "content": 1.0}
+        avg_length = {field: (total_length.get(field, 0) / doc_count) or 1.0 for field in fields}
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            matching = self._matching(term, fields)
+            if not matching:
+                continue
+            doc_freq = corpus.doc_freq.get(term, len(matching)) if corpus else len(matching)
+            idf = math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+            for doc_id in matching:
+                weighted_tf = 0.0
+                for field in fields:
+                    frequency = self._postings[field].get(term, {}).get(doc_id)
+                    if frequency:
+                        norm = 1 - self.b + self.b * self._lengths[field][doc_id] / avg_length[field]
+                        weighted_tf += weights[field] * frequency / norm
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weighted_tf * (self.k1 + 1) / (weighted_tf + self.k1)
+
+        if phrases:
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if all(self._matches_phrase(doc_id, phrase, fields) for phrase in phrases)}
+
+        ranked = ((score, -doc_id) for doc_id, score in scores.items())
+        if top_k is not None:
+            best = heapq.nlargest(top_k, ranked)
+        else:
+            best = sorted(ranked, reverse=True)
+        return [(-neg_id, score) for score, neg_id in best]
@@ -0,0 +1,306 @@
+import contextvars
+import heapq
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+from search_index import CorpusStats
+from vault_reader import VaultReader, VaultDelta, Note
+from tracing import tracer
+
+T = TypeVar('T')
+
+# Ein Vault-Verzeichnis mit eigenem Parse-Cache, Index und Watcher. Lazy
+# Shards (z.B. ein Archiv) werden erst angelegt und eingelesen, wenn eine
+# Abfrage sie braucht, nicht beim Start.
+class VaultShard:
+    def __init__(self, name: str, path: str, cache_path: Optional[str] = None, lazy: bool = False,
+                 on_create: Optional[Callable[['VaultShard', VaultReader], None]] = None, **reader_options):
+        self.name = name
+        self.path = path
+        self.cache_path = cache_path
+        self.lazy = lazy
+        self.prefix = os.path.join(str(Path(path)), "")
+        self._reader_options = reader_options
+        self._on_create = on_create
+        self._reader: Optional[VaultReader] = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> bool:
+        return self._reader is not None
+
+    @property
+    def loaded(self) -> bool:
+        return self._reader is not None and self._reader.scanned
+
+    @property
+    def reader(self) -> VaultReader:
+        return self.open()
+
+    def open(self) -> VaultReader:
+        if self._reader is None:
+            with self._lock:
+                if self._reader is None:
+                    reader = VaultReader(self.path, cache_path=self.cache_path, **self._reader_options)
+                    if self._on_create:
+                        self._on_create(self, reader)
+                    self._reader = reader
+        return self._reader
+
+    def owns(self, file_path: str) -> bool:
+        return file_path.startswith(self.prefix)
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+
+# Mehrere Vaults hinter der Schnittstelle von VaultReader. Suche, Tag- und
+# Titel-Abfragen laufen parallel auf allen angelegten Shards; Volltexttreffer
+# werden mit gemeinsamen BM25-Kennzahlen bewertet und zu einer Rangfolge
+# gemischt. Noch nicht angelegte Lazy Shards kommen erst dazu, wenn die
+# übrigen zu wenige Treffer liefern (bzw. für Gesamtstatistik und
+# -zusammenfassung), und bleiben danach dabei. Link-Graph-Abfragen bleiben im
+# Vault der jeweiligen Notiz. Pfade in VaultDelta und note_path() tragen den
+# Shard-Namen als Präfix ("archiv/a.md").
+class ShardedVaultReader:
+    def __init__(self, shards: List[Dict[str, Any]], **reader_options):
+        if not shards:
+            raise ValueError("Mindestens ein Vault ist erforderlich")
+        self.shards = [VaultShard(shard['name'], shard['path'], shard.get('cache_path'), shard.get('lazy', False),
+                                  on_create=self._shard_created, **reader_options) for shard in shards]
+        # Sofort verfügbare Shards zuerst, damit Titel-Abfragen Archive nur bei Bedarf laden.
+        self.shards.sort(key=lambda shard: shard.lazy)
+        self._by_name = {shard.name: shard for shard in self.shards}
+        self._listeners: List[Callable[[VaultDelta], None]] = []
+        self._watch_interval: Optional[float] = None
+        self._pool = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="vault-shard")
+        for shard in self.shards:
+            if not shard.lazy:
+                shard.open()
+
+    def _shard_created(self, shard: VaultShard, reader: VaultReader):
+        reader.add_listener(lambda delta: self._forward(shard, delta))
+        if self._watch_interval is not None:
+            reader.start_watching(self._watch_interval)
+
+    def _forward(self, shard: VaultShard, delta: VaultDelta):
+        prefixed = self._prefixed(shard, delta)
+        for listener in self._listeners:
+            listener(prefixed)
+
+    def _prefixed(self, shard: VaultShard, delta: VaultDelta) -> VaultDelta:
+        name = lambda rel_path: f"{shard.name}/{rel_path}"
+        return VaultDelta(
+            generation=self.generation,
+            added=[name(path) for path in delta.added],
+            modified=[name(path) for path in delta.modified],
+            removed=[name(path) for path in delta.removed],
+            renamed=[(name(old), name(new)) for old, new in delta.renamed]
+        )
+
+    def _active(self) -> List[VaultShard]:
+        return [shard for shard in self.shards if shard.created]
+
+    def _cold(self) -> List[VaultShard]:
+        return [shard for shard in self.shards if not shard.created]
+
+    def _fan_out(self, shards: List[VaultShard], call: Callable[[VaultShard], T]) -> List[T]:
+        if len(shards) <= 1:
+            return [call(shard) for shard in shards]
+        # Jeder Shard im eigenen Thread, mit dem Trace der aufrufenden Anfrage.
+        futures = [self._pool.submit(contextvars.copy_context().run, call, shard) for shard in shards]
+        return [future.result() for future in futures]
+
+    def _shard_for(self, note: Note) -> Optional[VaultShard]:
+        owners = [shard for shard in self.shards if shard.owns(note.file_path)]
+        return max(owners, key=lambda shard: len(shard.prefix)) if owners else None
+
+    def _group(self, notes: List[Note]) -> Dict[str, List[Note]]:
+        groups: Dict[str, List[Note]] = {}
+        for note in notes:
+            shard = self._shard_for(note)
+            if shard is not None:
+                groups.setdefault(shard.name, []).append(note)
+        return groups
+
+    @property
+    def generation(self) -> int:
+        return sum(shard.reader.generation for shard in self._active())
+
+    def note_count(self) -> int:
+        # Nur aktive Shards (parallel geladen); zählen soll keinen Lazy Shard anlegen.
+        return sum(self._fan_out(self._active(), lambda shard: shard.reader.note_count()))
+
+    def note_path(self, rel_path: str) -> str:
+        name, _, path = rel_path.partition('/')
+        return self._by_name[name].reader.note_path(path)
+
+    def add_listener(self, callback: Callable[[VaultDelta], None]):
+        self._listeners.append(callback)
+
+    def refresh(self) -> VaultDelta:
+        # Lazy Shards erst, nachdem sie einmal abgefragt wurden.
+        shards = self._active()
+        with tracer.span("vault.shards"):
+            deltas = self._fan_out(shards, lambda shard: shard.reader.refresh())
+        merged = VaultDelta(generation=self.generation)
+        for shard, delta in zip(shards, deltas):
+            prefixed = self._prefixed(shard, delta)
+            merged.added.extend(prefixed.added)
+            merged.modified.extend(prefixed.modified)
+            merged.removed.extend(prefixed.removed)
+            merged.renamed.extend(prefixed.renamed)
+        return merged
+
+    def start_watching(self, interval: float = 2.0):
+        self._watch_interval = interval
+        for shard in self._active():
+            shard.reader.start_watching(interval)
+
+    def is_watching(self) -> bool:
+        active = self._active()
+        return bool(active) and all(shard.reader.is_watching() for shard in active)
+
+    def stop_watching(self):
+        self._watch_interval = None
+        for shard in self._active():
+            shard.reader.stop_watching()
+
+    def close(self):
+        self._watch_interval = None
+        self._pool.shutdown(wait=True)
+        for shard in self.shards:
+            shard.close()
+
+    def get_all_notes(self) -> List[Note]:
+        return [note for notes in self._fan_out(self.shards, lambda shard: shard.reader.get_all_notes())
+                for note in notes]
+
+    def search_scored(self, query: str, search_in: str = "content", top_k: Optional[int] = None,
+                      shards: Optional[List[VaultShard]] = None) -> List[Tuple[Note, float]]:
+        shards = self.shards if shards is None else shards
+        with tracer.span("search.shards"):
+            # Erst Kennzahlen aller Shards sammeln, dann mit den Summen bewerten.
+            corpus = CorpusStats.merged(self._fan_out(shards, lambda shard: shard.reader.corpus_stats(query, search_in)))
+            results = self._fan_out(shards, lambda shard: shard.reader.search_scored(query, search_in, top_k, corpus))
+            tracer.record(shards=len(shards))
+        merged = heapq.merge(*results, key=lambda result: -result[1])
+        return list(islice(merged, top_k))
+
+    def search_notes(self, query: str, search_in: str = "content", top_k: Optional[int] = None) -> List[Note]:
+        active = self._active()
+        results = self.search_scored(query, search_in, top_k, active) if active else []
+        if self._cold() and (top_k is None or len(results) < top_k):
+            # Archive nur laden, wenn die übrigen Shards nicht genug Treffer liefern.
+            results = self.search_scored(query, search_in, top_k)
+        return [note for note, _ in results]
+
+    def iter_search_notes(self, query: str, search_in: str = "content", limit: Optional[int] = None) -> Iterator[Note]:
+        yield from self.search_notes(query, search_in, top_k=limit)
+
+    def _tagged(self, shards: List[VaultShard], tags: List[str]) -> List[Note]:
+        with tracer.span("search.shards"):
+            results = self._fan_out(shards, lambda shard: shard.reader.search_by_tags(tags))
+        return [note for notes in results for note in notes]
+
+    def search_by_tags(self, tags: List[str]) -> List[Note]:
+        return list(self.iter_search_by_tags(tags))
+
+    def iter_search_by_tags(self, tags: List[str], limit: Optional[int] = None) -> Iterator[Note]:
+        notes = self._tagged(self._active(), tags)
+        cold = self._cold()
+        if cold and (limit is None or len(notes) < limit):
+            notes.extend(self._tagged(cold, tags))
+        yield from islice(notes, limit)
+
+    def _find_title(self, title: str) -> Tuple[Optional[VaultShard], Optional[Note]]:
+        # Zuerst parallel in allen angelegten Shards, danach der Reihe nach in den übrigen.
+        active = self._active()
+        with tracer.span("search.shards"):
+            for shard, note in zip(active, self._fan_out(active, lambda shard: shard.reader.get_note_by_title(title))):
+                if note is not None:
+                    return shard, note
+            for shard in self._cold():
+                note = shard.reader.get_note_by_title(title)
+                if note is not None:
+                    return shard, note
+        return None, None
+
+    def get_note_by_title(self, title: str) -> Optional[Note]:
+        return self._find_title(title)[1]
+
+    def _by_title(self, title: str, call: Callable[[VaultReader], List[Any]]) -> List[Any]:
+        shard, _ = self._find_title(title)
+        return call(shard.reader) if shard is not None else []
+
+    def get_linked_notes(self, note_title: str) -> List[Note]:
+        return self._by_title(note_title, lambda reader: reader.get_linked_notes(note_title))
+
+    def get_outgoing_notes(self, note_title: str) -> List[Note]:
+        return self._by_title(note_title, lambda reader: reader.get_outgoing_notes(note_title))
+
+    def get_neighborhood(self, note_title: str, hops: int = 2, limit: Optional[int] = None) -> List[Tuple[Note, int]]:
+        return self._by_title(note_title, lambda reader: reader.get_neighborhood(note_title, hops, limit))
+
+    def get_shortest_path(self, start_title: str, goal_title: str) -> List[Note]:
+        # Links enden an der Vault-Grenze: Pfade gibt es nur innerhalb eines Shards.
+        start_shard, _ = self._find_title(start_title)
+        goal_shard, _ = self._find_title(goal_title)
+        if start_shard is None or start_shard is not goal_shard:
+            return []
+        return start_shard.reader.get_shortest_path(start_title, goal_title)
+
+    def get_related_notes(self, notes: List[Note], limit: int = 10, hops: int = 1) -> List[Note]:
+        groups = self._group(notes)
+        shards = [self._by_name[name] for name in groups]
+        results = self._fan_out(shards, lambda shard: shard.reader.get_related_notes(groups[shard.name], limit, hops))
+        return [note for related in results for note in related][:limit]
+
+    def get_link_structure(self, notes: List[Note], max_paths: int = 5) -> Tuple[List[Tuple[Note, Note]], List[List[Note]]]:
+        groups = self._group(notes)
+        shards = [self._by_name[name] for name in groups]
+        edges: List[Tuple[Note, Note]] = []
+        paths: List[List[Note]] = []
+        for shard_edges, shard_paths in self._fan_out(
+                shards, lambda shard: shard.reader.get_link_structure(groups[shard.name], max_paths)):
+            edges.extend(shard_edges)
+            paths.extend(shard_paths)
+        return edges, paths[:max_paths]
+
+    def get_central_notes(self, top_k: int = 10) -> List[Tuple[Note, float]]:
+        results = self._fan_out(self.shards, lambda shard: (shard.reader.note_count(), shard.reader.get_central_notes(top_k)))
+        total = sum(count for count, _ in results) or 1
+        # PageRank summiert sich je Shard zu 1; nach Anteil gewichten, als wäre es ein Graph.
+        weighted = [(note, score * count / total) for count, central in results for note, score in central]
+        return heapq.nlargest(top_k, weighted, key=lambda item: item[1])
+
+    def get_statistics(self, top_k: Optional[int] = 10) -> Dict[str, Any]:
+        parts = self._fan_out(self.shards, lambda shard: shard.reader.get_statistics(top_k=None))
+        tags: Counter = Counter()
+        for part in parts:
+            tags.update(dict(part['top_tags']))
+        notes = sum(part['notes'] for part in parts)
+        total_bytes = sum(part['total_bytes'] for part in parts)
+        statistics: Dict[str, Union[int, List, Dict]] = {
+            key: sum(part[key] for part in parts)
+            for key in ('unique_links', 'edges', 'orphans', 'broken_links')
+        }
+        statistics.update({
+            'notes': notes,
+            'total_bytes': total_bytes,
+            'average_bytes': total_bytes // notes if notes else 0,
+            'unique_tags': len(tags),
+            'top_tags': tags.most_common(top_k),
+            'shards': {shard.name: part['notes'] for shard, part in zip(self.shards, parts)}
+        })
+        return statistics
+
+def create_vault_reader(shards: List[Dict[str, Any]], **reader_options) -> Union[VaultReader, ShardedVaultReader]:
+    # Ein einzelner Vault braucht keine Verteilung.
+    if len(shards) == 1:
+        return VaultReader(shards[0]['path'], cache_path=shards[0].get('cache_path'), **reader_options)
+    return ShardedVaultReader(shards, **reader_options)
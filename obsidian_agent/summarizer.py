@@ -0,0 +1,184 @@
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple, Union, TYPE_CHECKING
+
+from chunker import ChunkCache
+from context_packer import ContextItem, ContextPacker, strip_boilerplate
+from llm_manager import LLMError, LLMManager
+from summary_store import SummaryStore
+
+if TYPE_CHECKING:
+    from vault_reader import Note
+
+MAP_PROMPT = """Fasse die folgende Notiz in höchstens {words} Wörtern zusammen. Nenne Hauptthemen, wichtige Erkenntnisse und offene Aufgaben. Antworte nur mit der Zusammenfassung.
+
+**{title}**{part}
+Tags: {tags}
+
+{content}"""
+
+REDUCE_PROMPT = """Fasse die folgenden Zusammenfassungen zu einer gemeinsamen Zusammenfassung mit höchstens {words} Wörtern zusammen. Erhalte Hauptthemen, wichtige Erkenntnisse und Verbindungen zwischen den Notizen. Antworte nur mit der Zusammenfassung.
+
+{context}"""
+
+def render_items(items: List[ContextItem]) -> str:
+    return "\n\n".join(f"**{item.label}**\n{item.text}" for item in items)
+
+# Hierarchische Zusammenfassung (Map-Reduce): jede Notiz wird einzeln
+# zusammengefasst (große Notizen abschnittsweise), danach werden die
+# Zusammenfassungen stufenweise verdichtet, bis sie ins Token-Budget passen.
+# Alle Anfragen einer Stufe laufen parallel über LLMManager.generate_many.
+class VaultSummarizer:
+    def __init__(self, llm_manager: LLMManager, packer: ContextPacker, chunk_cache: ChunkCache,
+                 store: Optional[SummaryStore] = None, map_words: int = 80,
+                 reduce_words: int = 250, max_levels: int = 6):
+        self.llm_manager = llm_manager
+        self.packer = packer
+        self.chunk_cache = chunk_cache
+        self.store = store
+        self.map_words = map_words
+        self.reduce_words = reduce_words
+        self.max_levels = max_levels
+
+    @property
+    def signature(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.llm_manager.model_signature(short=True).encode('utf-8'))
+        digest.update(MAP_PROMPT.format(words=self.map_words, title="", part="", tags="", content="").encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _budget(self, skeleton: str) -> int:
+        return max(self.packer.min_item_tokens, self.packer.budget_tokens - self.packer.estimate(skeleton))
+
+    def _parts(self, note: 'Note', budget: int) -> List[str]:
+        parts: List[str] = []
+        current = ""
+        for passage in self.chunk_cache.passages(note):
+            text = f"## {passage.heading}\n{passage.text}" if passage.heading else passage.text
+            if current and self.packer.estimate(current) + self.packer.estimate(text) > budget:
+                parts.append(current)
+                current = text
+            else:
+                current = f"{current}\n\n{text}" if current else text
+        if current:
+            parts.append(current)
+        return parts
+
+    # Hashes und Fehlschläge gehören zum Aufruf, nicht zur Instanz: Batch-Runner
+    # und Query-Server fassen parallel zusammen.
+    def map_notes(self, notes: List['Note']) -> Tuple[List[ContextItem], List[str], int]:
+        signature = self.signature
+        budget = self._budget(MAP_PROMPT.format(words=self.map_words, title="", part="", tags="", content=""))
+        # Kürzere Notizen als die Ziel-Zusammenfassung gehen unverändert weiter.
+        verbatim_tokens = self.map_words * 2
+
+        summaries: List[Optional[str]] = [None] * len(notes)
+        hashes: List[str] = []
+        prompts: List[str] = []
+        owners: List[int] = []
+        for i, note in enumerate(notes):
+            content = note.content
+            content_hash = self.content_hash(content)
+            hashes.append(content_hash)
+            text = strip_boilerplate(content)
+            if self.packer.estimate(text) <= verbatim_tokens:
+                summaries[i] = text
+                continue
+            if self.store is not None:
+                summaries[i] = self.store.get(content_hash, signature)
+                if summaries[i] is not None:
+                    continue
+            parts = self._parts(note, budget)
+            for n, part in enumerate(parts, 1):
+                label = f" (Teil {n}/{len(parts)})" if len(parts) > 1 else ""
+                prompts.append(MAP_PROMPT.format(words=self.map_words, title=note.title, part=label,
+                                                 tags=', '.join(note.tags) if note.tags else 'Keine',
+                                                 content=self.packer.truncate(part, budget)))
+                owners.append(i)
+
+        answered: Set[str] = set()
+        partials: Dict[int, List[Union[str, LLMError]]] = {}
+        for owner, response in zip(owners, self.llm_manager.generate_many(prompts, short=True,
+                                                                          on_signature=answered.add)):
+            partials.setdefault(owner, []).append(response)
+
+        # Mehrteilige Notizen: Teil-Zusammenfassungen zu einer verdichten.
+        combine = [(owner, parts) for owner, parts in partials.items()
+                   if len(parts) > 1 and not any(isinstance(part, LLMError) for part in parts)]
+        combined = self.llm_manager.generate_many([
+            REDUCE_PROMPT.format(words=self.map_words, context="\n\n".join(parts)) for _, parts in combine
+        ], short=True, on_signature=answered.add)
+        for (owner, _), response in zip(combine, combined):
+            partials[owner] = [response]
+
+        failures = 0
+        fresh = {}
+        for owner, parts in partials.items():
+            response = parts[0] if len(parts) == 1 else next(part for part in parts if isinstance(part, LLMError))
+            if isinstance(response, LLMError):
+                failures += 1
+                continue
+            summaries[owner] = response.strip()
+            fresh[hashes[owner]] = summaries[owner]
+        # Antworten eines Ausweich-Backends nicht unter der Signatur speichern.
+        if self.store is not None and answered <= {self.llm_manager.model_signature(short=True)}:
+            self.store.put_many(signature, fresh)
+
+        items = [ContextItem(note.title, summary, score=len(notes) - i, source=note.file_path)
+                 for i, (note, summary) in enumerate(zip(notes, summaries)) if summary]
+        return items, hashes, failures
+
+    def _batches(self, items: List[ContextItem], budget: int) -> List[List[ContextItem]]:
+        batches: List[List[ContextItem]] = []
+        current: List[ContextItem] = []
+        used = 0
+        for item in items:
+            cost = self.packer.estimate(item.label) + self.packer.estimate(item.text) + 4
+            if current and used + cost > budget:
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    def reduce(self, items: List[ContextItem], budget: int) -> Tuple[List[ContextItem], int]:
+        failures = 0
+        reduce_budget = self._budget(REDUCE_PROMPT.format(words=self.reduce_words, context=""))
+        for level in range(1, self.max_levels + 1):
+            if self.packer.estimate(render_items(items)) <= budget or len(items) <= 1:
+                break
+            batches = self._batches(items, reduce_budget)
+            prompts = [
+                REDUCE_PROMPT.format(
+                    words=self.reduce_words,
+                    context=render_items(self.packer.pack(batch, reduce_budget))
+                )
+                for batch in batches
+            ]
+            reduced = []
+            for n, (batch, response) in enumerate(zip(batches, self.llm_manager.generate_many(prompts)), 1):
+                if isinstance(response, LLMError):
+                    failures += 1
+                    continue
+                titles = ', '.join(item.label for item in batch[:3]) + (' ...' if len(batch) > 3 else '')
+                reduced.append(ContextItem(f"Gruppe {level}.{n}: {titles}", response.strip(), score=-n))
+            if not reduced:
+                break
+            shrinking = self.packer.estimate(render_items(reduced)) < self.packer.estimate(render_items(items))
+            items = reduced
+            if not shrinking:
+                break
+        return self.packer.pack(items, budget), failures
+
+    def summarize(self, notes: List['Note'], budget: int, prune: bool = False) -> Tuple[str, int]:
+        items, hashes, map_failures = self.map_notes(notes)
+        if prune and self.store is not None:
+            # Über den ganzen Vault: Einträge gelöschter/alter Fassungen entfernen.
+            self.store.prune(self.signature, hashes)
+        items, reduce_failures = self.reduce(items, budget)
+        return render_items(items), map_failures + reduce_failures
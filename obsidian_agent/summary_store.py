@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Dauerhafte Notiz-Zusammenfassungen für den Map-Schritt: Schlüssel sind der
+# Vault, der Hash des Notizinhalts und die Signatur aus Modell und Map-Prompt.
+# Nach Änderungen im Vault wird nur für geänderte Notizen neu zusammengefasst.
+# Die Datei kann von mehreren Vaults geteilt werden; Lesen, Schreiben und
+# Aufräumen betreffen immer nur die Zeilen des eigenen Vaults.
+class SummaryStore:
+    DEFAULT_PATH = Path.home() / ".cache" / "obsidian_agent" / "summaries.sqlite"
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path: Optional[str] = None, vault: str = ""):
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self.vault = vault
+        self._memory: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._init_schema()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Zusammenfassungs-Cache nur im Speicher ({self.path}): {e}")
+            self._conn = None
+
+    def _init_schema(self):
+        cur = self._conn.cursor()
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            # Ältere Dateien ohne Vault-Spalte: Zusammenfassungen neu erzeugen.
+            cur.execute("DROP TABLE IF EXISTS summaries")
+            cur.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                vault TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (vault, content_hash, signature)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, content_hash: str, signature: str) -> Optional[str]:
+        with self._lock:
+            if self._conn is None:
+                return self._memory.get((content_hash, signature))
+            try:
+                row = self._conn.execute(
+                    "SELECT summary FROM summaries WHERE vault = ? AND content_hash = ? AND signature = ?",
+                    (self.vault, content_hash, signature)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Fehler beim Lesen des Zusammenfassungs-Caches: {e}")
+                return None
+            return row[0] if row else None
+
+    def put_many(self, signature: str, summaries: Dict[str, str]):
+        if not summaries:
+            return
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                for content_hash, summary in summaries.items():
+                    self._memory[(content_hash, signature)] = summary
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                        [(self.vault, content_hash, signature, summary, now)
+                         for content_hash, summary in summaries.items()]
+                    )
+            except sqlite3.Error as e:
+                print(f"Fehler beim Schreiben des Zusammenfassungs-Caches: {e}")
+
+    def prune(self, signature: str, keep: Iterable[str]):
+        keep = set(keep)
+        with self._lock:
+            for key in [key for key in self._memory if key[1] == signature and key[0] not in keep]:
+                del self._memory[key]
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    rows = self._conn.execute(
+                        "SELECT content_hash FROM summaries WHERE vault = ? AND signature = ?",
+                        (self.vault, signature)
+                    ).fetchall()
+                    self._conn.executemany(
+                        "DELETE FROM summaries WHERE vault = ? AND content_hash = ? AND signature = ?",
+                        [(self.vault, row[0], signature) for row in rows if row[0] not in keep]
+                    )
+            except sqlite3.Error as e:
+                print(f"Fehler beim Aufräumen des Zusammenfassungs-Caches: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,73 @@
+import os
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from vault_index import VaultIndex
+
+class Vault:
+    def __init__(self, root: Path):
+        self.root = root
+        self._tick = 1_700_000_000
+
+    def write(self, rel_path: str, text: str) -> Path:
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        # Eindeutige mtime, damit Änderungen auch bei gleicher Größe erkannt werden.
+        self._tick += 10
+        os.utime(path, (self._tick, self._tick))
+        return path
+
+    def rename(self, old: str, new: str):
+        target = self.root / new
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(self.root / old, target)
+
+    def delete(self, rel_path: str):
+        (self.root / rel_path).unlink()
+
+@pytest.fixture
+def vault(tmp_path) -> Vault:
+    root = tmp_path / "vault"
+    root.mkdir()
+    return Vault(root)
+
+def index_snapshot(index: VaultIndex) -> Dict[str, object]:
+    # Alle Tabellen auf Dateipfade statt interner IDs abgebildet, damit ein
+    # inkrementell gepflegter Index mit einem neu aufgebauten vergleichbar ist.
+    path = lambda note_id: index.notes[note_id].file_path
+    by_path = lambda table: {key: frozenset(map(path, ids)) for key, ids in table.items()}
+    text, links = index.text, index.links
+    return {
+        'paths': {path(note_id) for note_id in index.notes},
+        'titles': by_path(index._titles),
+        'aliases': by_path(index._aliases),
+        'tags': by_path(index._tags),
+        'postings': {field: {term: {path(doc): count for doc, count in docs.items()}
+                             for term, docs in text._postings[field].items()} for field in text.FIELDS},
+        'lengths': {field: {path(doc): length for doc, length in text._lengths[field].items()}
+                    for field in text.FIELDS},
+        'total_length': dict(text._total_length),
+        'doc_terms': {path(doc): frozenset(terms) for doc, terms in text._doc_terms.items()},
+        'edges': {(path(source), path(target)) for source, targets in links._out.items() for target in targets},
+        'incoming': {(path(source), path(target)) for target, sources in links._in.items() for source in sources},
+        'edge_count': links.edge_count,
+        'broken_count': links.broken_count,
+        'orphans': {path(note_id) for note_id in links._orphans},
+        'target_count': links.target_count,
+        'stats': (index.stats.notes, index.stats.total_bytes, dict(index.stats.tags)),
+    }
+
+@pytest.fixture
+def assert_consistent():
+    def check(index: VaultIndex):
+        snapshot = index_snapshot(index)
+        assert snapshot['edges'] == snapshot['incoming']
+        assert snapshot['edge_count'] == len(snapshot['edges'])
+        assert snapshot == index_snapshot(VaultIndex(index.all_notes(), index.root))
+    return check
@@ -0,0 +1,56 @@
+import io
+import json
+import time
+
+from batch_runner import BatchRunner
+
+class FakeAgent:
+    def search_and_answer(self, question):
+        # Spätere Fragen werden zuerst fertig.
+        time.sleep(0.05 if question == "langsam" else 0.0)
+        if question == "kaputt":
+            return "Fehler bei Ollama-Anfrage: weg"
+        return f"Antwort: {question}"
+
+    def get_note_details(self, title):
+        raise RuntimeError(f"Notiz {title} nicht lesbar")
+
+    def get_vault_statistics(self):
+        return "3 Notizen"
+
+def run(lines, concurrency=4):
+    output = io.StringIO()
+    summary = BatchRunner(FakeAgent(), concurrency).run(lines, output)
+    return summary, [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_results_keep_input_order():
+    lines = [json.dumps({'id': f"q{n}", 'question': "langsam" if n % 3 == 0 else f"frage {n}"})
+             for n in range(12)]
+    summary, records = run(lines, concurrency=4)
+    assert [record['id'] for record in records] == [f"q{n}" for n in range(12)]
+    assert records[1]['result'] == "Antwort: frage 1" and records[3]['result'] == "Antwort: langsam"
+    assert summary['items'] == summary['ok'] == 12
+
+def test_error_lines():
+    lines = [
+        '{"id": "gut", "command": "stats"}',
+        '# Kommentar',
+        '{kein json',
+        '["liste"]',
+        '{"command": "tanzen"}',
+        '{"command": "ask"}',
+        '{"command": "note", "title": "Plan"}',
+        '{"question": "kaputt"}',
+    ]
+    summary, records = run(lines)
+    assert [record['line'] for record in records] == [1, 3, 4, 5, 6, 7, 8]
+    assert records[0] == {**records[0], 'id': "gut", 'ok': True, 'result': "3 Notizen"}
+    assert all(not record['ok'] for record in records[1:])
+    assert records[1]['error'].startswith("Ungültiges JSON")
+    assert records[2]['error'] == "Eintrag muss ein JSON-Objekt sein"
+    assert records[3]['error'] == "Unbekannter Befehl: tanzen"
+    assert records[4]['error'] == "Feld 'question' fehlt"
+    assert records[5]['error'] == "Notiz Plan nicht lesbar"
+    # Fehlerantworten des LLM sind Ergebnisse, aber nicht ok.
+    assert records[6]['result'].startswith("Fehler bei ") and 'error' not in records[6]
+    assert summary == {**summary, 'items': 7, 'ok': 1, 'failed': 6}
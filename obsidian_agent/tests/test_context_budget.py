@@ -0,0 +1,23 @@
+import pytest
+import yaml
+
+from config_manager import ConfigManager
+from llm_manager import OllamaProvider
+
+def config(tmp_path, provider, settings):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({'llm': {'provider': provider, provider: settings}}), encoding='utf-8')
+    return ConfigManager(str(path))
+
+def test_budget_leaves_room_for_the_answer(tmp_path):
+    assert config(tmp_path, 'openai', {'context_tokens': 8000, 'max_tokens': 2000}).get_context_budget() == 6000
+    assert config(tmp_path, 'claude', {}).get_context_budget() == 14000
+    assert config(tmp_path, 'ollama', {'context_tokens': 4096, 'response_tokens': 1024}).get_context_budget() == 3072
+    assert config(tmp_path, 'ollama', {}).get_context_budget() == 1536
+    with pytest.raises(ValueError):
+        config(tmp_path, 'openai', {'context_tokens': 1000, 'max_tokens': 2000}).get_context_budget()
+
+def test_ollama_sends_context_window():
+    provider = OllamaProvider({'context_tokens': 4096})
+    assert provider._payload(False, prompt="frage")['options'] == {'num_ctx': 4096}
+    provider.close()
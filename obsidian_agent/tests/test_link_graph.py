@@ -0,0 +1,99 @@
+import pytest
+
+from link_graph import LinkGraph
+
+def graph(*notes):
+    links = LinkGraph()
+    for node_id, (file_path, title, targets) in enumerate(notes, 1):
+        links.add(node_id, file_path, title, [], targets)
+    return links
+
+def test_rename_retargets_links():
+    links = graph(
+        ("a.md", "A", ["Neu"]),
+        ("alt.md", "Alt", []),
+        ("c.md", "C", ["Alt", "ordner/alt"]),
+    )
+    assert links.outgoing(1) == [] and links.outgoing(3) == [2]
+    assert links.broken_count == 2
+    # Umbenennen = gleiche ID mit neuem Pfad und Titel.
+    links.add(2, "ordner/neu.md", "Neu", [], [])
+    assert links.outgoing(1) == [2] and links.incoming(2) == [1]
+    assert links.outgoing(3) == []
+    assert sorted(links.unresolved(3)) == ["alt", "ordner/alt"]
+    assert links.broken_count == 2 and links.edge_count == 1
+    assert links.orphan_count == 1
+    # Zurück in den Ordner unter altem Namen: beide Links von C greifen wieder.
+    links.add(2, "ordner/alt.md", "Neu", [], [])
+    assert links.outgoing(1) == [2] and links.outgoing(3) == [2]
+    assert links.incoming(2) == [1, 3]
+    assert links.broken_count == 0 and links.orphan_count == 0
+
+def test_rename_falls_back_to_other_note_with_same_name():
+    links = graph(
+        ("a/ziel.md", "Ziel", []),
+        ("b/ziel.md", "Ziel", []),
+        ("c.md", "C", ["ziel"]),
+    )
+    assert links.outgoing(3) == [1]
+    links.add(1, "a/anders.md", "Anders", [], [])
+    assert links.outgoing(3) == [2] and links.incoming(1) == []
+    assert links.broken_count == 0
+
+def test_delete_creates_broken_links():
+    links = graph(
+        ("a.md", "A", ["B", "C"]),
+        ("b.md", "B", ["A"]),
+        ("c.md", "C", []),
+        ("d.md", "D", ["B"]),
+    )
+    assert links.broken_count == 0 and links.edge_count == 4
+    assert links.orphan_count == 0
+    links.remove(2)
+    assert 2 not in links and len(links) == 3
+    assert links.unresolved(1) == ["b"] and links.unresolved(4) == ["b"]
+    assert links.broken_count == 2 and links.edge_count == 1
+    assert links.incoming(1) == [] and links.outgoing(4) == []
+    # D hat nur noch einen toten Link und ist damit verwaist.
+    assert links.orphan_count == 1
+    links.remove(3)
+    assert links.broken_count == 3 and links.edge_count == 0
+    assert links.orphan_count == 2
+    # Eine neue Notiz mit dem Namen löst die Links wieder auf.
+    links.add(5, "neu/b.md", "Irgendwas", [], [])
+    assert links.incoming(5) == [1, 4] and links.broken_count == 1
+
+def test_pagerank_cycle_is_uniform():
+    links = graph(("a.md", "A", ["B"]), ("b.md", "B", ["C"]), ("c.md", "C", ["A"]))
+    rank = links.pagerank()
+    assert rank == pytest.approx({1: 1 / 3, 2: 1 / 3, 3: 1 / 3})
+
+def test_pagerank_star():
+    # Zwei Blätter verlinken den Hub, der Hub hat keine Ausgänge (dangling).
+    # Mit d = 0.85 und N = 3: hub = 0.05 + 0.85 * hub / 3 + 0.85 * (1 - hub)
+    # -> hub = 27/47, Blätter je 10/47.
+    links = graph(("hub.md", "Hub", []), ("a.md", "A", ["Hub"]), ("b.md", "B", ["Hub"]))
+    rank = links.pagerank()
+    assert rank == pytest.approx({1: 27 / 47, 2: 10 / 47, 3: 10 / 47}, abs=1e-5)
+    assert sum(rank.values()) == pytest.approx(1.0)
+
+def test_pagerank_follows_changes():
+    links = graph(("hub.md", "Hub", []), ("a.md", "A", ["Hub"]), ("b.md", "B", ["Hub"]))
+    first = links.pagerank()
+    assert links.pagerank() is first
+    links.add(3, "b.md", "B", [], [])
+    rank = links.pagerank()
+    assert rank is not first
+    # B verlinkt den Hub nicht mehr: Hub verliert Gewicht, Blätter bleiben gleich.
+    assert rank[1] < 27 / 47 and rank[2] == pytest.approx(rank[3])
+    assert sum(rank.values()) == pytest.approx(1.0)
+
+def test_path_links_stay_inside_the_vault():
+    links = LinkGraph(root="/home/ich/vault")
+    links.add(1, "/home/ich/vault/b.md", "B", [], [])
+    links.add(2, "/home/ich/vault/ordner/c.md", "C", [], [])
+    links.add(3, "/home/ich/vault/a.md", "A", [], ["vault/b", "ich/vault/b", "ordner/c", "b"])
+    # Verzeichnisse oberhalb der Vault-Wurzel sind kein Teil des Linkziels.
+    assert links.outgoing(3) == [1, 2]
+    assert sorted(links.unresolved(3)) == ["ich/vault/b", "vault/b"]
+    assert links.resolve("vault/b") is None and links.resolve("ordner/c") == 2
@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import async_llm
+from async_llm import AsyncLLMProvider, ConcurrentRunner
+from llm_manager import LLMError, LLMManager, LLMProvider, LLMResponseError, LLMUnavailableError
+
+class FakeProvider(LLMProvider):
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.closed = threading.Event()
+
+    def generate_response(self, prompt):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return f"{self.name}: {prompt}"
+
+    def stream_response(self, prompt):
+        self.calls += 1
+        try:
+            time.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            yield f"{self.name}: "
+            yield prompt
+        finally:
+            self.closed.set()
+
+def manager(tmp_path, primary, fallback, hedge=False):
+    llm = LLMManager({
+        'provider': 'ollama',
+        'config': {'model': 'gross'},
+        'routing': {'enabled': True, 'hedge': hedge, 'hedge_initial_ms': 50,
+                    'backends': [{'name': 'ersatz', 'provider': 'ollama', 'config': {'model': 'ersatz'},
+                                  'small': False}]},
+        'cache': {'path': str(tmp_path / "llm_cache.sqlite")},
+    })
+    llm.router.backends[0]._provider = primary
+    llm.router.backends[1]._provider = fallback
+    return llm
+
+@pytest.mark.parametrize("stream", [False, True], ids=["generate", "stream"])
+def test_fallback_answer_is_cached_under_its_backend(tmp_path, stream):
+    primary = FakeProvider("gross", error=LLMUnavailableError("Fehler bei Test: weg"))
+    fallback = FakeProvider("ersatz")
+    llm = manager(tmp_path, primary, fallback)
+    ask = (lambda: "".join(llm.stream_response("frage"))) if stream else (lambda: llm.generate_response("frage"))
+    assert ask() == "ersatz: frage"
+    ersatz = llm.router.backends[1]
+    assert llm.cache.get(llm._cache_key("frage")) is None
+    assert llm.cache.get(llm._backend_key(ersatz, "frage")) == "ersatz: frage"
+    # Wieder verfügbar, Ersatz fällt aus: das große Modell antwortet selbst,
+    # nicht aus dem Cache.
+    primary.error = None
+    fallback.error = LLMUnavailableError("Fehler bei Test: weg")
+    for backend in llm.router.backends:
+        backend.cooldown_until = 0.0
+    assert ask() == "gross: frage"
+    assert ask() == "gross: frage" and primary.calls == 2
+    llm.close()
+
+def test_hedged_stream_takes_first_chunk(tmp_path):
+    slow = FakeProvider("gross", delay=1.0)
+    fast = FakeProvider("ersatz")
+    llm = manager(tmp_path, slow, fast, hedge=True)
+    start = time.perf_counter()
+    assert "".join(llm.stream_response("frage", use_cache=False)) == "ersatz: frage"
+    assert time.perf_counter() - start < 0.8
+    # Der verlorene Stream wird nach seinem ersten Stück geschlossen.
+    assert slow.closed.wait(timeout=5)
+    assert llm.router.backends[1].stats.first_chunks
+    llm.close()
+
+def test_hedged_stream_falls_back_when_both_fail_before_first_chunk(tmp_path):
+    llm = manager(tmp_path, FakeProvider("gross", delay=0.1, error=LLMUnavailableError("Fehler bei A")),
+                  FakeProvider("ersatz", error=LLMResponseError("Fehler bei B")), hedge=True)
+    assert "".join(llm.stream_response("frage", use_cache=False)).startswith("Fehler bei ")
+    llm.close()
+
+class FakeAsyncProvider(AsyncLLMProvider):
+    name = "Fake"
+
+    async def generate_response(self, prompt):
+        if prompt == "kaputt":
+            raise LLMResponseError("Fehler bei Fake-Anfrage: kaputt")
+        if prompt == "langsam":
+            await asyncio.sleep(1)
+        return prompt.upper()
+
+def test_runner_returns_typed_errors():
+    runner = ConcurrentRunner(FakeAsyncProvider(), max_concurrency=2, timeout=0.05)
+    ok, broken, slow = asyncio.run(runner.run_all(["gut", "kaputt", "langsam"]))
+    assert ok == "GUT"
+    assert isinstance(broken, LLMResponseError)
+    assert isinstance(slow, LLMUnavailableError) and "Zeitüberschreitung" in str(slow)
+
+def test_generate_many_does_not_cache_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(async_llm, "create_async_provider", lambda *args: FakeAsyncProvider())
+    llm = manager(tmp_path, FakeProvider("gross"), FakeProvider("ersatz"))
+    signatures = []
+    results = llm.generate_many(["gut", "kaputt", "gut"], on_signature=signatures.append)
+    assert signatures == [llm.model_signature()]
+    assert results[0] == results[2] == "GUT"
+    assert isinstance(results[1], LLMError)
+    assert llm.cache.get(llm._cache_key("gut")) == "GUT"
+    assert llm.cache.get(llm._cache_key("kaputt")) is None
+    llm.close()
+
+def test_failing_backend_ranks_last_without_latencies(tmp_path):
+    missing = FakeProvider("gross", error=LLMResponseError("Fehler bei Test: model not found"))
+    fallback = FakeProvider("ersatz")
+    llm = manager(tmp_path, missing, fallback)
+    for n in range(10):
+        assert llm.generate_response(f"frage {n}", use_cache=False) == f"ersatz: frage {n}"
+        # Auch nach Ablauf der Pause steht das scheiternde Backend hinten.
+        llm.router.backends[0].cooldown_until = 0.0
+    assert missing.calls == 1
+    assert llm.router.rank()[0].name == "ersatz"
+    llm.close()
+
+def test_response_errors_start_cooldown(tmp_path):
+    llm = manager(tmp_path, FakeProvider("gross", error=LLMResponseError("Fehler bei Test")),
+                  FakeProvider("ersatz"))
+    llm.generate_response("frage", use_cache=False)
+    assert llm.backend_stats()['ollama']['cooling_down']
+    llm.close()
+
+def test_slow_losers_do_not_delay_later_requests(tmp_path):
+    # Jede Anfrage gewinnt per Hedging; die langsamen Erstversuche laufen weiter.
+    llm = manager(tmp_path, FakeProvider("gross", delay=1.0), FakeProvider("ersatz"), hedge=True)
+    llm.router.hedge_initial_ms = 20
+    for n in range(12):
+        start = time.perf_counter()
+        assert llm.generate_response(f"frage {n}", use_cache=False) == f"ersatz: frage {n}"
+        assert time.perf_counter() - start < 0.5
+    llm.close()
+
+def test_no_hedge_when_pool_is_full(tmp_path):
+    fallback = FakeProvider("ersatz", delay=0.5)
+    llm = manager(tmp_path, FakeProvider("gross", delay=0.3), fallback, hedge=True)
+    llm.router.hedge_initial_ms = 20
+    llm.router._hedge_slots = threading.BoundedSemaphore(1)
+    results = []
+    threads = [threading.Thread(target=lambda n=n: results.append(llm.generate_response(f"frage {n}",
+                                                                                        use_cache=False)))
+               for n in range(2)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.1)
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == ["gross: frage 0", "gross: frage 1"]
+    assert fallback.calls == 1
+    llm.close()
+
+def test_misconfigured_backend_is_skipped(tmp_path):
+    llm = LLMManager({
+        'provider': 'openai',
+        'config': {'model': 'ohne-schluessel'},
+        'routing': {'enabled': True,
+                    'backends': [{'name': 'ersatz', 'provider': 'ollama', 'config': {'model': 'ersatz'},
+                                  'small': False}]},
+        'cache': {'enabled': False},
+    })
+    fallback = FakeProvider("ersatz")
+    llm.router.backends[1]._provider = fallback
+    llm.warm_up()
+    assert llm.generate_response("frage") == "ersatz: frage"
+    assert "".join(llm.stream_response("frage")) == "ersatz: frage"
+    assert llm.backend_stats()['openai']['cooling_down']
+    llm.close()
+
+def test_generate_many_skips_misconfigured_backend(tmp_path, monkeypatch):
+    created = []
+    real = async_llm.create_async_provider
+
+    def create(provider_name, config, max_concurrency=8):
+        created.append(provider_name)
+        return real(provider_name, config) if provider_name == 'openai' else FakeAsyncProvider()
+    monkeypatch.setattr(async_llm, "create_async_provider", create)
+    llm = LLMManager({'provider': 'openai', 'config': {}, 'cache': {'enabled': False},
+                      'routing': {'enabled': True, 'backends': [
+                          {'name': 'ersatz', 'provider': 'ollama', 'config': {}, 'small': False}]}})
+    assert llm.generate_many(["gut"]) == ["GUT"]
+    assert created == ['openai', 'ollama']
+    llm.close()
@@ -0,0 +1,60 @@
+import pytest
+
+from markdown_scanner import scan_markdown
+
+def scan(text):
+    return scan_markdown(text, "datei")
+
+@pytest.mark.parametrize("text,title,tags,links", [
+    # !, ~, [ oder ` vor einem Leerzeichen sind keine Überschrift.
+    ("Wow! Great #t [[L]]\n# Real", "Real", ["t"], ["L"]),
+    ("Cost ~ 5 EUR, see [[Link]]", "datei", [], ["Link"]),
+    ("list [ x ] #tag [[Link]]", "datei", ["tag"], ["Link"]),
+    ("a ` b #tag [[Link]]", "datei", ["tag"], ["Link"]),
+    ("a ``` b [[L]]", "datei", [], ["L"]),
+])
+def test_no_heading_false_positives(text, title, tags, links):
+    info = scan(text)
+    assert (info.title, info.tags, info.links) == (title, tags, links)
+
+def test_first_h1_is_title():
+    info = scan("## Unter\n  # eingerückt\n#\n# Titel mit `code` und [[Link]] #tag\n# Zweiter")
+    assert info.title == "Titel mit `code` und [[Link]] #tag"
+    assert info.links == ["Link"] and info.tags == ["tag"]
+
+def test_code_is_skipped():
+    text = ("# Titel\n```python\n# kein Titel #kein_tag [[KeinLink]]\n```\n"
+            "~~~\n```\n#auch_nicht\n~~~\n"
+            "text `#inline [[X]]` und `x`#nach_code #echt [[Echt]]")
+    info = scan(text)
+    assert info.title == "Titel"
+    assert info.tags == ["echt"]
+    assert info.links == ["Echt"]
+
+def test_code_block_before_heading():
+    assert scan("```\n# Im Code\n```\n# Titel").title == "Titel"
+    assert scan("```\n# Offen bis zum Ende").title == "datei"
+
+def test_tags():
+    info = scan("#a #a/b-c (#klammer) [#eckig] x#nein https://x.org/seite#anker #123 #2024/06 #v2 #über")
+    assert info.tags == ["a", "a/b-c", "klammer", "eckig", "v2", "über"]
+
+def test_links_and_embeds_are_normalized():
+    info = scan("[[Ziel#Abschnitt|Alias]] [[ Ziel ]] [[Andere|x]] ![[Bild.png]] ![[Ziel#^block]] [[]]")
+    assert info.links == ["Ziel", "Andere", "Bild.png"]
+    assert info.embeds == ["Bild.png", "Ziel"]
+
+def test_frontmatter():
+    text = "---\ntags: [projekt, '#idee']\naliases:\n  - Erster\n  - Zweiter\n---\n# Titel\n#projekt #neu"
+    info = scan(text)
+    assert info.title == "Titel"
+    assert info.tags == ["projekt", "idee", "neu"]
+    assert info.aliases == ["Erster", "Zweiter"]
+
+def test_frontmatter_yaml_fallback_and_scalars():
+    info = scan("---\nmeta: {a: 1}\ntags: eins zwei\nalias: Nur einer\n---\ntext")
+    assert info.tags == ["eins", "zwei"]
+    assert info.aliases == ["Nur einer"]
+    # Leeres oder nicht geschlossenes Frontmatter ist normaler Text.
+    assert scan("---\n---\n#tag").tags == ["tag"]
+    assert scan("---\ntags: [x]\n#tag").tags == ["tag"]
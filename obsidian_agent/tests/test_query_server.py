@@ -0,0 +1,118 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from query_server import create_server
+
+class FakeReader:
+    def note_count(self):
+        return 3
+
+class FakeAgent:
+    def __init__(self):
+        self.vault_reader = FakeReader()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def get_config_summary(self):
+        return {}
+
+    def get_performance(self):
+        return {}
+
+    def search_and_answer(self, question, stream=False):
+        if question == "warten":
+            self.entered.set()
+            self.release.wait(timeout=5)
+        if stream:
+            return iter(["Ant", "wort: ", question])
+        return f"Antwort: {question}"
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost", timeout=5)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(agent, **options):
+        server = create_server(agent, port=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def connect(server):
+    if isinstance(server.server_address, str):
+        return UnixConnection(server.server_address)
+    return http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+
+def post(server, path, data):
+    connection = connect(server)
+    connection.request("POST", path, json.dumps(data), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response, connection
+
+def test_ask(serve):
+    server = serve(FakeAgent())
+    response, connection = post(server, "/ask", {'question': "plan"})
+    body = json.loads(response.read())
+    assert response.status == 200 and body['ok'] and body['result'] == "Antwort: plan"
+    response, connection = post(server, "/ask", {})
+    assert response.status == 400 and json.loads(response.read())['error'] == "Feld 'question' fehlt"
+    connection.close()
+
+def test_full_queue_returns_503(serve):
+    agent = FakeAgent()
+    server = serve(agent, max_active=1, max_queue=0)
+    first = {}
+
+    def busy():
+        response, connection = post(server, "/ask", {'question': "warten"})
+        first['status'] = response.status
+        connection.close()
+    thread = threading.Thread(target=busy)
+    thread.start()
+    assert agent.entered.wait(timeout=5)
+    response, connection = post(server, "/ask", {'question': "plan"})
+    assert response.status == 503 and response.getheader('Retry-After') == '1'
+    connection.close()
+    agent.release.set()
+    thread.join(timeout=5)
+    assert first['status'] == 200
+    assert server.status()['served'] == 1
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="keine Unix-Sockets")
+def test_unix_socket(serve, tmp_path):
+    path = str(tmp_path / "agent.sock")
+    server = serve(FakeAgent(), socket_path=path)
+    assert server.address == f"unix:{path}"
+    connection = connect(server)
+    connection.request("GET", "/health")
+    response = connection.getresponse()
+    assert response.status == 200 and json.loads(response.read())['notes'] == 3
+    response, connection = post(server, "/ask", {'question': "plan"})
+    assert json.loads(response.read())['result'] == "Antwort: plan"
+    connection.close()
+
+def test_ndjson_stream(serve):
+    server = serve(FakeAgent())
+    response, connection = post(server, "/ask", {'question': "plan", 'stream': True})
+    assert response.status == 200
+    assert response.getheader('Content-Type').startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.read().decode('utf-8').splitlines()]
+    assert [line['chunk'] for line in lines[:-1]] == ["Ant", "wort: ", "plan"]
+    assert lines[-1]['done'] and 'elapsed_ms' in lines[-1] and 'error' not in lines[-1]
+    connection.close()
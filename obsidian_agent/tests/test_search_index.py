@@ -0,0 +1,37 @@
+from search_index import SearchIndex
+
+DOCS = {
+    1: ("Exakte Phrase", "ganz anderer text"),
+    2: ("Zwei", "hier steht die exakte phrase im text"),
+    3: ("Drei", "phrase exakte, nur vertauscht"),
+    4: ("Vier", "exakte worte und eine phrase"),
+    5: ("Fünf", "nichts davon"),
+}
+
+def make_index(reads):
+    def text_for(doc_id, field):
+        reads.append(doc_id)
+        title, content = DOCS[doc_id]
+        return title if field == "title" else content
+    index = SearchIndex(text_for)
+    for doc_id, (title, content) in DOCS.items():
+        index.add(doc_id, title, content)
+    return index
+
+def test_phrases_are_checked_against_text():
+    reads = []
+    index = make_index(reads)
+    assert sorted(doc_id for doc_id, _ in index.search('"exakte phrase"')) == [1, 2]
+    assert [doc_id for doc_id, _ in index.search('"exakte phrase"', "content")] == [2]
+    # Nur Dokumente mit allen Begriffen der Phrase werden gelesen.
+    assert 5 not in reads
+    assert index.matches(2, '"exakte phrase" text') and not index.matches(3, '"exakte phrase"')
+
+def test_frequencies_instead_of_positions():
+    index = make_index([])
+    index.add(6, "Sechs", "wort wort wort anderes")
+    assert index._postings["content"]["wort"] == {6: 3}
+    assert index._lengths["content"][6] == 4
+    index.remove(6)
+    assert "wort" not in index._postings["content"]
+    assert [doc_id for doc_id, _ in index.search("exakte", "title")] == [1]
@@ -0,0 +1,91 @@
+import pytest
+
+from search_index import CorpusStats
+from sharded_vault import ShardedVaultReader
+from vault_reader import VaultReader
+
+NOTES = {
+    "projekte": {
+        "plan.md": "# Plan\nprojekt plan für das garten projekt #projekt [[Garten]]\n",
+        "garten.md": "# Garten\ngarten tomaten und bohnen im garten #garten\n",
+        "notizen/idee.md": "# Idee\neine idee für ein neues projekt #idee #projekt\n",
+    },
+    "archiv": {
+        "alt.md": "# Alt\nein altes projekt mit tomaten #projekt\n",
+        "bericht.md": "# Bericht\nbericht über den garten und das projekt plan #Projekt\n",
+        "leer.md": "# Leer\nnichts\n",
+    },
+}
+
+def write(root, notes):
+    for rel_path, text in notes.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+
+@pytest.fixture
+def shard_dirs(tmp_path):
+    dirs = {}
+    for name, notes in NOTES.items():
+        dirs[name] = tmp_path / name
+        write(dirs[name], notes)
+    return dirs
+
+def sharded(shard_dirs, lazy=()):
+    return ShardedVaultReader([{'name': name, 'path': str(path), 'lazy': name in lazy}
+                               for name, path in shard_dirs.items()], use_cache=False)
+
+def test_corpus_stats_merge():
+    merged = CorpusStats.merged([
+        CorpusStats(2, {'title': 3, 'content': 10}, {'garten': 1, 'plan': 2}),
+        CorpusStats(1, {'content': 5}, {'garten': 1}),
+        CorpusStats(),
+    ])
+    assert merged == CorpusStats(3, {'title': 3, 'content': 15}, {'garten': 2, 'plan': 2})
+
+@pytest.mark.parametrize("query, search_in", [
+    ("projekt", "content"), ("garten tomaten", "content"), ('"garten und"', "content"), ("proj*", "content"),
+    ("plan", "both"), ("garten", "title"),
+])
+def test_sharded_scores_match_single_index(tmp_path, shard_dirs, query, search_in):
+    single_root = tmp_path / "alles"
+    for name, notes in NOTES.items():
+        write(single_root / name, notes)
+    single = VaultReader(str(single_root), use_cache=False)
+    single.refresh()
+    reader = sharded(shard_dirs)
+    reader.refresh()
+    expected = {note.title: score for note, score in single.search_scored(query, search_in)}
+    results = reader.search_scored(query, search_in)
+    assert expected
+    assert {note.title: score for note, score in results} == expected
+    assert [score for _, score in results] == sorted(expected.values(), reverse=True)
+    reader.close()
+    single.close()
+
+def test_lazy_shard_is_loaded_only_when_needed(shard_dirs):
+    reader = sharded(shard_dirs, lazy=("archiv",))
+    archiv = reader._by_name["archiv"]
+    reader.refresh()
+    assert not archiv.created and reader.note_count() == 3
+    # Genug Treffer in den aktiven Shards: das Archiv bleibt zu.
+    assert [note.title for note in reader.search_notes("garten", top_k=1)] == ["Garten"]
+    assert reader.get_note_by_title("Plan") is not None
+    assert not archiv.created
+    # Zu wenige Treffer: das Archiv wird angelegt und bleibt danach aktiv.
+    assert {note.title for note in reader.search_notes("tomaten", top_k=5)} == {"Garten", "Alt"}
+    assert archiv.created and reader.note_count() == 6
+    reader.close()
+
+def test_statistics_are_aggregated(shard_dirs):
+    reader = sharded(shard_dirs)
+    reader.refresh()
+    statistics = reader.get_statistics(top_k=None)
+    assert statistics['notes'] == 6
+    assert statistics['shards'] == {"projekte": 3, "archiv": 3}
+    assert statistics['total_bytes'] == sum(len(text.encode('utf-8')) for notes in NOTES.values()
+                                            for text in notes.values())
+    assert statistics['average_bytes'] == statistics['total_bytes'] // 6
+    assert statistics['edges'] == 1
+    assert dict(statistics['top_tags'])['garten'] == 1
+    reader.close()
@@ -0,0 +1,70 @@
+import pytest
+
+import vault_reader
+from vault_reader import VaultReader
+
+NOTES = {
+    "n0.md": "# N0\npython lernen, python üben\n",
+    "n1.md": "# N1\npython und java im vergleich\n",
+    "n2.md": "# N2\nnur rust hier\n",
+    "n3.md": "# N3\njava virtual machine\n",
+    "n4.md": "# N4\npythonic code, exakte phrase hier\n",
+    "sub/n5.md": "# Python Tipps\nphrase exakte nicht in reihenfolge\n",
+    "sub/n6.md": "# N6\nganz anderes thema\n",
+}
+
+QUERIES = [
+    ("python java", "content"),
+    ("python java", "both"),
+    ("pyth*", "content"),
+    ("pyth*", "title"),
+    ('"exakte phrase"', "content"),
+    ('"exakte phrase" hier', "both"),
+    ("java", "title"),
+    ("fehlt", "both"),
+]
+
+@pytest.fixture
+def make_reader(vault):
+    for rel_path, text in NOTES.items():
+        vault.write(rel_path, text)
+    readers = []
+
+    def make() -> VaultReader:
+        reader = VaultReader(str(vault.root), use_cache=False)
+        readers.append(reader)
+        return reader
+    yield make
+    for reader in readers:
+        reader.close()
+
+def titles(notes):
+    return [note.title for note in notes]
+
+@pytest.mark.parametrize("query,search_in", QUERIES)
+@pytest.mark.parametrize("limit", [None, 10])
+def test_cold_matches_warm(make_reader, query, search_in, limit):
+    cold = make_reader()
+    cold_titles = titles(cold.iter_search_notes(query, search_in, limit=limit))
+    assert not cold.scanned
+    warm = make_reader()
+    warm.refresh()
+    assert titles(warm.iter_search_notes(query, search_in, limit=limit)) == cold_titles
+    assert titles(warm.search_notes(query, search_in, top_k=limit)) == cold_titles
+
+def test_or_and_prefix_when_cold(make_reader):
+    reader = make_reader()
+    assert sorted(titles(reader.iter_search_notes("python java"))) == ["N0", "N1", "N3", "Python Tipps"]
+    assert sorted(titles(reader.iter_search_notes("pyth*"))) == ["N0", "N1", "N4", "Python Tipps"]
+
+def test_limit_stops_reading(make_reader, monkeypatch):
+    parsed = []
+    parse = vault_reader.parse_note
+    monkeypatch.setattr(vault_reader, "parse_note", lambda path, stat=None: parsed.append(path) or parse(path, stat))
+    reader = make_reader()
+    cold = titles(reader.iter_search_notes("java", limit=1))
+    # n0.md und n1.md reichen für einen Treffer.
+    assert cold == ["N1"] and len(parsed) == 2
+    warm = make_reader()
+    warm.refresh()
+    assert set(cold) <= set(titles(warm.search_notes("java")))
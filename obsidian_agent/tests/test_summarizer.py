@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+
+from chunker import ChunkCache
+from context_packer import ContextPacker
+from llm_manager import LLMResponseError
+from summarizer import VaultSummarizer
+from summary_store import SummaryStore
+from vault_reader import Note
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+        self.signature = "fake"
+
+    def model_signature(self, short=False):
+        return "fake"
+
+    def generate_many(self, prompts, short=False, on_signature=None):
+        self.prompts.extend(prompts)
+        if prompts and on_signature is not None:
+            on_signature(self.signature)
+        return [LLMResponseError("Fehler bei Test") if "kaputt" in prompt else "kurz" for prompt in prompts]
+
+def note(name, text):
+    return Note(name, f"/vault/{name}.md", 0.0, 0.0, [], [], content=f"# {name}\n" + (text + " ") * 40)
+
+def summarizer(llm, store=None):
+    return VaultSummarizer(llm, ContextPacker(4000), ChunkCache(), store=store, map_words=5)
+
+def test_store_rows_are_scoped_by_vault(tmp_path):
+    path = str(tmp_path / "summaries.sqlite")
+    a = SummaryStore(path, vault="/vault/a")
+    b = SummaryStore(path, vault="/vault/b")
+    a.put_many("sig", {"h1": "A1", "h2": "A2"})
+    b.put_many("sig", {"h1": "B1"})
+    a.prune("sig", ["h2"])
+    assert a.get("h1", "sig") is None and a.get("h2", "sig") == "A2"
+    assert b.get("h1", "sig") == "B1" and b.get("h2", "sig") is None
+    a.close()
+    b.close()
+
+def test_store_drops_old_schema(tmp_path):
+    path = tmp_path / "summaries.sqlite"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE summaries (content_hash TEXT, signature TEXT, summary TEXT, created REAL)")
+    conn.execute("INSERT INTO summaries VALUES ('h1', 'sig', 'alt', 0)")
+    conn.commit()
+    conn.close()
+    store = SummaryStore(str(path), vault="/vault/a")
+    assert store.get("h1", "sig") is None
+    store.put_many("sig", {"h1": "neu"})
+    assert store.get("h1", "sig") == "neu"
+    store.close()
+
+def test_prune_keeps_other_vaults(tmp_path):
+    path = str(tmp_path / "summaries.sqlite")
+    notes_a = [note("a1", "alpha"), note("a2", "beta")]
+    notes_b = [note("b1", "gamma")]
+    llm = FakeLLM()
+    summarizer_a = summarizer(llm, SummaryStore(path, vault="/vault/a"))
+    summarizer_b = summarizer(llm, SummaryStore(path, vault="/vault/b"))
+    summarizer_b.summarize(notes_b, 1000, prune=True)
+    summarizer_a.summarize(notes_a, 1000, prune=True)
+    summarizer_a.summarize(notes_a[:1], 1000, prune=True)
+    # B wird komplett aus dem Speicher bedient, A2 wurde nur in A entfernt.
+    llm.prompts.clear()
+    summarizer_b.summarize(notes_b, 1000, prune=True)
+    assert llm.prompts == []
+    summarizer_a.summarize(notes_a, 1000)
+    assert len(llm.prompts) == 1 and "a2" in llm.prompts[0]
+
+class BlockingLLM(FakeLLM):
+    def __init__(self):
+        super().__init__()
+        self.waiting = threading.Event()
+        self.release = threading.Event()
+
+    def generate_many(self, prompts, short=False, on_signature=None):
+        if threading.current_thread().name == "heil":
+            self.waiting.set()
+            self.release.wait(timeout=5)
+        return super().generate_many(prompts, short, on_signature)
+
+def test_concurrent_calls_report_their_own_failures():
+    # "heil" steckt im LLM-Aufruf, während "kaputt" komplett durchläuft.
+    llm = BlockingLLM()
+    shared = summarizer(llm)
+    results = {}
+
+    def run(name, notes):
+        results[name] = shared.summarize(notes, 1000)
+    healthy = threading.Thread(target=run, name="heil", args=("heil", [note("z", "heil")]))
+    healthy.start()
+    assert llm.waiting.wait(timeout=5)
+    run("kaputt", [note("x", "kaputt"), note("y", "kaputt")])
+    llm.release.set()
+    healthy.join()
+    assert results["kaputt"][1] == 2
+    assert results["heil"] == ("**z**\nkurz", 0)
+
+def test_fallback_summaries_are_not_stored(tmp_path):
+    llm = FakeLLM()
+    llm.signature = "ersatz"
+    store = SummaryStore(str(tmp_path / "summaries.sqlite"), vault="/vault/a")
+    notes = [note("a1", "alpha")]
+    assert summarizer(llm, store).summarize(notes, 1000) == ("**a1**\nkurz", 0)
+    llm.signature = "fake"
+    llm.prompts.clear()
+    summarizer(llm, store).summarize(notes, 1000)
+    assert len(llm.prompts) == 1
+    store.close()
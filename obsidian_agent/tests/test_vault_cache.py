@@ -0,0 +1,49 @@
+from vault_cache import VaultCache
+
+def terms(word, count=1):
+    return {word.upper(): 1}, {word: count}
+
+def put(cache, rel_path, counts, mtime_ns=1, size=10):
+    cache.put(rel_path, mtime_ns, size, 1.0, 2.0, rel_path.upper(), ["tag"], ["Link"], counts, ["Alias"])
+
+def test_entries_hold_metadata_only(tmp_path):
+    cache = VaultCache(str(tmp_path / "cache.sqlite"))
+    put(cache, "a.md", terms("inhalt"))
+    # Vor dem Schreiben kommen die Häufigkeiten aus dem Puffer, danach aus SQLite.
+    assert cache.get("a.md", 1, 10)['terms'] == terms("inhalt")
+    cache.flush()
+    assert all(not isinstance(value, bytes) for value in cache._entries["a.md"])
+    assert cache.get("a.md", 1, 10)['terms'] == terms("inhalt")
+    cache.close()
+
+def test_reopen_loads_metadata_and_reads_terms_on_demand(tmp_path):
+    cache = VaultCache(str(tmp_path / "cache.sqlite"))
+    put(cache, "a.md", terms("inhalt"))
+    put(cache, "b.md", terms("größe", 100), mtime_ns=5, size=800)
+    cache.close()
+
+    cache = VaultCache(str(tmp_path / "cache.sqlite"))
+    assert set(cache._entries) == {"a.md", "b.md"}
+    assert all(len(entry) == 8 for entry in cache._entries.values())
+    entry = cache.get("b.md", 5, 800)
+    assert entry == {
+        'created_time': 1.0, 'modified_time': 2.0, 'title': "B.MD", 'tags': ["tag"],
+        'links': ["Link"], 'aliases': ["Alias"], 'terms': ({"GRÖSSE": 1}, {"größe": 100})
+    }
+    assert cache.get("b.md", 6, 800) is None
+    assert cache.terms_for("fehlt.md") is None
+    cache.close()
+
+def test_prune_removes_terms(tmp_path):
+    cache = VaultCache(str(tmp_path / "cache.sqlite"))
+    put(cache, "a.md", terms("a"))
+    put(cache, "b.md", terms("b"))
+    cache.flush()
+    cache.prune(["b.md"])
+    assert cache.terms_for("a.md") is None
+    cache.close()
+
+    cache = VaultCache(str(tmp_path / "cache.sqlite"))
+    assert set(cache._entries) == {"b.md"}
+    assert cache.terms_for("b.md") == terms("b")
+    cache.close()
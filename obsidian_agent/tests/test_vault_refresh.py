@@ -0,0 +1,195 @@
+import pytest
+
+import search_index
+from vault_reader import VaultReader
+
+@pytest.fixture(params=[False, True], ids=["ohne_cache", "mit_cache"])
+def reader(request, vault, tmp_path):
+    vault.write("a.md", "# Alpha\nalpha text #projekt [[Beta]] [[Gamma]]\n")
+    vault.write("b.md", "# Beta\nbeta text #idee [[Alpha]]\n")
+    vault.write("notes/c.md", "gamma ohne titel #projekt/teil\n")
+    reader = VaultReader(str(vault.root), cache_path=str(tmp_path / "cache.sqlite"), use_cache=request.param)
+    reader.refresh()
+    yield reader
+    reader.close()
+
+def titles(notes):
+    return sorted(note.title for note in notes)
+
+def test_initial_scan(reader, assert_consistent):
+    assert reader.note_count() == 3
+    assert titles(reader.get_linked_notes("Alpha")) == ["Beta"]
+    assert titles(reader.search_by_tags(["projekt"])) == ["Alpha", "c"]
+    # [[Gamma]] hat noch kein Ziel (die Datei heißt c.md).
+    assert reader.index.links.broken_count == 1
+    assert reader.index.links.unresolved(reader.index._ids_by_path[reader.note_path("a.md")]) == ["gamma"]
+    assert_consistent(reader.index)
+
+def test_unchanged_refresh_is_empty(reader):
+    generation = reader.generation
+    delta = reader.refresh()
+    assert not delta
+    assert reader.generation == generation
+
+def test_add(reader, vault, assert_consistent):
+    events = []
+    reader.add_listener(events.append)
+    vault.write("d.md", "# Delta\ndelta text [[Alpha]] #neu\n")
+    delta = reader.refresh()
+    assert delta.added == ["d.md"] and not (delta.modified or delta.removed or delta.renamed)
+    assert events == [delta] and delta.generation == reader.generation
+    assert titles(reader.search_notes("delta")) == ["Delta"]
+    assert titles(reader.get_linked_notes("Alpha")) == ["Beta", "Delta"]
+    assert_consistent(reader.index)
+
+def test_add_resolves_broken_link(reader, vault, assert_consistent):
+    vault.write("e.md", "# Epsilon\n[[Zeta]]\n")
+    reader.refresh()
+    assert reader.index.links.broken_count == 2
+    vault.write("zeta.md", "zeta\n")
+    reader.refresh()
+    assert reader.index.links.broken_count == 1
+    assert titles(reader.get_linked_notes("zeta")) == ["Epsilon"]
+    assert_consistent(reader.index)
+
+def test_modify(reader, vault, assert_consistent):
+    vault.write("b.md", "# Beta\nganz neuer inhalt #anders\n")
+    delta = reader.refresh()
+    assert delta.modified == ["b.md"] and not (delta.added or delta.removed or delta.renamed)
+    assert titles(reader.search_notes("text")) == ["Alpha"]
+    assert titles(reader.search_notes("inhalt")) == ["Beta"]
+    assert reader.search_by_tags(["idee"]) == []
+    assert titles(reader.search_by_tags(["anders"])) == ["Beta"]
+    # Der Link Beta -> Alpha ist weg.
+    assert reader.get_linked_notes("Alpha") == []
+    text = reader.index.text
+    b_id = reader.index._ids_by_path[reader.note_path("b.md")]
+    assert "idee" not in text._postings["content"]
+    assert b_id not in text._postings["content"]["text"] and b_id in text._postings["content"]["inhalt"]
+    assert_consistent(reader.index)
+
+def test_modify_title(reader, vault, assert_consistent):
+    vault.write("b.md", "# Bravo\nbeta text #idee [[Alpha]]\n")
+    reader.refresh()
+    assert reader.get_note_by_title("Beta") is None
+    assert reader.get_note_by_title("Bravo").file_path.endswith("b.md")
+    # [[Beta]] in a.md zeigt nun ins Leere.
+    assert reader.index.links.broken_count == 2
+    assert reader.get_linked_notes("Bravo") == []
+    assert_consistent(reader.index)
+
+def test_rename(reader, vault, assert_consistent):
+    vault.rename("notes/c.md", "archiv/gamma.md")
+    delta = reader.refresh()
+    assert delta.renamed == [("notes/c.md", "archiv/gamma.md")]
+    assert not (delta.added or delta.modified or delta.removed)
+    # Titel aus dem Dateinamen folgt der Umbenennung; [[Gamma]] löst jetzt auf.
+    assert reader.get_note_by_title("c") is None
+    assert reader.get_note_by_title("gamma").file_path.endswith("gamma.md")
+    assert titles(reader.get_linked_notes("gamma")) == ["Alpha"]
+    assert reader.index.links.broken_count == 0
+    assert titles(reader.search_notes("ohne")) == ["gamma"]
+    assert_consistent(reader.index)
+
+def test_rename_keeps_heading_title(reader, vault, assert_consistent):
+    vault.rename("b.md", "x.md")
+    delta = reader.refresh()
+    assert delta.renamed == [("b.md", "x.md")]
+    assert reader.get_note_by_title("Beta").file_path.endswith("x.md")
+    assert titles(reader.get_linked_notes("Beta")) == ["Alpha"]
+    assert titles(reader.search_by_tags(["idee"])) == ["Beta"]
+    assert_consistent(reader.index)
+
+def test_rename_and_modify(reader, vault, assert_consistent):
+    vault.rename("b.md", "x.md")
+    vault.write("x.md", "# Beta\nneu\n")
+    delta = reader.refresh()
+    # Andere mtime/Größe: kein Rename, sondern Löschen + Neuanlage.
+    assert delta.added == ["x.md"] and delta.removed == ["b.md"] and not delta.renamed
+    assert titles(reader.search_notes("neu")) == ["Beta"]
+    assert_consistent(reader.index)
+
+def test_delete(reader, vault, assert_consistent):
+    vault.delete("b.md")
+    delta = reader.refresh()
+    assert delta.removed == ["b.md"] and not (delta.added or delta.modified or delta.renamed)
+    assert reader.get_note_by_title("Beta") is None
+    assert titles(reader.search_notes("beta")) == ["Alpha"]
+    assert reader.search_by_tags(["idee"]) == []
+    # [[Beta]] in a.md ist jetzt defekt; Alpha hat keine Backlinks mehr.
+    assert reader.index.links.broken_count == 2
+    assert reader.get_linked_notes("Alpha") == []
+    assert reader.index.stats.notes == 2
+    assert_consistent(reader.index)
+
+def test_delete_and_recreate(reader, vault, assert_consistent):
+    vault.delete("a.md")
+    reader.refresh()
+    vault.write("a.md", "# Alpha\nwieder da [[Beta]]\n")
+    delta = reader.refresh()
+    assert delta.added == ["a.md"]
+    assert titles(reader.get_linked_notes("Beta")) == ["Alpha"]
+    assert_consistent(reader.index)
+
+def test_warm_start_from_cache(vault, tmp_path, assert_consistent):
+    vault.write("a.md", "# Alpha\n[[Beta]] #x\n")
+    vault.write("b.md", "# Beta\ntext\n")
+    cache_path = str(tmp_path / "cache.sqlite")
+    first = VaultReader(str(vault.root), cache_path=cache_path)
+    first.refresh()
+    first.close()
+    vault.rename("b.md", "c.md")
+    second = VaultReader(str(vault.root), cache_path=cache_path)
+    delta = second.refresh()
+    assert sorted(delta.added) == ["a.md", "c.md"]
+    assert titles(second.get_linked_notes("Beta")) == ["Alpha"]
+    assert second.get_note_by_title("Beta").content == "# Beta\ntext\n"
+    assert_consistent(second.index)
+    second.close()
+
+def test_warm_start_reads_no_notes(vault, tmp_path, monkeypatch, assert_consistent):
+    vault.write("a.md", "# Alpha\nalpha text [[Beta]] #x\n")
+    vault.write("b.md", "# Beta\nbeta text alpha\n")
+    cache_path = str(tmp_path / "cache.sqlite")
+    first = VaultReader(str(vault.root), cache_path=cache_path)
+    first.refresh()
+    first.close()
+
+    def fail(*args, **kwargs):
+        raise AssertionError(f"Notiz gelesen oder tokenisiert: {args[0]!r}")
+    second = VaultReader(str(vault.root), cache_path=cache_path)
+    with monkeypatch.context() as patch:
+        patch.setattr("builtins.open", fail)
+        patch.setattr(search_index, "tokenize", fail)
+        second.refresh()
+    # Der aus dem Cache aufgebaute Index gleicht einem aus den Dateien gebauten.
+    assert_consistent(second.index)
+    assert [note.title for note in second.search_notes("alpha")] == ["Alpha", "Beta"]
+    second.close()
+
+def test_unreadable_note_is_skipped_until_it_changes(reader, vault, capsys):
+    bad = vault.write("kaputt.md", "")
+    bad.write_bytes(b"# Kaputt\n\xff\xfe")
+    assert reader.refresh().added == []
+    assert "kaputt.md" in capsys.readouterr().out
+    assert not reader.refresh() and not reader.refresh()
+    assert capsys.readouterr().out == ""
+    vault.write("kaputt.md", "# Kaputt\nrepariert\n")
+    assert reader.refresh().added == ["kaputt.md"]
+    assert reader.note_count() == 4
+
+def test_tag_statistics_ignore_case(reader, vault):
+    vault.write("d.md", "# Delta\n#Projekt\n")
+    reader.refresh()
+    assert dict(reader.get_statistics()['top_tags'])['projekt'] == 2
+    vault.delete("d.md")
+    reader.refresh()
+    assert dict(reader.get_statistics()['top_tags'])['projekt'] == 1
+    vault.delete("a.md")
+    reader.refresh()
+    assert 'projekt' not in dict(reader.get_statistics()['top_tags'])
+
+def test_path_links_ignore_directories_above_the_vault(reader, vault):
+    vault.write("d.md", f"# Delta\n[[{vault.root.name}/b]] [[notes/c]]\n")
+    reader.refresh()
+    assert titles(reader.get_outgoing_notes("Delta")) == ["c"]
@@ -0,0 +1,202 @@
+import functools
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    start_ms: float
+    duration_ms: float = 0.0
+    counters: Dict[str, float] = field(default_factory=dict)
+
+@dataclass
+class Trace:
+    operation: str
+    started: float
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+    counters: Dict[str, float] = field(default_factory=dict)
+    total_ms: float = 0.0
+    pending: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'operation': self.operation,
+            'started': self.started,
+            'attrs': self.attrs,
+            'total_ms': round(self.total_ms, 3),
+            'counters': self.counters,
+            'spans': [
+                {'name': span.name, 'depth': span.depth, 'start_ms': round(span.start_ms, 3),
+                 'duration_ms': round(span.duration_ms, 3), 'counters': span.counters}
+                for span in self.spans
+            ]
+        }
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    # Nearest-Rank-Methode
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+# Messpunkte pro Anfrage: Eine Agent-Operation öffnet einen Trace, darin
+# zeichnen Vault-Scan, Suche, Prompt-Bau und LLM-Aufruf Spans mit Dauer und
+# Zählern (Dateien, Bytes, Prompt-Zeichen, Tokens, Provider-Latenz) auf.
+# Ohne offenen Trace sind span()/record() nahezu kostenlos.
+class Tracer:
+    def __init__(self, history: int = 200, trace_file: Optional[str] = None):
+        self.history: "deque[Trace]" = deque(maxlen=history)
+        self.trace_file = Path(trace_file) if trace_file else None
+        self.enabled = True
+        self._trace: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+        self._span: ContextVar[Optional[Span]] = ContextVar('span', default=None)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool = True, trace_file: Optional[str] = None, history: Optional[int] = None):
+        self.enabled = enabled
+        self.trace_file = Path(trace_file).expanduser() if trace_file else None
+        if history:
+            self.history = deque(self.history, maxlen=history)
+
+    def current(self) -> Optional[Trace]:
+        return self._trace.get()
+
+    @contextmanager
+    def request(self, operation: str, **attrs) -> Iterator[Optional[Trace]]:
+        if not self.enabled or self._trace.get() is not None:
+            yield self._trace.get()
+            return
+        trace = Trace(operation, time.time(), attrs)
+        start = time.perf_counter()
+        token = self._trace.set(trace)
+        try:
+            yield trace
+        finally:
+            self._trace.reset(token)
+            trace.total_ms = (time.perf_counter() - start) * 1000
+            if not trace.pending:
+                self.finish(trace)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Optional[Span]]:
+        trace = self._trace.get()
+        if trace is None:
+            yield None
+            return
+        parent = self._span.get()
+        start = time.perf_counter()
+        span = Span(name, parent.depth + 1 if parent else 0, (time.time() - trace.started) * 1000)
+        token = self._span.set(span)
+        try:
+            yield span
+        finally:
+            self._span.reset(token)
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                trace.spans.append(span)
+
+    def record(self, **counters: float):
+        trace = self._trace.get()
+        if trace is None:
+            return
+        span = self._span.get()
+        with self._lock:
+            for target in (span.counters if span else None, trace.counters):
+                if target is None:
+                    continue
+                for key, value in counters.items():
+                    target[key] = target.get(key, 0) + value
+
+    def stream(self, chunks: Iterator[str], name: str = "llm.stream") -> Iterator[str]:
+        # Der Trace bleibt offen, bis der Stream verbraucht ist.
+        trace = self._trace.get()
+        if trace is None:
+            return chunks
+        trace.pending = True
+        return self._traced_stream(trace, chunks, name)
+
+    def _traced_stream(self, trace: Trace, chunks: Iterator[str], name: str) -> Iterator[str]:
+        start = time.perf_counter()
+        span = Span(name, 0, (time.time() - trace.started) * 1000)
+        response_chars = 0
+        try:
+            while True:
+                # Kontext nur während next() setzen, damit er nicht in den Aufrufer leckt.
+                token = self._trace.set(trace)
+                span_token = self._span.set(span)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                finally:
+                    self._span.reset(span_token)
+                    self._trace.reset(token)
+                if not response_chars:
+                    span.counters['first_chunk_ms'] = round((time.perf_counter() - start) * 1000, 3)
+                response_chars += len(chunk)
+                yield chunk
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            span.counters['response_chars'] = response_chars
+            with self._lock:
+                trace.spans.append(span)
+            trace.total_ms = (time.time() - trace.started) * 1000
+            self.finish(trace)
+
+    def finish(self, trace: Trace):
+        with self._lock:
+            self.history.append(trace)
+        if self.trace_file is None:
+            return
+        try:
+            self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock, open(self.trace_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Trace-Datei nicht schreibbar ({self.trace_file}): {e}")
+            self.trace_file = None
+
+    def last(self) -> Optional[Trace]:
+        with self._lock:
+            return self.history[-1] if self.history else None
+
+    def percentiles(self, quantiles=(50, 90, 99)) -> Dict[str, Dict[str, Dict[str, float]]]:
+        with self._lock:
+            traces = list(self.history)
+        operations: Dict[str, List[float]] = {}
+        stages: Dict[str, List[float]] = {}
+        for trace in traces:
+            operations.setdefault(trace.operation, []).append(trace.total_ms)
+            stage_totals: Dict[str, float] = {}
+            for span in trace.spans:
+                stage_totals[span.name] = stage_totals.get(span.name, 0.0) + span.duration_ms
+            for name, duration in stage_totals.items():
+                stages.setdefault(name, []).append(duration)
+
+        def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+            return {
+                name: dict({'count': len(values)}, **{f"p{q}": round(percentile(values, q), 1) for q in quantiles})
+                for name, values in samples.items()
+            }
+        return {'operations': summarize(operations), 'stages': summarize(stages)}
+
+tracer = Tracer()
+
+def traced(operation: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.request(operation):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from search_index import TermCounts
+
+# Persistenter Parse-Cache, Schlüssel: relativer Pfad + (mtime, size).
+# Statt des Inhalts speichert er die Begriffshäufigkeiten für den Suchindex:
+# Ein Warmstart braucht so nur ein stat pro Datei und liest weder Notizen noch
+# tokenisiert er sie. Nur die Metadaten werden einmal in den Speicher geladen;
+# die komprimierten Häufigkeiten bleiben in SQLite und werden pro Treffer
+# gelesen. Änderungen werden pro Scan in einer Transaktion zurückgeschrieben.
+class VaultCache:
+    DEFAULT_FILENAME = ".obsidian_agent_cache.sqlite"
+    SCHEMA_VERSION = 3
+
+    def __init__(self, cache_path: str):
+        self.cache_path = Path(cache_path)
+        self._entries: Dict[str, Tuple] = {}
+        self._dirty: Dict[str, Tuple] = {}
+        self._removed: set = set()
+        self._conn = None
+        self._lock = threading.Lock()
+        self.enabled = True
+
+        try:
+            self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+            self._init_schema()
+            self._load()
+        except sqlite3.Error as e:
+            print(f"Vault-Cache deaktiviert ({self.cache_path}): {e}")
+            self.enabled = False
+            self._entries = {}
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _init_schema(self):
+        cur = self._conn.cursor()
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            cur.execute("DROP TABLE IF EXISTS notes")
+            cur.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS notes (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                ctime REAL NOT NULL,
+                mtime REAL NOT NULL,
+                title TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                links TEXT NOT NULL,
+                aliases TEXT NOT NULL,
+                terms BLOB NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def _load(self):
+        rows = self._conn.execute(
+            "SELECT path, mtime_ns, size, ctime, mtime, title, tags, links, aliases FROM notes"
+        )
+        for row in rows:
+            self._entries[row[0]] = row[1:]
+
+    def get(self, rel_path: str, mtime_ns: int, size: int) -> Optional[Dict]:
+        entry = self._entries.get(rel_path)
+        if entry is None or entry[0] != mtime_ns or entry[1] != size:
+            return None
+        terms = self.terms_for(rel_path)
+        if terms is None:
+            return None
+        _, _, ctime, mtime, title, tags, links, aliases = entry
+        return {
+            'created_time': ctime,
+            'modified_time': mtime,
+            'title': title,
+            'tags': json.loads(tags),
+            'links': json.loads(links),
+            'aliases': json.loads(aliases),
+            'terms': terms,
+        }
+
+    def terms_for(self, rel_path: str) -> Optional[TermCounts]:
+        # Noch nicht geschriebene Einträge liegen in _dirty, alle anderen in SQLite.
+        dirty = self._dirty.get(rel_path)
+        if dirty is not None:
+            blob = dirty[-1]
+        else:
+            if self._conn is None or rel_path not in self._entries:
+                return None
+            try:
+                with self._lock:
+                    row = self._conn.execute("SELECT terms FROM notes WHERE path = ?", (rel_path,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Fehler beim Lesen des Vault-Caches: {e}")
+                return None
+            if row is None:
+                return None
+            blob = row[0]
+        title, content = json.loads(zlib.decompress(blob))
+        return title, content
+
+    def put(self, rel_path: str, mtime_ns: int, size: int, ctime: float, mtime: float,
+            title: str, tags: List[str], links: List[str], terms: TermCounts, aliases: List[str] = ()):
+        entry = (
+            mtime_ns, size, ctime, mtime, title,
+            json.dumps(tags, ensure_ascii=False),
+            json.dumps(links, ensure_ascii=False),
+            json.dumps(list(aliases), ensure_ascii=False),
+            zlib.compress(json.dumps(terms, ensure_ascii=False).encode('utf-8'), 1),
+        )
+        self._entries[rel_path] = entry[:-1]
+        self._dirty[rel_path] = entry
+        self._removed.discard(rel_path)
+
+    def prune(self, keep: Iterable[str]):
+        keep = set(keep)
+        for rel_path in [p for p in self._entries if p not in keep]:
+            del self._entries[rel_path]
+            self._dirty.pop(rel_path, None)
+            self._removed.add(rel_path)
+
+    def flush(self):
+        if not self.enabled or (not self._dirty and not self._removed):
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(path,) + entry for path, entry in self._dirty.items()]
+                )
+                self._conn.executemany(
+                    "DELETE FROM notes WHERE path = ?",
+                    [(path,) for path in self._removed]
+                )
+            self._dirty.clear()
+            self._removed.clear()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Schreiben des Vault-Caches: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            with self._lock:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,209 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+from link_graph import LinkGraph
+from search_index import CorpusStats, SearchIndex, TermCounts, count_terms
+from vault_stats import VaultStats
+
+if TYPE_CHECKING:
+    from vault_reader import Note
+
+# Lookup-Tabellen über alle Notizen: Titel (casefold), Tags inkl.
+# hierarchischer Präfixe (projekt/alpha -> projekt), aufgelöster Link-Graph
+# BM25-Volltextindex und laufende Statistik.
+class VaultIndex:
+    def __init__(self, notes: Iterable['Note'] = (), root: Optional[str] = None):
+        self.root = root
+        self.notes: Dict[int, 'Note'] = {}
+        self._ids_by_path: Dict[str, int] = {}
+        self._next_id = 0
+        self._titles: Dict[str, Set[int]] = {}
+        self._aliases: Dict[str, Set[int]] = {}
+        self._tags: Dict[str, Set[int]] = {}
+        self.text = SearchIndex(self._text_for)
+        self.links = LinkGraph(root)
+        self.stats = VaultStats()
+
+        self.add_many((note, None) for note in notes)
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def _text_for(self, note_id: int, field: str) -> str:
+        # Für Phrasen: Der Inhalt wird erst dann von der Platte gelesen.
+        note = self.notes[note_id]
+        return note.title if field == "title" else note.content
+
+    @staticmethod
+    def _tag_keys(tag: str) -> List[str]:
+        parts = tag.casefold().split('/')
+        return ['/'.join(parts[:i]) for i in range(1, len(parts) + 1) if parts[i - 1]]
+
+    def add(self, note: 'Note', terms: Optional[TermCounts] = None) -> int:
+        return self.add_many([(note, terms)])[0]
+
+    # Mit Begriffshäufigkeiten (z.B. aus dem Parse-Cache) wird der Inhalt nicht
+    # gelesen; Links werden für den ganzen Stapel gemeinsam aufgelöst.
+    def add_many(self, entries: Iterable[Tuple['Note', Optional[TermCounts]]]) -> List[int]:
+        ids = []
+        for note, terms in entries:
+            if note.file_path in self._ids_by_path:
+                self.remove(note.file_path)
+
+            note_id = self._next_id
+            self._next_id += 1
+            self.notes[note_id] = note
+            self._ids_by_path[note.file_path] = note_id
+
+            self._titles.setdefault(note.title.casefold(), set()).add(note_id)
+            for alias in note.aliases:
+                self._aliases.setdefault(alias.casefold(), set()).add(note_id)
+            for tag in note.tags:
+                for key in self._tag_keys(tag):
+                    self._tags.setdefault(key, set()).add(note_id)
+            self.text.add_counts(note_id, terms if terms is not None else count_terms(note.title, note.content))
+            self.stats.add(note)
+            ids.append(note_id)
+        self.links.add_many((note_id, self.notes[note_id].file_path, self.notes[note_id].title,
+                             self.notes[note_id].aliases, self.notes[note_id].links)
+                            for note_id in ids if note_id in self.notes)
+        return ids
+
+    def remove(self, file_path: str) -> Optional['Note']:
+        note_id = self._ids_by_path.pop(file_path, None)
+        if note_id is None:
+            return None
+        note = self.notes.pop(note_id)
+
+        self._discard(self._titles, note.title.casefold(), note_id)
+        for alias in note.aliases:
+            self._discard(self._aliases, alias.casefold(), note_id)
+        for tag in note.tags:
+            for key in self._tag_keys(tag):
+                self._discard(self._tags, key, note_id)
+        self.text.remove(note_id)
+        self.links.remove(note_id)
+        self.stats.remove(note)
+        return note
+
+    @staticmethod
+    def _discard(table: Dict[str, Set[int]], key: str, note_id: int):
+        ids = table.get(key)
+        if ids is not None:
+            ids.discard(note_id)
+            if not ids:
+                del table[key]
+
+    def get(self, file_path: str) -> Optional['Note']:
+        note_id = self._ids_by_path.get(file_path)
+        return self.notes.get(note_id) if note_id is not None else None
+
+    def _resolve(self, ids: Iterable[int]) -> List['Note']:
+        return [self.notes[i] for i in sorted(ids)]
+
+    def _id_for_title(self, title: str) -> Optional[int]:
+        ids = self._titles.get(title.casefold()) or self._aliases.get(title.casefold())
+        if ids:
+            return min(ids)
+        # Auch Dateinamen und Pfade wie in Wikilinks akzeptieren.
+        return self.links.resolve(title)
+
+    def by_title(self, title: str) -> Optional['Note']:
+        note_id = self._id_for_title(title)
+        return self.notes[note_id] if note_id is not None else None
+
+    def by_tags(self, tags: List[str]) -> List['Note']:
+        ids: Set[int] = set()
+        for tag in tags:
+            ids.update(self._tags.get(tag.casefold().strip('#'), ()))
+        return self._resolve(ids)
+
+    def backlinks(self, title: str) -> List['Note']:
+        note_id = self._id_for_title(title)
+        return self._resolve(self.links.incoming(note_id)) if note_id is not None else []
+
+    def outlinks(self, title: str) -> List['Note']:
+        note_id = self._id_for_title(title)
+        return self._resolve(self.links.outgoing(note_id)) if note_id is not None else []
+
+    def neighborhood(self, title: str, hops: int = 2, limit: Optional[int] = None) -> List[Tuple['Note', int]]:
+        note_id = self._id_for_title(title)
+        if note_id is None:
+            return []
+        rank = self.links.pagerank()
+        distances = self.links.neighborhood(note_id, hops)
+        ordered = sorted(distances, key=lambda i: (distances[i], -rank.get(i, 0.0), i))[:limit]
+        return [(self.notes[i], distances[i]) for i in ordered]
+
+    def shortest_path(self, start: str, goal: str, max_hops: Optional[int] = None) -> List['Note']:
+        start_id, goal_id = self._id_for_title(start), self._id_for_title(goal)
+        if start_id is None or goal_id is None:
+            return []
+        path = self.links.shortest_path(start_id, goal_id, max_hops=max_hops)
+        return [self.notes[i] for i in path] if path else []
+
+    def _ids_for_notes(self, notes: Iterable['Note']) -> List[int]:
+        ids = (self._ids_by_path.get(note.file_path) for note in notes)
+        return [note_id for note_id in ids if note_id is not None]
+
+    def related(self, notes: Iterable['Note'], limit: int = 10, hops: int = 1) -> List['Note']:
+        # Notizen im Umfeld der Treffer, nach Anzahl verbundener Treffer und PageRank.
+        seeds = self._ids_for_notes(notes)
+        seed_set = set(seeds)
+        rank = self.links.pagerank()
+        votes: Dict[int, float] = {}
+        for seed in seeds:
+            for neighbor, distance in self.links.neighborhood(seed, hops).items():
+                if neighbor not in seed_set:
+                    votes[neighbor] = votes.get(neighbor, 0.0) + 1.0 / distance
+        ordered = sorted(votes, key=lambda i: (-votes[i], -rank.get(i, 0.0), i))[:limit]
+        return [self.notes[i] for i in ordered]
+
+    def link_structure(self, notes: Iterable['Note'], max_paths: int = 5,
+                       max_hops: int = 4) -> Tuple[List[Tuple['Note', 'Note']], List[List['Note']]]:
+        ids = self._ids_for_notes(notes)
+        id_set = set(ids)
+        edges = [(self.notes[source], self.notes[target])
+                 for source in ids for target in self.links.outgoing(source) if target in id_set]
+        # Kürzeste Wege zwischen Notizen ohne direkte Kante.
+        linked = {frozenset((a.file_path, b.file_path)) for a, b in edges}
+        paths: List[List['Note']] = []
+        for i, start in enumerate(ids):
+            for goal in ids[i + 1:]:
+                if len(paths) >= max_paths:
+                    break
+                if frozenset((self.notes[start].file_path, self.notes[goal].file_path)) in linked:
+                    continue
+                path = self.links.shortest_path(start, goal, max_hops=max_hops)
+                if path and len(path) > 2:
+                    paths.append([self.notes[node_id] for node_id in path])
+        return edges, paths
+
+    def central(self, top_k: int = 10) -> List[Tuple['Note', float]]:
+        rank = self.links.pagerank()
+        ordered = sorted(rank, key=lambda i: (-rank[i], i))[:top_k]
+        return [(self.notes[i], rank[i]) for i in ordered]
+
+    def search(self, query: str, search_in: str = "both", top_k: Optional[int] = None) -> List['Note']:
+        return [note for note, _ in self.search_scored(query, search_in, top_k)]
+
+    def search_scored(self, query: str, search_in: str = "both", top_k: Optional[int] = None,
+                      corpus: Optional[CorpusStats] = None) -> List[Tuple['Note', float]]:
+        return [(self.notes[note_id], score) for note_id, score in self.text.search(query, search_in, top_k, corpus)]
+
+    def corpus_stats(self, query: str, search_in: str = "both") -> CorpusStats:
+        return self.text.corpus_stats(query, search_in)
+
+    def all_notes(self) -> List['Note']:
+        return self._resolve(self.notes.keys())
+
+    def statistics(self, top_k: Optional[int] = 10) -> Dict[str, Any]:
+        return {
+            'notes': self.stats.notes,
+            'total_bytes': self.stats.total_bytes,
+            'average_bytes': self.stats.average_bytes,
+            'unique_tags': len(self.stats.tags),
+            'top_tags': self.stats.top_tags(top_k),
+            'unique_links': self.links.target_count,
+            'edges': self.links.edge_count,
+            'orphans': self.links.orphan_count,
+            'broken_links': self.links.broken_count
+        }
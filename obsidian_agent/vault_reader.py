@@ -1,127 +1,437 @@
 import os
-import re
+import sys
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+from vault_cache import VaultCache
+from vault_index import VaultIndex
+from search_index import CorpusStats, SearchIndex, TermCounts, count_terms
+from vault_scanner import VaultScanner
+from markdown_scanner import scan_markdown
+from tracing import tracer
 
-@dataclass
+# Kompakte Notiz: hält nur Metadaten im Speicher. Der Inhalt wird bei Bedarf
+# von der Platte gelesen; Tags und Links sind internierte Strings, die sich
+# alle Notizen teilen.
 class Note:
-    title: str
-    content: str
-    file_path: str
-    created_time: datetime
-    modified_time: datetime
-    tags: List[str]
-    links: List[str]
+    __slots__ = ('title', 'file_path', 'created_ts', 'modified_ts', 'size', 'tags', 'links', 'aliases', '_content')
+    
+    def __init__(self, title: str, file_path: str, created_ts: float, modified_ts: float,
+                 tags: Iterable[str], links: Iterable[str], size: int = 0, content: Optional[str] = None,
+                 aliases: Iterable[str] = ()):
+        self.title = title
+        self.file_path = file_path
+        self.created_ts = created_ts
+        self.modified_ts = modified_ts
+        self.size = size
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+        self.links = tuple(sys.intern(link) for link in links)
+        self.aliases = tuple(aliases)
+        self._content = content
+    
+    def __reduce__(self):
+        return (Note, (self.title, self.file_path, self.created_ts, self.modified_ts,
+                       self.tags, self.links, self.size, self._content, self.aliases))
+    
+    def __repr__(self) -> str:
+        return f"Note(title={self.title!r}, file_path={self.file_path!r})"
+    
+    @property
+    def created_time(self) -> datetime:
+        return datetime.fromtimestamp(self.created_ts)
+    
+    @property
+    def modified_time(self) -> datetime:
+        return datetime.fromtimestamp(self.modified_ts)
+    
+    @property
+    def content(self) -> str:
+        if self._content is not None:
+            return self._content
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            tracer.record(files_read=1, bytes_read=self.size)
+            return content
+        except OSError as e:
+            print(f"Error reading note {self.file_path}: {e}")
+            return ""
+    
+    def release_content(self):
+        self._content = None
+
+@dataclass
+class VaultDelta:
+    generation: int
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+    
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed or self.renamed)
+
+def parse_note(file_path: str, stat: Optional[os.stat_result] = None) -> Optional[Note]:
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        if stat is None:
+            stat = os.stat(file_path)
+        
+        info = scan_markdown(content, Path(file_path).stem)
+        
+        return Note(
+            title=info.title,
+            file_path=str(file_path),
+            created_ts=stat.st_ctime,
+            modified_ts=stat.st_mtime,
+            tags=info.tags,
+            links=info.links,
+            size=stat.st_size,
+            content=content,
+            aliases=info.aliases
+        )
+    except Exception as e:
+        print(f"Error parsing note {file_path}: {e}")
+        return None
 
 class VaultReader:
-    def __init__(self, vault_path: str):
+    def __init__(self, vault_path: str, cache_path: Optional[str] = None, use_cache: bool = True,
+                 ignore: Optional[List[str]] = None, scan_workers: int = 4, scan_executor: str = "thread"):
         self.vault_path = Path(vault_path)
         if not self.vault_path.exists():
             raise ValueError(f"Vault path does not exist: {vault_path}")
+        self.scanner = VaultScanner(str(self.vault_path), ignore, scan_workers, scan_executor)
+        
+        self.cache = None
+        if use_cache:
+            if not cache_path:
+                cache_path = self.vault_path / VaultCache.DEFAULT_FILENAME
+            self.cache = VaultCache(str(cache_path))
+        
+        # rel_path -> (mtime_ns, size, inode, Note)
+        self._notes: Dict[str, tuple] = {}
+        # rel_path -> (mtime_ns, size) der Dateien, die sich nicht lesen ließen;
+        # sie werden erst nach einer Änderung erneut versucht.
+        self._failed: Dict[str, Tuple[int, int]] = {}
+        self._index = VaultIndex(root=str(self.vault_path))
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[VaultDelta], None]] = []
+        self._scanned = False
+        self.generation = 0
+        
+        self._watch_stop: Optional[threading.Event] = None
+        self._watch_thread: Optional[threading.Thread] = None
+    
+    @property
+    def index(self) -> VaultIndex:
+        self._ensure_fresh()
+        return self._index
+    
+    @property
+    def scanned(self) -> bool:
+        return self._scanned
+    
+    def note_count(self) -> int:
+        return len(self.index)
+    
+    def note_path(self, rel_path: str) -> str:
+        return os.path.join(str(self.vault_path), *rel_path.split('/'))
+    
+    def add_listener(self, callback: Callable[[VaultDelta], None]):
+        self._listeners.append(callback)
+    
+    def _ensure_fresh(self):
+        # Mit aktivem Watcher kosten Abfragen kein I/O; sonst ein stat pro Datei.
+        if not self._scanned or not self.is_watching():
+            self.refresh()
     
     def get_all_notes(self) -> List[Note]:
-        notes = []
-        for md_file in self.vault_path.rglob("*.md"):
-            if md_file.is_file():
-                note = self._parse_note(md_file)
-                if note:
-                    notes.append(note)
-        return notes
-    
-    def _parse_note(self, file_path: Path) -> Note:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        with self._lock:
+            return self.index.all_notes()
+    
+    def iter_notes(self) -> Iterator[Note]:
+        # Liest Dateien erst beim Weiterschalten, solange der Index noch kalt ist.
+        if self._scanned:
+            yield from self.get_all_notes()
+            return
+        for rel_path, path, stat in self.scanner.iter_files():
+            with self._lock:
+                known = self._notes.get(rel_path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                yield known[3]
+                continue
+            hit = self._load_cached_note(rel_path, Path(path), stat)
+            if hit is not None:
+                note = hit[0]
+            else:
+                note = parse_note(path, stat)
+                if note and self.cache:
+                    with self._lock:
+                        self.cache.put(
+                            rel_path, stat.st_mtime_ns, stat.st_size,
+                            stat.st_ctime, stat.st_mtime,
+                            note.title, note.tags, note.links,
+                            count_terms(note.title, note.content), note.aliases
+                        )
+            if note:
+                yield note
+    
+    def iter_search_notes(self, query: str, search_in: str = "content", limit: Optional[int] = None) -> Iterator[Note]:
+        if self._scanned:
+            yield from self.search_notes(query, search_in, top_k=limit)
+            return
+        if limit == 0:
+            return
+        # Kalter Index: gelesene Notizen in einen temporären Suchindex, damit
+        # Treffer und Rangfolge denselben Regeln folgen wie search(). Nach
+        # `limit` Treffern wird nicht weitergelesen; die Treffer werden mit den
+        # Kennzahlen der bis dahin gelesenen Notizen per BM25 geordnet.
+        seen: List[Note] = []
+        index = SearchIndex(lambda doc_id, field: seen[doc_id].title if field == "title" else seen[doc_id].content)
+        found: Dict[int, Note] = {}
+        for doc_id, note in enumerate(self.iter_notes()):
+            seen.append(note)
+            index.add(doc_id, note.title, note.content)
+            matched = index.matches(doc_id, query, search_in)
+            note.release_content()
+            if matched:
+                found[doc_id] = note
+                if limit is not None and len(found) >= limit:
+                    break
+        for doc_id, _ in index.search(query, search_in, limit):
+            yield found[doc_id]
+    
+    def iter_search_by_tags(self, tags: List[str], limit: Optional[int] = None) -> Iterator[Note]:
+        notes = self.search_by_tags(tags) if self._scanned else self._stream_by_tags(tags)
+        yield from islice(notes, limit)
+    
+    def _stream_by_tags(self, tags: List[str]) -> Iterator[Note]:
+        wanted = [tag.casefold().strip('#') for tag in tags]
+        for note in self.iter_notes():
+            note_tags = [tag.casefold() for tag in note.tags]
+            if any(tag == w or tag.startswith(w + '/') for tag in note_tags for w in wanted):
+                yield note
+    
+    def refresh(self) -> VaultDelta:
+        with self._lock, tracer.span("vault.refresh"):
+            delta = VaultDelta(generation=self.generation)
+            seen = set()
+            changed = []
             
-            stat = file_path.stat()
-            created_time = datetime.fromtimestamp(stat.st_ctime)
-            modified_time = datetime.fromtimestamp(stat.st_mtime)
+            with tracer.span("vault.walk"):
+                for rel_path, path, stat in self.scanner.walk():
+                    seen.add(rel_path)
+                    known = self._notes.get(rel_path)
+                    if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                        continue
+                    if self._failed.get(rel_path) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    changed.append((rel_path, Path(path), stat, known is not None))
+                tracer.record(files_seen=len(seen), files_changed=len(changed))
+            for rel_path in [rel_path for rel_path in self._failed if rel_path not in seen]:
+                del self._failed[rel_path]
             
-            title = self._extract_title(content, file_path.stem)
-            tags = self._extract_tags(content)
-            links = self._extract_links(content)
+            missing = {rel_path: self._notes[rel_path] for rel_path in self._notes if rel_path not in seen}
+            missing_by_inode = {
+                (entry[2], entry[0], entry[1]): rel_path
+                for rel_path, entry in missing.items() if entry[2]
+            }
             
-            return Note(
-                title=title,
-                content=content,
-                file_path=str(file_path),
-                created_time=created_time,
-                modified_time=modified_time,
-                tags=tags,
-                links=links
-            )
-        except Exception as e:
-            print(f"Error parsing note {file_path}: {e}")
-            return None
-    
-    def _extract_title(self, content: str, filename: str) -> str:
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('# '):
-                return line[2:].strip()
-        return filename
-    
-    def _extract_tags(self, content: str) -> List[str]:
-        tag_pattern = r'#([a-zA-Z0-9_/-]+)'
-        tags = re.findall(tag_pattern, content)
-        return list(set(tags))
-    
-    def _extract_links(self, content: str) -> List[str]:
-        link_pattern = r'\[\[([^\]]+)\]\]'
-        links = re.findall(link_pattern, content)
-        return list(set(links))
-    
-    def search_notes(self, query: str, search_in: str = "content") -> List[Note]:
-        notes = self.get_all_notes()
-        matching_notes = []
-        
-        query_lower = query.lower()
-        
-        for note in notes:
-            match = False
+            resolved = []
+            to_parse = []
+            cached = set()
+            for rel_path, file_path, stat, existed in changed:
+                old_path = None
+                if not existed:
+                    old_path = missing_by_inode.pop((stat.st_ino, stat.st_mtime_ns, stat.st_size), None)
+                if old_path is not None:
+                    note = self._rename_note(missing.pop(old_path)[3], old_path, file_path)
+                    resolved.append((rel_path, stat, existed, note, None, old_path))
+                    continue
+                hit = self._load_cached_note(rel_path, file_path, stat)
+                if hit is not None:
+                    resolved.append((rel_path, stat, existed) + hit + (None,))
+                    cached.add(rel_path)
+                else:
+                    resolved.append((rel_path, stat, existed, None, None, None))
+                    to_parse.append((len(resolved) - 1, str(file_path), stat))
             
-            if search_in in ["title", "both"]:
-                if query_lower in note.title.lower():
-                    match = True
+            with tracer.span("vault.parse"):
+                parsed = self.scanner.parse_many(parse_note, [(path, stat) for _, path, stat in to_parse])
+                tracer.record(files_read=len(to_parse), bytes_read=sum(stat.st_size for _, _, stat in to_parse),
+                              cache_hits=len(cached))
+            for (position, _, _), note in zip(to_parse, parsed):
+                resolved[position] = resolved[position][:3] + (note, None, None)
             
-            if search_in in ["content", "both"]:
-                if query_lower in note.content.lower():
-                    match = True
+            with tracer.span("vault.index"):
+                added = []
+                for rel_path, stat, existed, note, terms, old_path in resolved:
+                    if old_path is not None:
+                        self._drop(old_path)
+                        delta.renamed.append((old_path, rel_path))
+                    elif note is None:
+                        self._failed[rel_path] = (stat.st_mtime_ns, stat.st_size)
+                        if existed:
+                            self._drop(rel_path)
+                            delta.removed.append(rel_path)
+                        continue
+                    else:
+                        self._failed.pop(rel_path, None)
+                        (delta.modified if existed else delta.added).append(rel_path)
+                
+                    # Treffer aus dem Parse-Cache bringen ihre Häufigkeiten mit
+                    # und werden nicht erneut geschrieben.
+                    if terms is None:
+                        terms = count_terms(note.title, note.content)
+                        if self.cache:
+                            self.cache.put(
+                                rel_path, stat.st_mtime_ns, stat.st_size,
+                                stat.st_ctime, stat.st_mtime,
+                                note.title, note.tags, note.links, terms, note.aliases
+                            )
+                    self._notes[rel_path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino, note)
+                    added.append((note, terms))
+                    note.release_content()
+                self._index.add_many(added)
             
-            if match:
-                matching_notes.append(note)
-        
-        return matching_notes
+            for rel_path in missing:
+                self._drop(rel_path)
+                delta.removed.append(rel_path)
+            
+            if self.cache:
+                self.cache.prune(self._notes.keys())
+                self.cache.flush()
+            
+            self._scanned = True
+            if delta:
+                self.generation += 1
+                delta.generation = self.generation
+                for listener in self._listeners:
+                    listener(delta)
+            return delta
+    
+    def _drop(self, rel_path: str):
+        entry = self._notes.pop(rel_path, None)
+        if entry is not None:
+            self._index.remove(entry[3].file_path)
+    
+    def _rename_note(self, note: Note, old_path: str, file_path: Path) -> Note:
+        title = note.title
+        if title == Path(old_path).stem:
+            title = file_path.stem
+        return Note(title, str(file_path), note.created_ts, note.modified_ts,
+                    note.tags, note.links, note.size, aliases=note.aliases)
+    
+    def start_watching(self, interval: float = 2.0):
+        if self.is_watching():
+            return
+        self._watch_stop = threading.Event()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval, self._watch_stop),
+            name="vault-watcher", daemon=True
+        )
+        self._watch_thread.start()
+    
+    def _watch_loop(self, interval: float, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Fehler beim Aktualisieren des Vaults: {e}")
+            stop.wait(interval)
+    
+    def is_watching(self) -> bool:
+        return self._watch_thread is not None and self._watch_thread.is_alive()
+    
+    def stop_watching(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+        self._watch_stop = None
+        self._watch_thread = None
+    
+    def close(self):
+        self.stop_watching()
+        if self.cache:
+            self.cache.close()
+    
+    def _load_cached_note(self, rel_path: str, file_path: Path,
+                          stat: os.stat_result) -> Optional[Tuple[Note, TermCounts]]:
+        if not self.cache:
+            return None
+        cached = self.cache.get(rel_path, stat.st_mtime_ns, stat.st_size)
+        if cached is None:
+            return None
+        # Ohne Inhalt: Note.content liest die Datei erst bei Bedarf.
+        note = Note(
+            title=cached['title'],
+            file_path=str(file_path),
+            created_ts=cached['created_time'],
+            modified_ts=cached['modified_time'],
+            tags=cached['tags'],
+            links=cached['links'],
+            size=stat.st_size,
+            aliases=cached['aliases']
+        )
+        return note, cached['terms']
+    
+    def search_notes(self, query: str, search_in: str = "content", top_k: Optional[int] = None) -> List[Note]:
+        with self._lock, tracer.span("search.notes"):
+            return self.index.search(query, search_in, top_k)
+    
+    def search_scored(self, query: str, search_in: str = "content", top_k: Optional[int] = None,
+                      corpus: Optional[CorpusStats] = None) -> List[Tuple[Note, float]]:
+        with self._lock, tracer.span("search.notes"):
+            # Mit Kennzahlen aus corpus_stats() auf demselben Stand bewerten, ohne erneuten Sweep.
+            index = self._index if corpus is not None and self._scanned else self.index
+            return index.search_scored(query, search_in, top_k, corpus)
+    
+    def corpus_stats(self, query: str, search_in: str = "content") -> CorpusStats:
+        with self._lock:
+            return self.index.corpus_stats(query, search_in)
     
     def search_by_tags(self, tags: List[str]) -> List[Note]:
-        notes = self.get_all_notes()
-        matching_notes = []
-        
-        tags_lower = [tag.lower() for tag in tags]
-        
-        for note in notes:
-            note_tags_lower = [tag.lower() for tag in note.tags]
-            if any(tag in note_tags_lower for tag in tags_lower):
-                matching_notes.append(note)
-        
-        return matching_notes
+        with self._lock, tracer.span("search.tags"):
+            return self.index.by_tags(tags)
     
     def get_linked_notes(self, note_title: str) -> List[Note]:
-        notes = self.get_all_notes()
-        linked_notes = []
-        
-        for note in notes:
-            if note_title in note.links or note.title in note.links:
-                linked_notes.append(note)
-        
-        return linked_notes
+        with self._lock, tracer.span("search.backlinks"):
+            return self.index.backlinks(note_title)
     
     def get_note_by_title(self, title: str) -> Note:
-        notes = self.get_all_notes()
-        for note in notes:
-            if note.title.lower() == title.lower():
-                return note
-        return None
\ No newline at end of file
+        with self._lock, tracer.span("search.title"):
+            return self.index.by_title(title)
+    
+    def get_outgoing_notes(self, note_title: str) -> List[Note]:
+        with self._lock:
+            return self.index.outlinks(note_title)
+    
+    def get_neighborhood(self, note_title: str, hops: int = 2, limit: Optional[int] = None) -> List[Tuple[Note, int]]:
+        with self._lock:
+            return self.index.neighborhood(note_title, hops, limit)
+    
+    def get_shortest_path(self, start_title: str, goal_title: str) -> List[Note]:
+        with self._lock:
+            return self.index.shortest_path(start_title, goal_title)
+    
+    def get_related_notes(self, notes: List[Note], limit: int = 10, hops: int = 1) -> List[Note]:
+        with self._lock:
+            return self.index.related(notes, limit, hops)
+    
+    def get_link_structure(self, notes: List[Note], max_paths: int = 5) -> Tuple[List[Tuple[Note, Note]], List[List[Note]]]:
+        with self._lock:
+            return self.index.link_structure(notes, max_paths)
+    
+    def get_central_notes(self, top_k: int = 10) -> List[Tuple[Note, float]]:
+        with self._lock:
+            return self.index.central(top_k)
+    
+    def get_statistics(self, top_k: Optional[int] = 10) -> Dict[str, Any]:
+        with self._lock:
+            return self.index.statistics(top_k)
@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+# Durchläuft den Vault mit os.scandir (Stat-Ergebnisse der DirEntries werden
+# weiterverwendet) und parst Dateien parallel in einem Thread- oder Prozess-Pool.
+class VaultScanner:
+    DEFAULT_IGNORE = [".obsidian", ".trash", ".git"]
+
+    def __init__(self, root: str, ignore: Optional[Sequence[str]] = None,
+                 workers: int = 4, executor: str = "thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unsupported scan executor: {executor}")
+        self.root = str(root)
+        self.ignore = list(self.DEFAULT_IGNORE if ignore is None else ignore)
+        self.workers = max(1, int(workers))
+        self.executor = executor
+
+    def is_ignored(self, rel_path: str, name: str) -> bool:
+        return any(fnmatch(name, pattern) or fnmatch(rel_path, pattern.rstrip('/'))
+                   for pattern in self.ignore)
+
+    def iter_files(self, directory: Optional[str] = None, rel_dir: str = "") -> Iterator[Tuple[str, str, os.stat_result]]:
+        try:
+            with os.scandir(directory or self.root) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            return
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not self.is_ignored(rel_path, entry.name):
+                        subdirs.append((entry.path, rel_path + "/"))
+                elif entry.name.endswith('.md') and entry.is_file():
+                    if not self.is_ignored(rel_path, entry.name):
+                        yield rel_path, entry.path, entry.stat()
+            except OSError:
+                continue
+        for path, rel_path in subdirs:
+            yield from self.iter_files(path, rel_path)
+
+    def walk(self) -> List[Tuple[str, str, os.stat_result]]:
+        return list(self.iter_files())
+
+    def parse_many(self, parse: Callable[[str, os.stat_result], Any],
+                   items: List[Tuple[str, os.stat_result]]) -> List[Any]:
+        if self.workers == 1 or len(items) < 2:
+            return [parse(path, stat) for path, stat in items]
+
+        paths = [path for path, _ in items]
+        stats = [stat for _, stat in items]
+        if self.executor == "process":
+            # Lädt multiprocessing nur, wenn es auch genutzt wird.
+            from concurrent.futures import ProcessPoolExecutor
+            chunksize = max(1, len(items) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                return list(pool.map(parse, paths, stats, chunksize=chunksize))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(parse, paths, stats))
@@ -0,0 +1,39 @@
+from collections import Counter
+from typing import List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from vault_reader import Note
+
+# Laufende Vault-Kennzahlen: Der Index führt sie bei jedem add/remove mit,
+# damit 'stats' keinen Durchlauf über alle Notizen braucht. Link-Kennzahlen
+# (eindeutige Ziele, verwaiste Notizen, defekte Links) liefert der LinkGraph.
+class VaultStats:
+    def __init__(self):
+        self.notes = 0
+        self.total_bytes = 0
+        self.tags: Counter = Counter()
+
+    def add(self, note: 'Note'):
+        self.notes += 1
+        self.total_bytes += note.size
+        self.tags.update(self._tag_keys(note))
+
+    def remove(self, note: 'Note'):
+        self.notes -= 1
+        self.total_bytes -= note.size
+        for tag in self._tag_keys(note):
+            self.tags[tag] -= 1
+            if self.tags[tag] <= 0:
+                del self.tags[tag]
+
+    @staticmethod
+    def _tag_keys(note: 'Note') -> Set[str]:
+        # Wie im Index ohne Groß-/Kleinschreibung: #Projekt und #projekt sind ein Tag.
+        return {tag.casefold() for tag in note.tags}
+
+    @property
+    def average_bytes(self) -> int:
+        return self.total_bytes // self.notes if self.notes else 0
+
+    def top_tags(self, k: Optional[int] = 10) -> List[Tuple[str, int]]:
+        return self.tags.most_common(k)